@@ -0,0 +1 @@
+"""Benchmarks for LyricStream playback. Run from the project root: python -m benchmarks.<name>"""
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Broadcast fan-out: many local TCP clients on one shared timeline.
+
+Usage:
+    python -m benchmarks.bench_broadcast --clients 500 --slow 10
+
+Exits 1 if the stalled clients never receive a resync, i.e. backpressure did not reach
+the broadcaster.
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import time
+
+from benchmarks.common import summarize_ms, synthetic_song
+from typewriter.broadcast import LyricBroadcaster, serve
+from typewriter.player import LyricTimeline
+
+
+async def client(port: int, clock, stall: float) -> dict:
+    """Read until the connection closes, sampling delivery lag once per received chunk."""
+    sock = socket.socket()
+    if stall:
+        # A small receive buffer so the stall reaches the server instead of the kernel.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+    reader, writer = await asyncio.open_connection(sock=sock)
+    if stall:
+        await asyncio.sleep(stall)
+    lags, resyncs, messages = [], 0, 0
+    pending = b""
+    while True:
+        chunk = await reader.read(65536)
+        if not chunk:
+            break
+        now = clock.position()
+        data = pending + chunk
+        complete, _, pending = data.rpartition(b"\n")
+        messages += complete.count(b"\n") + 1 if complete else 0
+        resyncs += complete.count(b'"type": "resync"')
+        last = complete.rsplit(b"\n", 1)[-1]
+        if not stall and b'"type": "char"' in last:
+            lags.append(now - json.loads(last)["t"])
+    writer.close()
+    return {"lags": lags, "resyncs": resyncs, "messages": messages}
+
+
+async def run(n_clients: int, n_slow: int, lines: int, seconds: float, queue_size: int) -> None:
+    song = synthetic_song(lines, gap=seconds / lines)
+    timeline = LyricTimeline(song["lyrics"])
+    char_delay = seconds / lines / 80
+    broadcaster = LyricBroadcaster(song, timeline, char_delay, queue_size=queue_size)
+    loop = asyncio.get_running_loop()
+    listening = loop.create_future()
+    server = asyncio.create_task(serve(broadcaster, "127.0.0.1", 0, lambda s: listening.set_result(s[1])))
+    port = await listening
+
+    t0 = time.perf_counter()
+    clients = [
+        asyncio.create_task(client(port, broadcaster.clock, seconds if i < n_slow else 0.0))
+        for i in range(n_clients)
+    ]
+    results = await asyncio.gather(*clients)
+    await server
+    elapsed = time.perf_counter() - t0
+
+    fast = [r for r in results[n_slow:]]
+    lags = [lag for r in fast for lag in r["lags"]]
+    print(f"{n_clients} clients ({n_slow} stalled), {lines} lines over {seconds:.1f} s, wall {elapsed:.2f} s")
+    print(f"  char delivery lag (fast clients, sampled per read): {summarize_ms(lags)}")
+    print(f"  messages per fast client: {min(r['messages'] for r in fast)}..{max(r['messages'] for r in fast)}")
+    stalled_resyncs = sum(r["resyncs"] for r in results[:n_slow])
+    print(f"  resyncs sent to stalled clients: {stalled_resyncs} (fast clients: {sum(r['resyncs'] for r in fast)})")
+    if n_slow and not stalled_resyncs:
+        sys.exit("no resync reached the stalled clients: their backlog was buffered instead")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--slow", type=int, default=10, help="Clients that stop reading for the whole song")
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(run(args.clients, args.slow, args.lines, args.seconds, args.queue_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Render throughput: terminal output and GUI text batching.
+
+Usage:
+    python -m benchmarks.bench_render            # terminal renderer + GUI run coalescing + render plans
+    python -m benchmarks.bench_render --tk       # also insert into a real Tk Text widget (needs a display),
+                                                 # trimmed to the GUI's view size like the GUI does
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.common import synthetic_song
+from typewriter.display import (
+    _ANSI,
+    THEMES,
+    LineWindow,
+    TerminalRenderer,
+    build_render_plan,
+    coalesce_runs,
+    get_render_plan,
+)
+from typewriter.player import LyricTimeline
+
+
+def song_text(lines: int) -> list:
+    return [e[1] for e in synthetic_song(lines)["lyrics"]]
+
+
+def bench_naive(lines: list, stream) -> tuple:
+    """Per-character color + char + reset + flush, as the original typewriter loop did."""
+    colors = [_ANSI[c] for c in THEMES["colorful"]]
+    chars = 0
+    t0 = time.perf_counter()
+    for i, line in enumerate(lines):
+        color = colors[i % len(colors)]
+        for char in line:
+            stream.write(f"{color}{char}{_ANSI['reset']}")
+            stream.flush()
+            chars += 1
+        stream.write("\n")
+        stream.flush()
+    return chars, time.perf_counter() - t0
+
+
+def bench_frames(lines: list, stream, chars_per_frame: int) -> tuple:
+    """TerminalRenderer flushed every chars_per_frame characters."""
+    colors = [_ANSI[c] for c in THEMES["colorful"]]
+    renderer = TerminalRenderer(stream)
+    chars = 0
+    t0 = time.perf_counter()
+    for i, line in enumerate(lines):
+        color = colors[i % len(colors)]
+        for char in line:
+            renderer.write(char, color)
+            chars += 1
+            if chars % chars_per_frame == 0:
+                renderer.flush()
+        renderer.write("\n")
+    renderer.close()
+    return chars, time.perf_counter() - t0, renderer
+
+
+def bench_gui_batches(lines: list, chars_per_frame: int) -> tuple:
+    """Coalesce per-character (text, tag) chunks into Text.insert runs, one batch per frame."""
+    colors = THEMES["colorful"]
+    chunks = []
+    for i, line in enumerate(lines):
+        chunks.extend((c, f"c_{colors[(i + col) % len(colors)]}") for col, c in enumerate(line))
+        chunks.append(("\n", None))
+    t0 = time.perf_counter()
+    runs = 0
+    for start in range(0, len(chunks), chars_per_frame):
+        runs += len(coalesce_runs(chunks[start:start + chars_per_frame]))
+    return len(chunks), runs, time.perf_counter() - t0, chunks
+
+
+def bench_plan(song: dict, repeats: int = 100) -> tuple:
+    """Build a render plan from scratch, then fetch it from the cache repeats times."""
+    timeline = LyricTimeline(song["lyrics"])
+    t0 = time.perf_counter()
+    plan = build_render_plan(timeline, song["char_delay"], "colorful")
+    build = time.perf_counter() - t0
+    get_render_plan(song, timeline, song["char_delay"], "colorful")
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        get_render_plan(song, timeline, song["char_delay"], "colorful")
+    return len(plan), build, (time.perf_counter() - t0) / repeats
+
+
+def bench_tk(chunks: list, chars_per_frame: int) -> tuple:
+    """Insert frames into a Tk Text trimmed by a LineWindow; returns total, first and last 10% frame times."""
+    import tkinter as tk
+
+    root = tk.Tk()
+    text = tk.Text(root)
+    text.pack()
+    for name in THEMES["colorful"]:
+        text.tag_config(f"c_{name}", foreground="#ffffff")
+    view = LineWindow()
+    frames = []
+    for start in range(0, len(chunks), chars_per_frame):
+        t0 = time.perf_counter()
+        args = []
+        trim = 0
+        for run, tag in coalesce_runs(chunks[start:start + chars_per_frame]):
+            args.extend((run, tag) if tag else (run, ()))
+            trim += view.add(run)
+        text.insert(tk.END, *args)
+        if trim:
+            text.delete(1.0, f"{trim + 1}.0")
+        text.see(tk.END)
+        root.update_idletasks()
+        frames.append(time.perf_counter() - t0)
+    root.destroy()
+    tenth = max(1, len(frames) // 10)
+    return sum(frames), sum(frames[:tenth]) / tenth, sum(frames[-tenth:]) / tenth
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--chars-per-frame", type=int, default=8)
+    parser.add_argument("--tk", action="store_true", help="Also measure a real Tk Text widget")
+    args = parser.parse_args()
+    lines = song_text(args.lines)
+
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        chars, elapsed = bench_naive(lines, devnull)
+        print(f"terminal naive     {chars / elapsed:12,.0f} chars/s  ({chars} flushes)")
+        chars, elapsed, r = bench_frames(lines, devnull, args.chars_per_frame)
+        print(
+            f"terminal frames    {chars / elapsed:12,.0f} chars/s  ({r.frames} flushes, "
+            f"{r.chars_written} chars out, {r.write_time * 1e3:.1f} ms writing)"
+        )
+
+    events, build, cached = bench_plan(synthetic_song(args.lines))
+    print(f"render plan        {build * 1e3:12,.1f} ms to build ({events} events), {cached * 1e3:.2f} ms cached")
+
+    chunks, runs, elapsed, chunk_list = bench_gui_batches(lines, args.chars_per_frame)
+    print(f"gui coalesce       {chunks / elapsed:12,.0f} chunks/s ({chunks} chunks -> {runs} insert runs)")
+    if args.tk:
+        elapsed, first, last = bench_tk(chunk_list, args.chars_per_frame)
+        print(
+            f"gui tk insert      {len(chunk_list) / elapsed:12,.0f} chunks/s  "
+            f"(frame {first * 1e6:.0f} us first 10%, {last * 1e6:.0f} us last 10%)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Lyric search: index build, reload and incremental update time, and query latency.
+
+Usage:
+    python -m benchmarks.bench_search                  # 10,000 songs of 40 lines
+    python -m benchmarks.bench_search --songs 100000   # large catalog (several GB of RAM)
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import summarize_ms, synthetic_song
+from typewriter import search
+from typewriter.search import get_index, search_lyrics, tokenize
+
+
+def write_catalog(path: str, n_songs: int, lines: int) -> list:
+    songs = []
+    for i in range(n_songs):
+        song = synthetic_song(lines, seed=i)
+        song["id"] = f"song_{i}"
+        songs.append(song)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"songs": songs}, f)
+    return songs
+
+
+def timed(fn, *args) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--songs", type=int, default=10000)
+    parser.add_argument("--lines", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "songs.json")
+        songs = write_catalog(path, args.songs, args.lines)
+        print(f"build              {timed(get_index, path):8.2f} s  ({args.songs} songs)")
+        search._indexes.clear()
+        print(f"reload from disk   {timed(get_index, path):8.2f} s")
+
+        songs[rng.randrange(len(songs))]["lyrics"][3][1] = "an entirely new line"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"songs": songs}, f)
+        os.utime(path, (time.time() + 1, time.time() + 1))
+        from typewriter.songs_loader import get_catalog
+
+        get_catalog(path).songs()
+        print(f"incremental update {timed(get_index, path):8.2f} s  (one song changed)")
+
+        lines = [line for song in songs[:1000] for _ts, line, *_ in song["lyrics"] if line]
+        for words in (1, 2, 3):
+            latencies = []
+            for _ in range(args.queries):
+                tokens = tokenize(rng.choice(lines))
+                start = rng.randrange(max(1, len(tokens) - words + 1))
+                query = " ".join(tokens[start:start + words])
+                t0 = time.perf_counter()
+                search_lyrics(query, path)
+                latencies.append(time.perf_counter() - t0)
+            print(f"query {words} word(s)    {summarize_ms(latencies)}")
+
+
+if __name__ == "__main__":
+    main()
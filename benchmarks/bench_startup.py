@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+CLI cold start: wall time of `play.py --list` against a bare interpreter, for songs.json
+(titles from its compiled timeline) and for the same songs as a sharded library.
+
+The first --list compiles the timeline and is reported on its own; the target applies
+to the runs after it. Exits with status 1 if either p50 is over the target (TARGET_MS,
+or --target) or if listing imports any of HEAVY_MODULES.
+
+Usage:
+    python -m benchmarks.bench_startup                # 10,000-song synthetic catalog
+    python -m benchmarks.bench_startup --songs 100 --runs 20
+    python -m benchmarks.bench_startup --songs 100000 --runs 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import percentile, synthetic_song
+from typewriter.library import write_library
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLAY = os.path.join(ROOT, "play.py")
+HEAVY_MODULES = ("pygame", "asyncio", "socket", "numpy")
+TARGET_MS = 50.0
+
+
+def synthetic_songs(n_songs: int):
+    for i in range(n_songs):
+        song = synthetic_song(20, seed=i)
+        song["id"] = f"song_{i}"
+        song["title"] = f"Song {i}"
+        yield song
+
+
+def write_catalog(path: str, n_songs: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"songs": list(synthetic_songs(n_songs))}, f)
+
+
+def time_runs(argv: list, runs: int) -> list:
+    """Run argv runs times, returning wall times in seconds."""
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(argv, stdout=subprocess.DEVNULL, check=True, cwd=ROOT)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def imported_modules(argv: list) -> set:
+    """Return the top-level modules argv imports, from -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + argv[1:],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True, cwd=ROOT,
+    )
+    names = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            names.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--songs", type=int, default=10000, help="Songs in the synthetic catalog")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target", type=float, default=TARGET_MS, help="p50 limit for --list in ms")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        songs_file = os.path.join(tmp, "songs.json")
+        write_catalog(songs_file, args.songs)
+        listing = [sys.executable, PLAY, "--songs", songs_file, "--list"]
+
+        # The first --list parses songs.json and compiles the timeline the others read.
+        first = time_runs(listing, 1)[0]
+        baseline = time_runs([sys.executable, "-c", "pass"], args.runs)
+        warm = time_runs(listing, args.runs)
+        heavy = sorted(imported_modules(listing) & set(HEAVY_MODULES))
+
+        library = os.path.join(tmp, "library")
+        write_library(synthetic_songs(args.songs), library)
+        sharded = time_runs([sys.executable, PLAY, "--songs", library, "--list"], args.runs)
+
+    base = percentile(baseline, 50)
+    print(f"interpreter        p50={base * 1e3:8.1f} ms")
+    print(f"--list (first run)     {first * 1e3:8.1f} ms  ({args.songs} songs, compiles the timeline)")
+    failed = bool(heavy)
+    for label, times in (("--list", warm), ("--list (library)", sharded)):
+        p50 = percentile(times, 50)
+        over = p50 * 1e3 > args.target
+        failed = failed or over
+        print(
+            f"{label:<18} p50={p50 * 1e3:8.1f} ms  max={max(times) * 1e3:8.1f} ms  "
+            f"(+{(p50 - base) * 1e3:.1f} ms over interpreter)  {'OVER' if over else 'ok'} (target {args.target:.0f} ms)"
+        )
+    print(f"heavy imports      {', '.join(heavy) if heavy else 'none'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
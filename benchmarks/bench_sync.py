@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Sync accuracy: how late iter_lyrics and the typewriter (a render plan through run_plan,
+as playback runs it) fire against their timestamps.
+
+Usage:
+    python -m benchmarks.bench_sync                     # virtual clock, 10..10,000 lines
+    python -m benchmarks.bench_sync --oversleep 0.002   # model a scheduler that wakes 2 ms late
+    python -m benchmarks.bench_sync --realtime          # real time, null mixer, songs squeezed to --seconds
+"""
+
+import argparse
+import time
+
+from benchmarks.common import DEFAULT_SIZES, NullMusic, drift, summarize_ms, synthetic_song
+from typewriter.clock import MixerClock, VirtualClock
+from typewriter.display import build_render_plan, run_plan
+from typewriter.player import LyricTimeline, iter_lyrics
+from typewriter.scheduler import CHAR
+
+
+def bench_iter_lyrics(timeline: LyricTimeline, clock) -> list:
+    """Return per-line lateness of iter_lyrics."""
+    lateness = []
+    for ts, _line, _delay in iter_lyrics(timeline, 0.0, 0.0, clock=clock):
+        lateness.append(clock.position() - ts)
+    return lateness
+
+
+def bench_typewriter(timeline: LyricTimeline, char_delay: float, clock) -> tuple:
+    """Run the song's render plan; return (line lateness, char lateness).
+
+    A line's lateness is that of its first event (plans have no LINE events).
+    """
+    plan = build_render_plan(timeline, char_delay, "colorful")
+    line_late, char_late = [], []
+    line = -1
+
+    def handle(event, late):
+        nonlocal line
+        if event.line != line:
+            line = event.line
+            line_late.append(late)
+        if event.kind == CHAR:
+            char_late.append(late)
+
+    run_plan(plan, clock, handle, lambda events, clear: None)
+    return line_late, char_late
+
+
+def make_clock(realtime: bool, oversleep: float):
+    if not realtime:
+        return VirtualClock(0.0, oversleep)
+    music = NullMusic()
+    music.play()
+    return MixerClock(0.0, music)
+
+
+def run(size: int, realtime: bool, seconds: float, oversleep: float) -> None:
+    gap = seconds / size if realtime else 4.0
+    song = synthetic_song(size, gap=gap)
+    char_delay = min(song["char_delay"], gap / 80) if realtime else song["char_delay"]
+    timeline = LyricTimeline(song["lyrics"], song["line_delay"])
+    duration = timeline.timestamps[-1] + 1e-9
+
+    clock = make_clock(realtime, oversleep)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    lines = bench_iter_lyrics(timeline, clock)
+    cpu_iter, wall_iter = time.process_time() - cpu0, time.perf_counter() - wall0
+
+    clock = make_clock(realtime, oversleep)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    line_late, char_late = bench_typewriter(timeline, char_delay, clock)
+    cpu_type, wall_type = time.process_time() - cpu0, time.perf_counter() - wall0
+
+    print(f"--- {size} lines, {duration:.1f} s of song ({'real time' if realtime else 'virtual clock'})")
+    print(f"  iter_lyrics  line  {summarize_ms(lines)}  drift={drift(lines) * 1e3:+.3f} ms")
+    print(f"  typewriter   line  {summarize_ms(line_late)}")
+    print(f"  typewriter   char  {summarize_ms(char_late)}  drift={drift(char_late) * 1e3:+.3f} ms")
+    print(
+        f"  cpu per song-second: iter_lyrics {cpu_iter / duration * 1e3:.3f} ms, "
+        f"typewriter {cpu_type / duration * 1e3:.3f} ms  (wall {wall_iter:.2f} s / {wall_type:.2f} s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--realtime", action="store_true", help="Run against the real clock on a null mixer")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Song length per size in --realtime mode")
+    parser.add_argument("--oversleep", type=float, default=0.0, help="Virtual clock: extra seconds per sleep")
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.realtime, args.seconds, args.oversleep)
+
+
+if __name__ == "__main__":
+    main()
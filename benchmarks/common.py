@@ -0,0 +1,104 @@
+"""
+Shared helpers for the benchmark scripts: synthetic songs, a null mixer, percentiles.
+"""
+
+import random
+import time
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+
+def synthetic_song(n_lines: int, gap: float = 4.0, line_len: int = 40, seed: int = 0) -> dict:
+    """Return a songs.json-style song with n_lines timed lines (some blank, some with delays)."""
+    rng = random.Random(seed)
+    lyrics = []
+    ts = 0.0
+    for i in range(n_lines):
+        if i % 8 == 7:
+            lyrics.append([round(ts, 3), ""])
+        else:
+            words = []
+            while sum(len(w) + 1 for w in words) < line_len:
+                words.append("".join(rng.choice("aeioulmnrst") for _ in range(rng.randint(2, 8))))
+            entry = [round(ts, 3), " ".join(words)[:line_len]]
+            if i % 5 == 4:
+                entry.append(0.2)
+            lyrics.append(entry)
+        ts += gap * rng.uniform(0.5, 1.5)
+    return {
+        "id": f"synthetic_{n_lines}",
+        "title": f"Synthetic {n_lines}",
+        "artist": "",
+        "audio": "synthetic.wav",
+        "lyrics": lyrics,
+        "char_delay": 0.05,
+        "line_delay": 0.0,
+    }
+
+
+class NullMusic:
+    """Stand-in for pygame.mixer.music: plays nothing, reports position from time.monotonic()."""
+
+    def __init__(self):
+        self._started = None
+        self._paused_at = None
+        self._start = 0.0
+
+    def load(self, path: str) -> None:
+        pass
+
+    def play(self, loops: int = 0, start: float = 0.0) -> None:
+        self._start = start
+        self._started = time.monotonic()
+        self._paused_at = None
+
+    def get_pos(self) -> int:
+        if self._started is None:
+            return -1
+        now = self._paused_at if self._paused_at is not None else time.monotonic()
+        return int((now - self._started) * 1000)
+
+    def pause(self) -> None:
+        if self._paused_at is None:
+            self._paused_at = time.monotonic()
+
+    def unpause(self) -> None:
+        if self._paused_at is not None:
+            self._started += time.monotonic() - self._paused_at
+            self._paused_at = None
+
+    def stop(self) -> None:
+        self._started = None
+
+    def get_busy(self) -> bool:
+        return self._started is not None and self._paused_at is None
+
+    def set_volume(self, volume: float) -> None:
+        pass
+
+
+def percentile(values, q: float) -> float:
+    """Return the q-th percentile (0-100) of values, nearest-rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(q / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def summarize_ms(values) -> str:
+    """Format p50/p99/max of second-valued samples in milliseconds."""
+    if not values:
+        return "n=0"
+    return (
+        f"n={len(values):<7} p50={percentile(values, 50) * 1e3:8.3f} ms  "
+        f"p99={percentile(values, 99) * 1e3:8.3f} ms  max={max(values) * 1e3:8.3f} ms"
+    )
+
+
+def drift(values) -> float:
+    """Mean of the last 10% of samples minus the mean of the first 10%."""
+    if len(values) < 2:
+        return 0.0
+    k = max(1, len(values) // 10)
+    return sum(values[-k:]) / k - sum(values[:k]) / k
@@ -2,14 +2,17 @@
 """
 LyricStream - GUI.
 
-Song info, Play/Pause/Stop, volume, theme, font. Typing speed from songs.json.
+Song info, Play/Pause/Stop, Play all (gapless), scrub bar, lyric search, volume, theme, font.
+Typing speed from songs.json.
 Requires: pygame, tkinter (python3-tk on Linux). Optional: ttkbootstrap for dark theme.
 """
 
 import os
 import sys
-import time
+import argparse
+import queue
 import threading
+import time
 
 try:
     import pygame
@@ -30,30 +33,37 @@ try:
 except ImportError:
     ScrolledText = scrolledtext.ScrolledText
 
-from typewriter.songs_loader import load_songs, get_song, list_songs
-from typewriter.display import THEMES, get_theme_list
-from typewriter.player import iter_lyrics, get_audio_path, get_line_delay, get_char_delay
+from typewriter import metrics
+from typewriter.songs_loader import get_catalog
+from typewriter.display import THEME_COLORS_HEX, VIEW_LINES, LineWindow, coalesce_runs, get_render_plan, get_theme_list, run_plan
+from typewriter.player import PlaybackController
+from typewriter.playlist import PlaylistPlayer
+from typewriter.search import get_index, search_lyrics
 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 
-
-# Theme colors for lyric display
-THEME_COLORS_HEX = {
-    "red": "#ff6b6b",
-    "green": "#51cf66",
-    "yellow": "#fcc419",
-    "blue": "#339af0",
-    "magenta": "#cc5de8",
-    "cyan": "#22b8cf",
-    "white": "#f8f9fa",
-}
 DEFAULT_TEXT_COLOR = "#dee2e6"
+FRAME_MS = 16
+SCRUB_MS = 200
+SEEK_STEP = 5.0
+# Render queue item that clears the lyric display (a seek redraws it from scratch).
+_CLEAR = (None, None)
+
+
+def _format_time(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def _color_tag(color_name):
+    """Return the Text tag name for a theme color (tags are created once in _build_ui)."""
+    return f"c_{color_name}"
 
 
 class LyricStreamGUI:
     """LyricStream GUI with dark theme and playback controls."""
 
-    def __init__(self):
+    def __init__(self, metrics_target=None, metrics_format="prometheus"):
         if USE_TTKBOOTSTRAP:
             self.root = ttk.Window(
                 title="LyricStream",
@@ -69,15 +79,27 @@ class LyricStreamGUI:
             self.root.geometry("700x580")
             self.root.minsize(500, 400)
 
-        self.songs = load_songs()
+        self.catalog = get_catalog()
+        self.songs = self.catalog.songs()
         self.current_song = None
         self.playing = False
-        self.paused = False
-        self.stop_requested = False
         self.playback_thread = None
+        self.clock = None
+        self.controller = PlaybackController()
+        self._render_queue = queue.Queue()
+        self._view = LineWindow()
+        self.metrics_target = metrics_target
+        self.metrics_format = metrics_format
+
+        self._search_hits = []
+        self._scrubbing = False
 
         self._build_ui()
         self._bind_shortcuts()
+        self.root.after(FRAME_MS, self._drain_render_queue)
+        self.root.after(SCRUB_MS, self._update_scrub)
+        # Load (or build) the search index in the background so the first search is instant.
+        threading.Thread(target=get_index, args=(self.catalog.path,), daemon=True).start()
 
     def _build_ui(self):
         # Header: Song info
@@ -166,7 +188,35 @@ class LyricStreamGUI:
         self.stop_btn = ttk.Button(btn_frame, text="⏹ Stop", command=self._on_stop, width=10, state=tk.DISABLED)
         if USE_TTKBOOTSTRAP:
             self.stop_btn.configure(bootstyle="danger")
-        self.stop_btn.pack(side=tk.LEFT)
+        self.stop_btn.pack(side=tk.LEFT, padx=(0, 8))
+        self.play_all_btn = ttk.Button(btn_frame, text="⏭ Play all", command=self._on_play_all, width=10)
+        if USE_TTKBOOTSTRAP:
+            self.play_all_btn.configure(bootstyle="info")
+        self.play_all_btn.pack(side=tk.LEFT)
+
+        # Row 5: Lyric search (results appear below; double-click or ENTER plays from the line)
+        row5 = ttk.Frame(ctrl)
+        row5.pack(fill=tk.X, pady=(8, 0))
+        ttk.Label(row5, text="Search", width=8).pack(side=tk.LEFT, padx=(0, 8))
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(row5, textvariable=self.search_var, width=40)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_entry.bind("<Return>", lambda e: self._on_search() or "break")
+        self.search_results = tk.Listbox(ctrl, height=4, activestyle="none")
+        self.search_results.bind("<Double-Button-1>", lambda e: self._on_search_pick())
+        self.search_results.bind("<Return>", lambda e: self._on_search_pick() or "break")
+
+        # Scrub bar: follows the song position; drag (or LEFT/RIGHT) to seek
+        scrub_row = ttk.Frame(self.root)
+        scrub_row.pack(fill=tk.X, padx=15)
+        self.scrub_var = tk.DoubleVar(value=0.0)
+        self.scrub = ttk.Scale(scrub_row, from_=0, to=1, variable=self.scrub_var)
+        self.scrub.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 8))
+        self.scrub.bind("<ButtonPress-1>", lambda e: self._on_scrub_start())
+        self.scrub.bind("<ButtonRelease-1>", lambda e: self._on_scrub_end())
+        self.scrub_label_var = tk.StringVar(value="0:00 / 0:00")
+        ttk.Label(scrub_row, textvariable=self.scrub_label_var, width=12).pack(side=tk.LEFT)
+        self.scrub_var.trace_add("write", lambda *a: self._show_scrub_label())
 
         # Lyric display
         lyric_frame = ttk.Labelframe(self.root, text="Lyrics", padding=15)
@@ -179,6 +229,8 @@ class LyricStreamGUI:
         self.text = ScrolledText(lyric_frame, **st_kw)
         self.text.pack(fill=tk.BOTH, expand=True)
         self._text_widget = getattr(self.text, "text", self.text)
+        for name, hex_color in THEME_COLORS_HEX.items():
+            self.text.tag_config(_color_tag(name), foreground=hex_color)
 
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
@@ -193,12 +245,87 @@ class LyricStreamGUI:
         self.root.bind("<space>", lambda e: self._toggle_play_pause())
         self.root.bind("<Escape>", lambda e: self._on_stop())
         self.root.bind("<Return>", lambda e: self._on_play())
+        self.root.bind("<Left>", lambda e: self._seek_by(-SEEK_STEP))
+        self.root.bind("<Right>", lambda e: self._seek_by(SEEK_STEP))
+
+    def _typing(self):
+        """Return True if keyboard focus is in a text field (so shortcuts keep their usual meaning)."""
+        return isinstance(self.root.focus_get(), tk.Entry)
+
+    def _seek_by(self, seconds):
+        if self.playing and not self._typing():
+            position = self.controller.position()
+            if position is not None:
+                self.controller.seek(max(0.0, position + seconds))
+
+    def _on_scrub_start(self):
+        self._scrubbing = True
+
+    def _on_scrub_end(self):
+        """Seek to where the scrub bar was released (before playback: set the start position)."""
+        self._scrubbing = False
+        position = self.scrub_var.get()
+        if self.playing:
+            self.controller.seek(position)
+        else:
+            self.start_var.set(f"{position:.1f}")
+
+    def _update_scrub(self):
+        """Move the scrub bar with the song position."""
+        if self.playing and not self._scrubbing:
+            position = self.controller.position()
+            if position is not None:
+                self.scrub_var.set(position)
+        self.root.after(SCRUB_MS, self._update_scrub)
+
+    def _show_scrub_label(self):
+        self.scrub_label_var.set(f"{_format_time(self.scrub_var.get())} / {_format_time(self.scrub.cget('to'))}")
+
+    def _set_duration(self, prepared):
+        """Size the scrub bar to the song: its audio length, or its last timestamp if that is unknown.
+
+        The length was measured by the prefetcher, so nothing is probed on the playback thread.
+        """
+        timeline = prepared.timeline
+        duration = prepared.duration or 0.0
+        last = timeline.timestamps[-1] + 5.0 if len(timeline) else 0.0
+        self.root.after(0, lambda: self.scrub.configure(to=max(duration, last, 1.0)))
+
+    def _on_search(self):
+        """Show the lyric lines matching the search box."""
+        query = self.search_var.get().strip()
+        self._search_hits = search_lyrics(query, self.catalog.path) if query else []
+        self.search_results.delete(0, tk.END)
+        for hit in self._search_hits:
+            minutes, seconds = divmod(hit.timestamp, 60)
+            self.search_results.insert(tk.END, f"{hit.song_id} [{int(minutes):02d}:{seconds:05.2f}] {hit.line}")
+        if self._search_hits:
+            self.search_results.pack(fill=tk.X, pady=(8, 0))
+            self.search_results.selection_set(0)
+            self.search_results.focus_set()
+        else:
+            self.search_results.pack_forget()
+            self.status_var.set("No matching lyrics" if query else "Ready")
+
+    def _on_search_pick(self):
+        """Play the selected search hit from its line's timestamp."""
+        selection = self.search_results.curselection()
+        if not selection:
+            return
+        if self.playing:
+            self.status_var.set("Stop playback to jump to a search result")
+            return
+        hit = self._search_hits[selection[0]]
+        self.song_var.set(hit.song_id)
+        self.start_var.set(f"{hit.timestamp:g}")
+        self._on_song_select()
+        self._on_play()
 
     def _on_song_select(self):
         sid = self.song_var.get()
         if not sid:
             return
-        song = get_song(sid)
+        song = self.catalog.get(sid)
         if song:
             self.song_title_var.set(song.get("title", sid))
             self.song_artist_var.set(song.get("artist", "") or "—")
@@ -224,12 +351,21 @@ class LyricStreamGUI:
             pass
 
     def _toggle_play_pause(self):
-        if self.playing and not self.stop_requested:
-            self._on_pause() if not self.paused else self._on_resume()
+        if self._typing():
+            return
+        if self.playing and not self.controller.stopped:
+            self._on_pause() if not self.controller.paused else self._on_resume()
         elif not self.playing and self.songs:
             self._on_play()
 
     def _on_play(self):
+        self._start_playback(play_all=False)
+
+    def _on_play_all(self):
+        self._start_playback(play_all=True)
+
+    def _start_playback(self, play_all):
+        """Play the selected song, or with play_all every song from it to the end of the list."""
         if not self.songs:
             messagebox.showerror("Error", "No songs in songs.json")
             return
@@ -242,142 +378,174 @@ class LyricStreamGUI:
         except ValueError:
             start_at = 0.0
 
-        self.current_song = get_song(sid)
+        self.current_song = self.catalog.get(sid)
         if not self.current_song:
             messagebox.showerror("Error", f"Song '{sid}' not found")
             return
         if self.playback_thread and self.playback_thread.is_alive():
             return
+        songs = [self.current_song]
+        if play_all:
+            ids = [s["id"] for s in self.songs]
+            songs = self.songs[ids.index(sid):] if sid in ids else songs
 
         self.playing = True
-        self.paused = False
-        self.stop_requested = False
+        self.controller = PlaybackController()
+        self.controller.play()
         self.play_btn.config(state=tk.DISABLED)
+        self.play_all_btn.config(state=tk.DISABLED)
         self.pause_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.NORMAL)
-        self.text.delete(1.0, tk.END)
+        self._clear_render_queue()
+        self._clear_text()
         self.status_var.set("Playing...")
 
-        char_delay = get_char_delay(self.current_song, None)
         self.playback_thread = threading.Thread(
             target=self._run_playback,
-            args=(start_at, char_delay, self.theme_var.get()),
+            args=(songs, start_at, self.theme_var.get()),
         )
         self.playback_thread.daemon = True
         self.playback_thread.start()
 
     def _on_pause(self):
-        if not self.playing or self.paused:
+        if not self.playing or self.controller.paused:
             return
-        self.paused = True
         pygame.mixer.music.pause()
+        self.controller.pause()
         self.pause_btn.config(text="▶ Resume", command=self._on_resume)
         self.status_var.set("Paused")
 
     def _on_resume(self):
-        if not self.paused:
+        if not self.controller.paused:
             return
-        self.paused = False
         pygame.mixer.music.unpause()
+        self.controller.resume()
         self.pause_btn.config(text="⏸ Pause", command=self._on_pause)
         self.status_var.set("Playing...")
 
     def _on_stop(self):
-        self.stop_requested = True
+        self.controller.stop()
         self.playing = False
-        self.paused = False
         self.status_var.set("Stopped")
 
-    def _run_playback(self, start_at, char_delay, theme):
-        song = self.current_song
-        audio_path = get_audio_path(song, PROJECT_ROOT)
-        lyrics = song["lyrics"]
-        line_delay = get_line_delay(song)
-
-        if not os.path.exists(audio_path):
-            self.root.after(0, lambda: messagebox.showerror("Error", "Audio file not found"))
-            self.root.after(0, self._reset_ui)
-            return
+    def _run_playback(self, songs, start_at, theme):
+        """Play songs back to back (gapless when there are several), typing their lyrics."""
+        if not pygame.mixer.get_init():
+            with metrics.timed("audio_init_seconds"):
+                pygame.mixer.init()
+        pygame.mixer.music.set_volume(self.volume_var.get())
+        controller = self.controller
+        # The queue clock follows the mixer and pauses itself, so it is not wrapped in a PausableClock.
+        player = PlaylistPlayer(songs, PROJECT_ROOT, pygame.mixer.music, controller, with_duration=True)
+
+        def on_song(index, prepared):
+            self.current_song = prepared.song
+            if index > 0:
+                self._render_queue.put(("\n", None))
+            status = f"Playing {index + 1}/{len(songs)}..." if len(songs) > 1 else "Playing..."
+            self.root.after(0, lambda: self._show_song(prepared.song, status))
+            self._set_duration(prepared)
+
+        def on_error(song, error):
+            self.root.after(0, lambda: self.status_var.set(f"Skipped '{song['id']}': audio file not found"))
+
+        def play_lyrics(prepared, clock, start_at, stop_check):
+            self.clock = clock
+            plan = get_render_plan(prepared.song, prepared.timeline, prepared.char_delay, theme, per_char=True)
+            tags = [_color_tag(name) if name else None for name in plan.styles]
+            put = self._render_queue.put
+
+            def handle(event, late):
+                put((event.text, tags[event.style]))
+
+            def redraw(events, clear):
+                if clear:
+                    put(_CLEAR)
+                for text, style in coalesce_runs((e.text, e.style) for e in events):
+                    put((text, tags[style]))
+
+            run_plan(
+                plan, clock, handle, redraw, start_at, stop_check, controller=controller, max_lines=VIEW_LINES,
+                linger=lambda: controller.paused or pygame.mixer.music.get_busy(),
+            )
 
-        pygame.mixer.init()
         try:
-            pygame.mixer.music.load(audio_path)
-            pygame.mixer.music.set_volume(self.volume_var.get())
-            pygame.mixer.music.play(start=start_at)
+            player.run(play_lyrics, start_at, on_song, on_error)
         except pygame.error:
             self.root.after(0, lambda: messagebox.showerror("Error", "Could not load audio"))
-            self.root.after(0, self._reset_ui)
-            return
-
-        theme_colors = THEMES.get(theme, [])
-        color_index = 0
+        else:
+            if player.queue_clock is None and not controller.stopped:
+                self.root.after(0, lambda: messagebox.showerror("Error", "Audio file not found"))
+
+        if self.metrics_target:
+            try:
+                metrics.export(self.metrics_target, self.metrics_format)
+            except OSError:
+                pass
+        self.root.after(0, self._reset_ui)
 
-        def stop_check():
-            return self.stop_requested
+    def _drain_render_queue(self):
+        """Insert everything the playback thread queued since the last frame in one go.
 
-        for ts, line, entry_delay in iter_lyrics(lyrics, start_at, line_delay, stop_check):
-            if self.stop_requested:
+        The view keeps the last VIEW_LINES lines; older ones are deleted from the top in
+        batches, so memory and redraw cost stay flat however long playback runs.
+        """
+        chunks = []
+        try:
+            while True:
+                chunks.append(self._render_queue.get_nowait())
+        except queue.Empty:
+            pass
+        for i in range(len(chunks) - 1, -1, -1):
+            if chunks[i] is _CLEAR:
+                self._clear_text()
+                chunks = chunks[i + 1:]
                 break
-            if self.paused:
-                while self.paused and not self.stop_requested:
-                    time.sleep(0.1)
-                if self.stop_requested:
-                    break
-
-            if line.strip():
-                for i, char in enumerate(line):
-                    if self.stop_requested:
-                        break
-                    if self.paused:
-                        while self.paused and not self.stop_requested:
-                            time.sleep(0.05)
-                    if self.stop_requested:
-                        break
-                    if theme_colors and theme != "plain":
-                        cname = theme_colors[(color_index + i) % len(theme_colors)]
-                        hex_color = THEME_COLORS_HEX.get(cname, DEFAULT_TEXT_COLOR)
-                        self.root.after(0, lambda c=char, h=hex_color: self._append_char(c, h))
-                    else:
-                        self.root.after(0, lambda c=char: self._append_char(c, None))
-                    time.sleep(char_delay)
-                color_index += 1
-                self.root.after(0, lambda: self._append_text("\n"))
-                if entry_delay > 0:
-                    time.sleep(entry_delay)
-            else:
-                self.root.after(0, lambda: self._append_text("\n"))
-                if entry_delay > 0:
-                    time.sleep(entry_delay)
-
-        if self.stop_requested:
-            pygame.mixer.music.stop()
-        else:
-            while pygame.mixer.music.get_busy() and not self.stop_requested:
-                time.sleep(0.1)
-            if self.stop_requested:
-                pygame.mixer.music.stop()
-
-        self.root.after(0, self._reset_ui)
+        if chunks:
+            t0 = time.perf_counter() if metrics.enabled else None
+            args = []
+            trim = 0
+            chars = 0
+            for text, tag in coalesce_runs(chunks):
+                args.extend((text, tag) if tag else (text, ()))
+                trim += self._view.add(text)
+                chars += len(text)
+            self.text.insert(tk.END, *args)
+            if trim:
+                self.text.delete(1.0, f"{trim + 1}.0")
+                if metrics.enabled:
+                    metrics.registry.inc("gui_lines_trimmed", trim)
+            self.text.see(tk.END)
+            if t0 is not None:
+                metrics.registry.observe("gui_frame_seconds", time.perf_counter() - t0)
+                # What the playback thread queued while this frame was being inserted.
+                metrics.registry.set_gauge("gui_queue_depth", self._render_queue.qsize())
+                metrics.registry.inc("gui_chars_inserted", chars)
+        self.root.after(FRAME_MS, self._drain_render_queue)
+
+    def _clear_text(self):
+        self.text.delete(1.0, tk.END)
+        self._view.clear()
 
-    def _append_text(self, s):
-        self.text.insert(tk.END, s)
-        self.text.see(tk.END)
+    def _clear_render_queue(self):
+        try:
+            while True:
+                self._render_queue.get_nowait()
+        except queue.Empty:
+            pass
 
-    def _append_char(self, c, color_hex=None):
-        if color_hex:
-            tag = f"c_{color_hex}"
-            self.text.tag_config(tag, foreground=color_hex)
-            self.text.insert(tk.END, c, tag)
-        else:
-            self.text.insert(tk.END, c)
-        self.text.see(tk.END)
+    def _show_song(self, song, status):
+        self.song_title_var.set(song.get("title", song["id"]))
+        self.song_artist_var.set(song.get("artist", "") or "—")
+        self.status_var.set(status)
 
     def _reset_ui(self):
         self.playing = False
-        self.paused = False
         self.play_btn.config(state=tk.NORMAL)
+        self.play_all_btn.config(state=tk.NORMAL)
         self.pause_btn.config(text="⏸ Pause", command=self._on_pause, state=tk.DISABLED)
         self.stop_btn.config(state=tk.DISABLED)
+        self.scrub_var.set(0.0)
         self.status_var.set("Ready")
 
     def run(self):
@@ -385,5 +553,11 @@ class LyricStreamGUI:
 
 
 if __name__ == "__main__":
-    app = LyricStreamGUI()
+    parser = argparse.ArgumentParser(description="LyricStream - GUI")
+    parser.add_argument("--metrics", metavar="TARGET", help="Record metrics; write after each playback to a file or tcp:// / udp:// socket")
+    parser.add_argument("--metrics-format", choices=["prometheus", "jsonl"], default="prometheus")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+    app = LyricStreamGUI(args.metrics, args.metrics_format)
     app.run()
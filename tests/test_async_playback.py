@@ -0,0 +1,57 @@
+import asyncio
+import io
+import time
+
+import pytest
+
+from typewriter.clock import MonotonicClock
+from typewriter.display import TerminalRenderer, atypewriter_play
+from typewriter.player import LyricTimeline, aiter_lyrics
+
+LYRICS = [[0.0, "before"], [1.0, "first"], [1.05, "second", 0.2]]
+
+
+def test_aiter_lyrics_from_start_at():
+    async def main():
+        clock = MonotonicClock(1.0)
+        lines = aiter_lyrics(LYRICS, 1.0, 0.1, clock)
+        return [(ts, line, delay, clock.position() - ts) async for ts, line, delay in lines]
+
+    lines = asyncio.run(main())
+    assert [(ts, line, delay) for ts, line, delay, _late in lines] == [(1.0, "first", 0.1), (1.05, "second", 0.2)]
+    assert all(0 <= late < 0.5 for *_rest, late in lines)
+
+
+def test_cancelling_the_consumer_stops_waiting():
+    async def consume(seen):
+        async for _ts, line, _delay in aiter_lyrics([[0.0, "now"], [60.0, "much later"]], 0.0, 0.0):
+            seen.append(line)
+
+    async def main():
+        seen = []
+        task = asyncio.ensure_future(consume(seen))
+        await asyncio.sleep(0.05)
+        t0 = time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return seen, time.monotonic() - t0
+
+    seen, elapsed = asyncio.run(main())
+    assert seen == ["now"]
+    assert elapsed < 1.0
+
+
+def test_cancelled_typewriter_flushes_what_it_typed():
+    async def main():
+        out = io.StringIO()
+        timeline = LyricTimeline([[0.0, "ab"], [60.0, "never"]])
+        renderer = TerminalRenderer(out)
+        task = asyncio.ensure_future(atypewriter_play(timeline, 0.001, "plain", MonotonicClock(), renderer=renderer))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return out.getvalue()
+
+    assert asyncio.run(main()) == "ab\n"
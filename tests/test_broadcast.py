@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+from typewriter.broadcast import LyricBroadcaster, _Client
+from typewriter.player import LyricTimeline
+
+SONG = {"id": "s", "title": "S", "audio": "s.mp3"}
+
+
+def broadcaster(queue_size=2):
+    timeline = LyricTimeline([[0.0, "ab"], [0.05, "c"]])
+    return LyricBroadcaster(SONG, timeline, 0.005, queue_size=queue_size)
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_queue_size_must_fit_resync_and_end():
+    with pytest.raises(ValueError):
+        broadcaster(queue_size=1)
+
+
+def test_full_queue_is_replaced_by_resync():
+    async def main():
+        b = broadcaster()
+        client = _Client(None, b.queue_size)
+        b.clients.add(client)
+        for n in range(3):
+            b.broadcast(b"%d\n" % n)
+        assert client.resyncs == 1
+        assert [json.loads(item)["type"] for item in drain(client.queue)] == ["resync"]
+        # Full when the broadcast ends: the resync still leaves room for the end marker.
+        b.broadcast(b"3\n")
+        b.broadcast(b"4\n")
+        b.broadcast(None)
+        resync, end = drain(client.queue)
+        assert (json.loads(resync)["type"], end, client.resyncs) == ("resync", None, 2)
+
+    asyncio.run(main())
+
+
+def test_clients_receive_everything_and_are_removed():
+    async def read_all(host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        messages = [json.loads(line) async for line in reader]
+        writer.close()
+        return messages
+
+    async def main():
+        b = broadcaster(queue_size=64)
+        server = await asyncio.start_server(b.handle_client, "127.0.0.1", 0)
+        host, port = server.sockets[0].getsockname()[:2]
+        async with server:
+            _reader, gone = await asyncio.open_connection(host, port)
+            gone.close()
+            readers = [asyncio.ensure_future(read_all(host, port)) for _ in range(2)]
+            while len(b.clients) < 2:
+                await asyncio.sleep(0.005)
+            await b.run()
+            results = await asyncio.gather(*readers)
+            while b.clients:
+                await asyncio.sleep(0.005)
+        for messages in results:
+            assert messages[0]["type"] == "hello"
+            assert messages[-1]["type"] == "done"
+            typed = "".join(m["text"] for m in messages if m["type"] == "char")
+            assert typed == "abc"
+
+    asyncio.run(main())
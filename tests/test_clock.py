@@ -0,0 +1,114 @@
+import pytest
+
+from typewriter import clock as clock_module
+from typewriter.clock import MixerClock, MonotonicClock, PausableClock, QueueClock, VirtualClock, wait_until
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeMusic:
+    def __init__(self, pos=-1):
+        self.pos = pos
+
+    def get_pos(self):
+        return self.pos
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(clock_module, "time", fake)
+    return fake
+
+
+def test_monotonic_clock_position_and_seek(fake_time):
+    clock = MonotonicClock(10.0)
+    fake_time.now += 2.5
+    assert clock.position() == pytest.approx(12.5)
+    clock.seek(3.0)
+    assert clock.position() == pytest.approx(3.0)
+    fake_time.now += 1.0
+    assert clock.position() == pytest.approx(4.0)
+
+
+def test_mixer_clock_interpolates_between_buffer_updates(fake_time):
+    music = FakeMusic()
+    clock = MixerClock(5.0, music)
+    assert clock.position() == 5.0  # not playing yet
+    music.pos = 0
+    assert clock.position() == pytest.approx(5.0)
+    fake_time.now += 0.02
+    assert clock.position() == pytest.approx(5.02)
+    fake_time.now += 1.0
+    # Stalled: interpolation stops at max_interpolation.
+    assert clock.position() == pytest.approx(5.05)
+    music.pos = 1000
+    assert clock.position() == pytest.approx(6.0)
+    music.pos = 1040
+    fake_time.now += 0.05
+    assert clock.position() == pytest.approx(6.04)
+    # A coarser get_pos() than what was already reported never moves the clock back.
+    music.pos = 1000
+    assert clock.position() == pytest.approx(6.04)
+
+
+def test_mixer_clock_pause_and_seek(fake_time):
+    music = FakeMusic(2000)
+    clock = MixerClock(0.0, music)
+    assert clock.position() == pytest.approx(2.0)
+    clock.pause()
+    assert clock.paused
+    fake_time.now += 5.0
+    music.pos = 9000
+    assert clock.position() == pytest.approx(2.0)
+    clock.seek(30.0)
+    assert clock.position() == pytest.approx(30.0)
+    clock.resume()
+    music.pos = 10000
+    assert clock.position() == pytest.approx(31.0)
+
+
+def test_queue_clock_follows_a_track_switch(fake_time):
+    music = FakeMusic(0)
+    clock = QueueClock(12.0, music)
+    music.pos = 5000
+    assert clock.position() == pytest.approx(17.0)
+    music.pos = 100
+    assert clock.position() == pytest.approx(0.1)
+    assert clock.track == 1
+
+
+def test_pausable_clock(fake_time):
+    clock = PausableClock(MonotonicClock())
+    fake_time.now += 1.0
+    clock.pause()
+    fake_time.now += 5.0
+    assert clock.position() == pytest.approx(1.0)
+    clock.resume()
+    fake_time.now += 2.0
+    assert clock.position() == pytest.approx(3.0)
+    clock.pause()
+    clock.seek(20.0)
+    assert clock.position() == pytest.approx(20.0)
+    fake_time.now += 1.0
+    clock.resume()
+    fake_time.now += 1.0
+    assert clock.position() == pytest.approx(21.0)
+
+
+def test_wait_until_on_a_virtual_clock():
+    clock = VirtualClock(1.0)
+    assert wait_until(clock, 4.0)
+    assert clock.position() == pytest.approx(4.0)
+    # With a stop_check, sleeps are cut into poll_interval steps so it is checked in between.
+    assert not wait_until(clock, 10.0, stop_check=lambda: clock.position() >= 5.0, poll_interval=0.5)
+    assert clock.position() == pytest.approx(5.0)
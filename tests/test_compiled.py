@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+from typewriter import compiled as compiled_module
+from typewriter.compiled import compiled_path, open_compiled
+
+
+def write_songs(path, songs):
+    path.write_text(json.dumps({"songs": songs}), encoding="utf-8")
+
+
+def song(song_id, line, **fields):
+    return {"id": song_id, "title": song_id.upper(), "audio": f"{song_id}.mp3", "lyrics": [[0.0, line]], **fields}
+
+
+@pytest.fixture
+def songs_file(tmp_path):
+    path = tmp_path / "songs.json"
+    write_songs(path, [song("a", "first"), song("b", "second", line_delay=0.5)])
+    return path
+
+
+def test_compiles_on_first_open(songs_file):
+    compiled = open_compiled(str(songs_file))
+    assert os.path.exists(compiled_path(str(songs_file)))
+    assert compiled.titles() == [("a", "A"), ("b", "B")]
+    assert compiled.song("b")["line_delay"] == 0.5
+    assert compiled.lyrics("a").to_list() == [[0.0, "first"]]
+    assert compiled.find("missing") is None
+    assert open_compiled(str(songs_file)) is compiled
+
+
+def test_recompiles_when_songs_json_changes(songs_file):
+    compiled = open_compiled(str(songs_file))
+    write_songs(songs_file, [song("a", "changed lyrics"), song("c", "third")])
+    current = open_compiled(str(songs_file))
+    assert current is not compiled
+    assert current.lyrics("a").to_list() == [[0.0, "changed lyrics"]]
+    assert current.find("b") is None
+    assert current.song("c")["title"] == "C"
+
+
+def test_stale_file_on_disk_is_rebuilt(songs_file):
+    path = compiled_path(str(songs_file))
+    open_compiled(str(songs_file))
+    stale = os.path.getmtime(path)
+    write_songs(songs_file, [song("a", "newer")])
+    # As in a new process: nothing is open yet, only the old file is on disk.
+    compiled_module._opened.clear()
+    assert open_compiled(str(songs_file)).lyrics("a").to_list() == [[0.0, "newer"]]
+    assert os.path.getmtime(path) >= stale
+
+
+def test_without_rebuild_nothing_is_written(songs_file):
+    path = compiled_path(str(songs_file))
+    with pytest.raises(ValueError):
+        open_compiled(str(songs_file), rebuild=False)
+    assert not os.path.exists(path)
+    open_compiled(str(songs_file))
+    assert open_compiled(str(songs_file), rebuild=False).find("a") is not None
+    write_songs(songs_file, [song("a", "stale now")])
+    with pytest.raises(ValueError):
+        open_compiled(str(songs_file), rebuild=False)
+
+
+def test_corrupt_file_is_rebuilt(songs_file):
+    path = compiled_path(str(songs_file))
+    with open(path, "wb") as f:
+        f.write(b"not a compiled timeline")
+    assert open_compiled(str(songs_file)).lyrics("b").to_list() == [[0.0, "second"]]
+
+
+def test_repeated_id_resolves_to_last_song(tmp_path):
+    path = tmp_path / "songs.json"
+    write_songs(path, [song("a", "old"), song("b", "other"), song("a", "new")])
+    assert open_compiled(str(path)).lyrics("a").to_list() == [[0.0, "new"]]
+
+
+def test_find_every_id(tmp_path):
+    path = tmp_path / "songs.json"
+    ids = [f"song{n:03d}" for n in range(0, 200, 3)] + ["Zed", "éclair", "日本", "a b"]
+    write_songs(path, [song(song_id, song_id) for song_id in ids])
+    compiled = open_compiled(str(path))
+    for row, song_id in enumerate(ids):
+        assert compiled.find(song_id) == row
+        assert compiled.lyrics(song_id).to_list() == [[0.0, song_id]]
+    for missing in ("", "song001", "song999", "zzz", "éclai"):
+        assert compiled.find(missing) is None
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from typewriter.clock import MonotonicClock, PausableClock
+from typewriter.player import PAUSED, PLAYING, PlaybackController
+
+
+def waiting(controller, clock, deadline):
+    """Start controller.wait_until(clock, deadline) on a thread; returns (thread, result list)."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(controller.wait_until(clock, deadline)))
+    thread.start()
+    time.sleep(0.05)
+    return thread, result
+
+
+def test_stop_wakes_a_long_wait():
+    clock = MonotonicClock()
+    controller = PlaybackController(clock)
+    controller.play()
+    t0 = time.monotonic()
+    thread, result = waiting(controller, clock, 60.0)
+    controller.stop()
+    thread.join(5.0)
+    assert result == [False]
+    assert time.monotonic() - t0 < 5.0
+    assert controller.latencies
+
+
+def test_seek_wakes_the_wait_and_is_applied_by_take_seek():
+    clock = PausableClock(MonotonicClock())
+    seeks = []
+    controller = PlaybackController(clock, on_seek=seeks.append)
+    controller.play()
+    thread, result = waiting(controller, clock, 60.0)
+    controller.seek(42.0)
+    thread.join(5.0)
+    assert result == [False]
+    # Until the loop takes it, other threads see the seek's target.
+    assert controller.position() == 42.0
+    assert controller.take_seek() == 42.0
+    assert seeks == [42.0]
+    assert 42.0 <= clock.position() < 43.0
+    assert controller.take_seek() is None
+    assert controller.state == PLAYING
+
+
+def test_pause_holds_the_wait_until_resumed():
+    clock = PausableClock(MonotonicClock())
+    controller = PlaybackController(clock)
+    controller.play()
+    controller.pause()
+    assert controller.state == PAUSED and clock.paused
+    thread, result = waiting(controller, clock, 0.02)
+    time.sleep(0.1)
+    assert thread.is_alive() and result == []
+    controller.resume()
+    thread.join(5.0)
+    assert result == [True]
+    assert not clock.paused
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+import pytest
+
+from typewriter import display, metrics
+from typewriter.display import get_render_plan
+from typewriter.metrics import Registry
+from typewriter.scheduler import CHAR
+
+SONG = {"id": "s", "audio": "s.mp3", "lyrics": [[0.0, "abc"], [1.0, ""], [2.0, "de"]], "char_delay": 0.1}
+
+
+@pytest.fixture(autouse=True)
+def plan_cache(monkeypatch):
+    cache = OrderedDict()
+    monkeypatch.setattr(display, "_plan_cache", cache)
+    return cache
+
+
+def char_styles(plan):
+    return [e.style for e in plan.events if e.kind == CHAR]
+
+
+def test_per_char_colors():
+    per_line = get_render_plan(SONG, None, 0.1, "colorful")
+    per_char = get_render_plan(SONG, None, 0.1, "colorful", per_char=True)
+    assert per_char is not per_line
+    assert [per_line.styles[s] for s in char_styles(per_line)] == ["cyan"] * 3 + ["green"] * 2
+    assert [per_char.styles[s] for s in char_styles(per_char)] == ["cyan", "green", "yellow", "green", "yellow"]
+
+
+def test_plan_cache_hit_and_invalidation():
+    plan = get_render_plan(SONG, None, 0.1, "colorful")
+    # Same content in another dict (or key order) is a hit.
+    assert get_render_plan(dict(reversed(list(SONG.items()))), None, 0.1, "colorful") is plan
+    assert get_render_plan(SONG, None, 0.2, "colorful") is not plan
+    assert get_render_plan(SONG, None, 0.1, "plain") is not plan
+    edited = {**SONG, "lyrics": [[0.0, "abd"], [1.0, ""], [2.0, "de"]]}
+    changed = get_render_plan(edited, None, 0.1, "colorful")
+    assert changed is not plan
+    assert "".join(e.text for e in changed.events if e.kind == CHAR) == "abdde"
+
+
+def test_plan_cache_is_lru(monkeypatch, plan_cache):
+    monkeypatch.setattr(display, "PLAN_CACHE_SIZE", 2)
+    songs = [{**SONG, "id": f"s{n}"} for n in range(3)]
+    first = get_render_plan(songs[0], None, 0.1, "plain")
+    second = get_render_plan(songs[1], None, 0.1, "plain")
+    assert get_render_plan(songs[0], None, 0.1, "plain") is first
+    # songs[1] is now the least recently used, so it makes room for songs[2].
+    get_render_plan(songs[2], None, 0.1, "plain")
+    assert len(plan_cache) == 2
+    assert get_render_plan(songs[0], None, 0.1, "plain") is first
+    assert get_render_plan(songs[1], None, 0.1, "plain") is not second
+
+
+def test_plan_cache_metrics():
+    previous = metrics.registry
+    try:
+        reg = metrics.enable(Registry())
+        get_render_plan(SONG, None, 0.1, "plain")
+        get_render_plan(SONG, None, 0.1, "plain")
+        assert (reg.counters["render_plan_cache_misses"], reg.counters["render_plan_cache_hits"]) == (1, 1)
+        assert reg.histograms["render_plan_seconds"].count == 1
+    finally:
+        metrics.disable()
+        metrics.registry = previous
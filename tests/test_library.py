@@ -0,0 +1,73 @@
+import json
+import os
+
+import pytest
+
+from typewriter.library import SHARD_DIR, LibrarySong, ShardedCatalog, write_library
+from typewriter.models import Lyrics
+
+
+def song(n, lines=3, **fields):
+    return {
+        "id": f"s{n}",
+        "title": f"Song {n}",
+        "audio": f"s{n}.mp3",
+        "lyrics": [[float(i), f"line {i} of {n}"] for i in range(lines)],
+        **fields,
+    }
+
+
+@pytest.fixture
+def library(tmp_path):
+    write_library([song(n) for n in range(5)], str(tmp_path), shard_size=2)
+    return ShardedCatalog(str(tmp_path))
+
+
+def test_write_and_read(library, tmp_path):
+    assert len(os.listdir(tmp_path / SHARD_DIR)) == 3
+    assert len(library) == 5
+    assert library.titles()[:2] == [("s0", "Song 0"), ("s1", "Song 1")]
+    loaded = library.get("s3")
+    assert isinstance(loaded, LibrarySong)
+    assert (loaded["artist"], loaded["char_delay"], loaded["line_delay"]) == ("", 0.03, 0.0)
+    assert isinstance(loaded["lyrics"], Lyrics)
+    assert loaded["lyrics"].to_list() == song(3)["lyrics"]
+    assert library.get("missing") is None
+    assert "s4" in library and "s5" not in library
+
+
+def test_update_adds_and_replaces(library):
+    written = library.update([song(1, lines=1, artist="New"), song(7), {"title": "no id"}])
+    assert written == 2
+    assert [song_id for song_id, _title in library.titles()] == ["s0", "s1", "s2", "s3", "s4", "s7"]
+    assert library.get("s1")["artist"] == "New"
+    assert library.get("s1")["lyrics"].to_list() == [[0.0, "line 0 of 1"]]
+    assert library.get("s7")["lyrics"].to_list() == song(7)["lyrics"]
+
+
+def test_refresh_picks_up_another_writer(library, tmp_path):
+    assert library.get("s2")["lyrics"].to_list() == song(2)["lyrics"]
+    other = ShardedCatalog(str(tmp_path / "manifest.json"))
+    other.update([song(2, lines=1)])
+    # The manifest changed on disk, so the first catalog reloads it and reads the new lyrics.
+    assert library.get("s2")["lyrics"].to_list() == [[0.0, "line 0 of 2"]]
+
+
+def test_refresh_is_skipped_while_unchanged(library):
+    library.titles()
+    columns = library._columns
+    library._refresh()
+    assert library._columns is columns
+
+
+def test_rewrite_removes_unused_shards(library, tmp_path):
+    library.update([song(n, lines=1) for n in range(5)])
+    write_library(library.songs(), str(tmp_path))
+    assert len(os.listdir(tmp_path / SHARD_DIR)) == 1
+    assert library.get("s4")["lyrics"].to_list() == [[0.0, "line 0 of 4"]]
+
+
+def test_unsupported_version(tmp_path):
+    (tmp_path / "manifest.json").write_text(json.dumps({"version": 99, "shards": [], "songs": {}}))
+    with pytest.raises(ValueError):
+        len(ShardedCatalog(str(tmp_path)))
@@ -0,0 +1,96 @@
+import io
+
+import pytest
+
+from typewriter.lyricfiles import (
+    export_lyrics,
+    format_timestamp,
+    parse_lrc,
+    parse_srt,
+    read_lyric_file,
+    write_lrc,
+    write_srt,
+)
+
+SONG = {
+    "id": "song",
+    "title": "A Song",
+    "artist": "Someone",
+    "audio": "song.mp3",
+    "lyrics": [[0.0, "one"], [2.5, "two"], [5.0, ""], [10.25, "three"]],
+    "char_delay": 0.05,
+}
+
+
+def test_parse_lrc():
+    meta, lyrics = parse_lrc(
+        [
+            "[ti:Title]",
+            "[ar: Artist ]",
+            "[offset:+500]",
+            "[00:01.50][00:10.00]chorus",
+            "[00:03:25]older <00:03.30>word <00:03.60>times",
+            "[01:02:03.5]hours",
+            "not a lyric line",
+        ]
+    )
+    assert meta == {"ti": "Title", "ar": "Artist", "offset": "+500"}
+    assert lyrics == [[1.0, "chorus"], [2.75, "older word times"], [9.5, "chorus"], [3723.0, "hours"]]
+
+
+def test_parse_srt_with_stanza_gap():
+    lyrics = parse_srt(
+        [
+            "1",
+            "00:00:01,000 --> 00:00:02,000",
+            "<i>first</i>",
+            "line",
+            "",
+            "2",
+            "00:00:05,500 --> 00:00:06,000",
+            "second",
+        ]
+    )
+    assert lyrics == [[1.0, "first line"], [2.0, ""], [5.5, "second"]]
+
+
+@pytest.mark.parametrize(
+    "seconds, lrc, srt", [(0.0, "00:00.00", "00:00:00,000"), (83.456, "01:23.46", "00:01:23,456")]
+)
+def test_format_timestamp(seconds, lrc, srt):
+    assert format_timestamp(seconds) == lrc
+    assert format_timestamp(seconds, srt=True) == srt
+
+
+def test_lrc_round_trip():
+    out = io.StringIO()
+    write_lrc(SONG, out)
+    meta, lyrics = parse_lrc(out.getvalue().splitlines())
+    assert meta == {"ti": "A Song", "ar": "Someone"}
+    assert lyrics == SONG["lyrics"]
+
+
+def test_srt_round_trip():
+    out = io.StringIO()
+    write_srt(SONG, out)
+    # Blank lines are not cues, but the gap they leave comes back as a blank line.
+    assert parse_srt(out.getvalue().splitlines()) == SONG["lyrics"]
+
+
+@pytest.mark.parametrize("fmt", ["lrc", "srt"])
+def test_export_and_import(tmp_path, fmt):
+    written, failed = export_lyrics([SONG], str(tmp_path), fmt)
+    assert failed == []
+    assert written == [str(tmp_path / f"song.{fmt}")]
+    song = read_lyric_file(written[0], audio="song.mp3")
+    assert song["id"] == "song"
+    assert song["lyrics"] == SONG["lyrics"]
+    if fmt == "lrc":
+        assert (song["title"], song["artist"]) == ("A Song", "Someone")
+
+
+def test_read_lyric_file_without_timed_lines(tmp_path):
+    path = tmp_path / "empty.lrc"
+    path.write_text("[ti:Nothing]\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_lyric_file(str(path))
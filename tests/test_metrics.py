@@ -0,0 +1,98 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from typewriter import metrics
+from typewriter.metrics import Registry, export, to_json_lines, to_prometheus
+
+
+@pytest.fixture
+def reg():
+    reg = Registry()
+    reg.inc("resyncs")
+    reg.inc("resyncs", 2)
+    reg.set_gauge("clients", 4)
+    reg.observe("lateness_seconds", 0.0003)
+    reg.observe("lateness_seconds", 0.004)
+    reg.observe("lateness_seconds", 10.0)
+    return reg
+
+
+def test_prometheus(reg):
+    text = to_prometheus(reg)
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    assert lines[:4] == [
+        "# TYPE lyricstream_resyncs counter",
+        "lyricstream_resyncs 3",
+        "# TYPE lyricstream_clients gauge",
+        "lyricstream_clients 4",
+    ]
+    assert "# TYPE lyricstream_lateness_seconds histogram" in lines
+    assert 'lyricstream_lateness_seconds_bucket{le="0.0005"} 1' in lines
+    assert 'lyricstream_lateness_seconds_bucket{le="0.005"} 2' in lines
+    assert 'lyricstream_lateness_seconds_bucket{le="5.0"} 2' in lines
+    assert 'lyricstream_lateness_seconds_bucket{le="+Inf"} 3' in lines
+    assert "lyricstream_lateness_seconds_count 3" in lines
+
+
+def test_json_lines(reg):
+    records = [json.loads(line) for line in to_json_lines(reg).splitlines()]
+    assert [(r["name"], r["type"]) for r in records] == [
+        ("resyncs", "counter"), ("clients", "gauge"), ("lateness_seconds", "histogram"),
+    ]
+    hist = records[2]
+    assert (hist["count"], hist["buckets"]["0.001"], hist["buckets"]["+Inf"]) == (3, 1, 3)
+    assert hist["sum"] == pytest.approx(10.0043)
+
+
+def test_export_to_files(reg, tmp_path):
+    prom = str(tmp_path / "metrics.prom")
+    export(prom, "prometheus", reg)
+    export(prom, "prometheus", reg)
+    with open(prom, encoding="utf-8") as f:
+        assert f.read() == to_prometheus(reg)
+    jsonl = str(tmp_path / "metrics.jsonl")
+    export(jsonl, "jsonl", reg)
+    export(jsonl, "jsonl", reg)
+    with open(jsonl, encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 6
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["metrics.jsonl", "metrics.prom"]
+
+
+def test_export_over_tcp(reg):
+    server = socket.create_server(("127.0.0.1", 0))
+    received = []
+
+    def accept():
+        conn, _ = server.accept()
+        with conn:
+            received.append(b"".join(iter(lambda: conn.recv(4096), b"")))
+
+    thread = threading.Thread(target=accept)
+    thread.start()
+    host, port = server.getsockname()
+    export(f"tcp://{host}:{port}", "prometheus", reg)
+    thread.join(5.0)
+    server.close()
+    assert received == [to_prometheus(reg).encode("utf-8")]
+
+
+def test_hooks_record_only_when_enabled():
+    previous = metrics.registry
+    try:
+        metrics.disable()
+        metrics.inc("ignored")
+        reg = metrics.enable(Registry())
+        metrics.inc("counted")
+        with metrics.timed("block_seconds"):
+            pass
+        metrics.disable()
+        metrics.inc("counted")
+        assert reg.counters == {"counted": 1}
+        assert reg.histograms["block_seconds"].count == 1
+    finally:
+        metrics.disable()
+        metrics.registry = previous
@@ -0,0 +1,73 @@
+import math
+
+import pytest
+
+from typewriter.models import Lyrics, Song
+
+ENTRIES = [[0.0, "one"], [1.5, "two", 0.2], [3.0, ""]]
+
+
+def test_lyrics_round_trip():
+    lyrics = Lyrics.from_entries(ENTRIES)
+    assert lyrics.to_list() == ENTRIES
+    assert len(lyrics) == 3
+    assert lyrics[1] == (1.5, "two", 0.2)
+    assert lyrics[-1] == (3.0, "")
+    assert lyrics[:2] == [(0.0, "one"), (1.5, "two", 0.2)]
+    assert list(lyrics) == [(0.0, "one"), (1.5, "two", 0.2), (3.0, "")]
+    assert lyrics.entries(0.5) == [(0.0, "one", 0.5), (1.5, "two", 0.2), (3.0, "", 0.5)]
+    assert math.isnan(lyrics.delays[0])
+    with pytest.raises(IndexError):
+        lyrics[3]
+
+
+def test_lyrics_without_delays():
+    lyrics = Lyrics.from_entries([(0, "a"), (2, "b")])
+    assert lyrics.delays is None
+    assert lyrics.to_list() == [[0.0, "a"], [2.0, "b"]]
+    assert list(lyrics) == [(0.0, "a"), (2.0, "b")]
+
+
+@pytest.mark.parametrize(
+    "entries", [[[0.0]], [[0.0, "a", 0.1, 1]], [[True, "a"]], [[0.0, "a", False]], [["0", "a"]], [[0.0, 1]], [None]]
+)
+def test_malformed_entries(entries):
+    assert Lyrics.from_entries(entries) is None
+
+
+def test_song_round_trip():
+    data = {
+        "id": "s",
+        "title": "Title",
+        "audio": "s.mp3",
+        "lyrics": ENTRIES,
+        "char_delay": 0.05,
+        "tags": ["x"],
+        "artist": None,
+    }
+    song = Song.from_dict(data)
+    assert isinstance(song.lyrics, Lyrics)
+    assert song.to_dict() == data
+    assert Song.from_dict(song.to_dict()).to_dict() == data
+    assert song.extra == {"tags": ["x"], "artist": None}
+
+
+def test_song_reads_like_a_dict():
+    song = Song.from_dict({"id": "s", "audio": "s.mp3", "lyrics": ENTRIES, "bpm": 120})
+    assert (song["id"], song.get("title", "untitled"), song.get("bpm"), song["bpm"]) == ("s", "untitled", 120, 120)
+    assert "audio" in song and "title" not in song
+    assert list(song) == ["id", "audio", "lyrics", "bpm"]
+    assert dict(song)["lyrics"] is song.lyrics
+    with pytest.raises(KeyError):
+        song["title"]
+    song["title"] = "Now titled"
+    song["mood"] = "calm"
+    assert song.to_dict()["title"] == "Now titled"
+    assert song.extra == {"bpm": 120, "mood": "calm"}
+
+
+def test_malformed_lyrics_are_kept_raw():
+    raw = [[0.0, "fine"], ["bad"]]
+    song = Song.from_dict({"id": "s", "lyrics": raw})
+    assert song.lyrics is raw
+    assert song.to_dict() == {"id": "s", "lyrics": raw}
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from typewriter.compiled import open_compiled
+from typewriter.models import Lyrics
+from typewriter.player import LyricTimeline
+
+LYRICS = [[5.0, "second"], [0.0, "first"], [10.0, "third", 0.5], [10.0, "fourth"]]
+
+
+def timelines(tmp_path):
+    """The same lyrics as a raw list, as Lyrics and as compiled (mmap'd) lyrics."""
+    path = tmp_path / "songs.json"
+    path.write_text(json.dumps({"songs": [{"id": "s", "audio": "s.mp3", "lyrics": LYRICS}]}))
+    return [
+        LyricTimeline(LYRICS, 0.25),
+        LyricTimeline(Lyrics.from_entries(LYRICS), 0.25),
+        LyricTimeline(open_compiled(str(path)).lyrics("s"), 0.25),
+    ]
+
+
+def test_entries_sorted_with_default_delay(tmp_path):
+    for timeline in timelines(tmp_path):
+        assert list(timeline.entries) == [
+            (0.0, "first", 0.25),
+            (5.0, "second", 0.25),
+            (10.0, "third", 0.5),
+            (10.0, "fourth", 0.25),
+        ]
+
+
+@pytest.mark.parametrize(
+    "position, index, visible",
+    [(-1.0, 0, 0), (0.0, 0, 1), (2.5, 1, 1), (5.0, 1, 2), (9.99, 2, 2), (10.0, 2, 4), (60.0, 4, 4)],
+)
+def test_seek(tmp_path, position, index, visible):
+    for timeline in timelines(tmp_path):
+        assert timeline.index_at(position) == index
+        assert len(timeline.visible_at(position)) == visible
+        assert list(timeline.entries_from(position)) == list(timeline.entries[index:])
+
+
+def test_empty_timeline():
+    timeline = LyricTimeline([])
+    assert len(timeline) == 0
+    assert timeline.index_at(3.0) == 0
+    assert list(timeline.visible_at(3.0)) == []
+    assert list(timeline.entries_from(3.0)) == []
@@ -0,0 +1,47 @@
+import pytest
+
+from typewriter.player import LyricTimeline
+from typewriter.scheduler import CHAR, END, LINE, expand_lyrics, find_overruns
+
+
+def line_events(events, i):
+    return [e for e in events if e.line == i]
+
+
+def test_characters_spaced_by_char_delay():
+    events = expand_lyrics(LyricTimeline([[0.0, "abcd"], [10.0, "x"]]), 0.1)
+    first = line_events(events, 0)
+    assert [e.kind for e in first] == [LINE, CHAR, CHAR, CHAR, CHAR, END]
+    assert [e.deadline for e in first if e.kind == CHAR] == pytest.approx([0.0, 0.1, 0.2, 0.3])
+    assert first[-1].deadline == pytest.approx(0.4)
+
+
+def test_overrunning_line_is_compressed_to_finish_on_time():
+    # 10 characters at 0.1 s need 1 s, but the next line is due after 0.5 s.
+    timeline = LyricTimeline([[0.0, "a" * 10], [0.5, "next"]])
+    events = expand_lyrics(timeline, 0.1)
+    first = line_events(events, 0)
+    chars = [e.deadline for e in first if e.kind == CHAR]
+    assert chars == pytest.approx([i * 0.05 for i in range(10)])
+    assert first[-1].kind == END
+    assert first[-1].deadline == pytest.approx(0.5)
+    assert find_overruns(timeline, 0.1) == [(0, 0.0, pytest.approx(1.0), pytest.approx(0.5))]
+
+
+def test_entry_delay_shortens_the_typing_budget():
+    timeline = LyricTimeline([[0.0, "a" * 10, 0.3], [1.0, "next"]])
+    first = line_events(expand_lyrics(timeline, 0.1), 0)
+    assert first[-1].deadline == pytest.approx(0.7)
+
+
+def test_last_line_is_never_compressed():
+    events = expand_lyrics(LyricTimeline([[0.0, "x"], [1.0, "a" * 50]]), 0.1)
+    assert line_events(events, 1)[-1].deadline == pytest.approx(6.0)
+
+
+def test_start_at_skips_earlier_lines_and_events_are_ordered():
+    events = expand_lyrics(LyricTimeline([[0.0, "ab"], [1.0, ""], [2.0, "cd"]]), 0.1, start_at=0.5)
+    assert {e.line for e in events} == {1, 2}
+    assert [e.kind for e in line_events(events, 1)] == [LINE, END]
+    keys = [(e.deadline, e.seq) for e in events]
+    assert keys == sorted(keys)
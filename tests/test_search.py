@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from typewriter import search as search_module
+from typewriter.search import CACHE_DIR, CACHE_FILE, SearchIndex, get_index, search_lyrics
+
+
+def song(n, *lines):
+    lines = lines or (f"common words {n}", f"only in song{n}")
+    return {"id": f"s{n}", "audio": f"s{n}.mp3", "lyrics": [[float(i), line] for i, line in enumerate(lines)]}
+
+
+def ids(hits):
+    return sorted({song_id for song_id, _entry in hits})
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes(monkeypatch):
+    monkeypatch.setattr(search_module, "_indexes", {})
+
+
+def test_update_reindexes_only_changed_songs():
+    songs = [song(n) for n in range(20)]
+    index = SearchIndex()
+    index.rebuild(songs)
+    assert ids(index.search("common words")) == sorted(s["id"] for s in songs)
+
+    retimed = {**songs[1], "lyrics": [[ts + 1.0, line] for ts, line in songs[1]["lyrics"]]}
+    updated = [songs[0], retimed, song(2, "brand new chorus")] + songs[4:] + [song(20)]
+    # s2 changed, s3 removed, s20 added; s1 only moved its timestamps.
+    assert index.update(updated) == 3
+    assert index.base_slots == 20 and index.retired == 2
+    assert ids(index.search("new chorus")) == ["s2"]
+    assert index.search("song2") == []
+    assert index.search("song3") == []
+    assert index.search("song20") == [("s20", 1)]
+    assert index.search("song1") == [("s1", 1)]
+    assert index.update(updated) == 0
+
+
+def test_update_compacts_once_stale_slots_build_up():
+    songs = [song(n) for n in range(4)]
+    index = SearchIndex()
+    index.rebuild(songs)
+    index.update([song(0, "changed")] + songs[1:])
+    # One retired and one delta slot out of five: rebuilt from scratch.
+    assert (index.retired, index.base_slots, len(index.slots), index.delta) == (0, 4, 4, {})
+    assert index.search("changed") == [("s0", 0)]
+
+
+def test_get_index_saves_and_updates_from_disk(tmp_path, monkeypatch):
+    songs_file = tmp_path / "songs.json"
+    songs = [song(n) for n in range(20)]
+    songs_file.write_text(json.dumps({"songs": songs}), encoding="utf-8")
+    assert [(h.song_id, h.entry, h.line) for h in search_lyrics("song1", str(songs_file))] == [
+        ("s1", 1, "only in song1")
+    ]
+    assert (tmp_path / CACHE_DIR / CACHE_FILE).exists()
+
+    songs[1] = song(1, "rewritten line")
+    songs_file.write_text(json.dumps({"songs": songs + [song(20)]}), encoding="utf-8")
+    # As in a new process: the index comes from disk and is updated, not rebuilt.
+    monkeypatch.setattr(search_module, "_indexes", {})
+    rebuilds = []
+    monkeypatch.setattr(SearchIndex, "rebuild", lambda self, songs: rebuilds.append(songs))
+    index = get_index(str(songs_file))
+    assert rebuilds == []
+    assert ids(index.search("rewritten")) == ["s1"]
+    assert index.search("song1") == []
+    assert index.search("song20") == [("s20", 1)]
+    assert len(index.search("common", limit=100)) == 20
+
+
+def test_damaged_index_file_is_rebuilt(tmp_path):
+    songs_file = tmp_path / "songs.json"
+    songs_file.write_text(json.dumps({"songs": [song(0)]}), encoding="utf-8")
+    (tmp_path / CACHE_DIR).mkdir()
+    (tmp_path / CACHE_DIR / CACHE_FILE).write_bytes(b"LSIX\x02garbage")
+    assert [h.song_id for h in search_lyrics("song0", str(songs_file))] == ["s0"]
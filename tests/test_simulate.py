@@ -0,0 +1,34 @@
+import io
+import json
+
+from typewriter.simulate import simulate_song
+
+SONG = {
+    "id": "s",
+    "audio": "s.mp3",
+    "lyrics": [[1.0, "ab"], [2.0, ""], [3.0, "c"]],
+    "char_delay": 0.1,
+}
+
+
+def test_event_stream():
+    out = io.StringIO()
+    report = simulate_song(SONG, out)
+    events = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [(e["kind"], e["line"], e["col"], e["text"]) for e in events] == [
+        ("line", 0, 0, "ab"), ("char", 0, 0, "a"), ("char", 0, 1, "b"), ("end", 0, 0, ""),
+        ("line", 1, 0, ""), ("end", 1, 0, ""),
+        ("line", 2, 0, "c"), ("char", 2, 0, "c"), ("end", 2, 0, ""),
+    ]
+    assert [e["t"] for e in events] == [1.0, 1.0, 1.1, 1.2, 2.0, 2.0, 3.0, 3.0, 3.1]
+    assert (report.events, report.lines, report.overruns) == (9, 3, [])
+    assert abs(report.duration - 3.1) < 1e-9
+
+
+def test_start_at_skips_earlier_lines():
+    out = io.StringIO()
+    report = simulate_song(SONG, out, start_at=1.5)
+    events = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [e["line"] for e in events] == [1, 1, 2, 2, 2]
+    assert report.lines == 2
+    assert abs(report.duration - 1.6) < 1e-9
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from typewriter.models import Song
+from typewriter.songs_loader import format_song, format_songs, get_catalog, save_song, write_songs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATA = {
+    "version": 2,
+    "songs": [
+        {
+            "id": "a",
+            "title": "Ünïcode ♪",
+            "artist": "",
+            "audio": "a.mp3",
+            "lyrics": [[0.0, "one"], [1.5, "two \"quoted\"", 0.2], [3.0, ""]],
+            "char_delay": 0.03,
+            "line_delay": 0.0,
+            "tags": ["x", "y"],
+            "meta": {"bpm": 120, "keys": [1, 2]},
+            "note": None,
+        },
+        {"id": "b", "audio": "b.mp3", "lyrics": []},
+    ],
+    "settings": {"theme": "neon"},
+}
+
+
+def test_repo_songs_json_is_byte_identical():
+    with open(os.path.join(ROOT, "songs.json"), encoding="utf-8") as f:
+        text = f.read()
+    assert format_songs(json.loads(text)) == text
+
+
+def test_format_songs_round_trip():
+    text = format_songs(DATA)
+    assert json.loads(text) == DATA
+    assert format_songs(json.loads(text)) == text
+    assert '        [1.5, "two \\"quoted\\"", 0.2],\n' in text
+
+
+def test_format_song_accepts_song_objects():
+    for song in DATA["songs"]:
+        assert format_song(Song.from_dict(song)) == format_song(song)
+
+
+def test_write_songs_matches_format_songs(tmp_path):
+    path = str(tmp_path / "songs.json")
+    write_songs(path, DATA, map(format_song, DATA["songs"]))
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == format_songs(DATA)
+    assert os.listdir(tmp_path) == ["songs.json"]
+
+
+def test_save_song_replaces_and_reloads(tmp_path):
+    path = str(tmp_path / "songs.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(format_songs(DATA))
+    catalog = get_catalog(path)
+    assert catalog.get("b")["lyrics"].to_list() == []
+    save_song({"id": "b", "audio": "b.mp3", "lyrics": [[0.0, "new"]]}, path)
+    save_song({"id": "c", "audio": "c.mp3", "lyrics": []}, path)
+    assert [s["id"] for s in catalog.songs()] == ["a", "b", "c"]
+    assert catalog.get("b")["lyrics"].to_list() == [[0.0, "new"]]
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["settings"] == {"theme": "neon"}
+    assert data["songs"][0] == DATA["songs"][0]
+
+
+def test_failed_save_leaves_the_file_alone(tmp_path):
+    path = str(tmp_path / "songs.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(format_songs(DATA))
+    with pytest.raises(TypeError):
+        save_song({"id": "c", "audio": "c.mp3", "lyrics": [], "tags": {1, 2}}, path)
+    assert os.listdir(tmp_path) == ["songs.json"]
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == format_songs(DATA)
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from typewriter import cli
+from typewriter.compiled import open_compiled
+from typewriter.library import ShardedCatalog, write_library
+from typewriter.titles import fast_list, parse_list_args, read_titles
+
+
+def write_songs(path, songs):
+    path.write_text(json.dumps({"songs": songs}), encoding="utf-8")
+
+
+def song(song_id, title=None):
+    title = song_id.upper() if title is None else title
+    return {"id": song_id, "title": title, "audio": f"{song_id}.mp3", "lyrics": [[0.0, "x"]]}
+
+
+@pytest.fixture
+def songs_file(tmp_path):
+    path = tmp_path / "songs.json"
+    write_songs(path, [song("a"), song("b", "Bé ♪")])
+    return path
+
+
+def test_read_titles_needs_a_current_timeline(songs_file):
+    assert read_titles(str(songs_file)) is None
+    open_compiled(str(songs_file))
+    assert read_titles(str(songs_file)) == [("a", "A"), ("b", "Bé ♪")]
+    write_songs(songs_file, [song("c")])
+    assert read_titles(str(songs_file)) is None
+
+
+def test_list_rebuilds_a_stale_timeline(songs_file, capsys):
+    open_compiled(str(songs_file))
+    write_songs(songs_file, [song("c")])
+    assert cli._fast_list(["--list", "--songs", str(songs_file)])
+    assert capsys.readouterr().out == "Available songs:\n  c: C\n"
+    assert read_titles(str(songs_file)) == [("c", "C")]
+    assert fast_list(["-l", f"--songs={songs_file}"])
+    assert capsys.readouterr().out == "Available songs:\n  c: C\n"
+
+
+def test_titles_with_nul_are_read_one_by_one(songs_file):
+    write_songs(songs_file, [song("a", "nul\0title"), song("b")])
+    assert open_compiled(str(songs_file)).titles() == [("a", "nul\0title"), ("b", "B")]
+    assert read_titles(str(songs_file)) is None
+
+
+def test_library_titles_follow_the_manifest(tmp_path):
+    write_library([song("a"), song("b", "")], str(tmp_path))
+    assert read_titles(str(tmp_path)) == [("a", "A"), ("b", "b")]
+    library = ShardedCatalog(str(tmp_path))
+    library.update([song("c")])
+    assert read_titles(str(tmp_path / "manifest.json")) == library.titles()
+
+
+@pytest.mark.parametrize(
+    "argv, parsed",
+    [
+        (["--list"], (True, None)),
+        (["--songs", "lib", "-l"], (True, "lib")),
+        (["--songs=x.json", "--list"], (True, "x.json")),
+        (["--songs", "x.json"], (False, None)),
+        (["--list", "--songs"], (False, None)),
+        (["--list", "--songs", "--theme"], (False, None)),
+        (["--list", "--theme", "plain"], (False, None)),
+        (["song_id"], (False, None)),
+    ],
+)
+def test_parse_list_args(argv, parsed):
+    assert parse_list_args(argv) == parsed
@@ -0,0 +1,75 @@
+import json
+import wave
+
+from typewriter.validate import check_song, validate_catalog
+
+
+def write_wav(path, seconds):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(1)
+        w.setframerate(1000)
+        w.writeframes(b"\x80" * int(seconds * 1000))
+
+
+def song(song_id, lyrics=None, **fields):
+    return {"id": song_id, "audio": f"{song_id}.wav", "lyrics": lyrics or [[0.0, "hi"]], **fields}
+
+
+def write_songs(path, songs):
+    path.write_text(json.dumps({"songs": songs}), encoding="utf-8")
+
+
+def test_check_song_problems(tmp_path):
+    write_wav(tmp_path / "a.wav", 1.0)
+    assert check_song(song("a"), str(tmp_path)).ok
+    report = check_song(song("a", [[0.0, "x" * 100], [0.5, "next"], [0.2, "back"]]), str(tmp_path))
+    assert report.duration == 1.0
+    # Overruns are measured on the sorted timeline: line 0 is followed by the line at 0.2 s.
+    assert report.problems == [
+        "line 2 at 0.20s comes before line 1 at 0.50s",
+        "line 0 at 0.00s needs 3.00s to type, next line in 0.20s",
+    ]
+    bad = check_song({"lyrics": [[-1, "x"], ["1", "y"], [0.0]], "char_delay": -1}, str(tmp_path))
+    assert bad.song_id == "?"
+    assert bad.problems == [
+        "missing 'id'",
+        "'char_delay' must be a non-negative number, got -1",
+        "line 0: timestamp must be a non-negative number, got -1",
+        "line 1: timestamp must be a non-negative number, got '1'",
+        "line 2: expected [timestamp, line] or [timestamp, line, delay], got [0.0]",
+        "missing 'audio'",
+    ]
+    assert check_song(song("missing"), str(tmp_path)).problems == ["audio file 'missing.wav' not found"]
+
+
+def test_lyrics_past_the_end_of_the_audio(tmp_path):
+    write_wav(tmp_path / "a.wav", 1.0)
+    report = check_song(song("a", [[0.0, "hi"], [2.0, "late"]], char_delay=0.1), str(tmp_path))
+    assert report.problems == ["lyrics run to 2.40s but the audio is 1.00s long"]
+
+
+def test_results_are_cached_until_the_song_or_its_audio_changes(tmp_path):
+    songs_file = tmp_path / "songs.json"
+    for name in ("a", "b", "c"):
+        write_wav(tmp_path / f"{name}.wav", 1.0)
+    songs = [song("a"), song("b"), song("c")]
+    write_songs(songs_file, songs)
+    first = validate_catalog(str(songs_file), workers=1)
+    assert [(r.song_id, r.ok, r.cached) for r in first] == [(n, True, False) for n in "abc"]
+    assert all(r.cached for r in validate_catalog(str(songs_file), workers=1))
+
+    songs[1] = song("b", [[0.0, "changed"]])
+    write_songs(songs_file, songs)
+    write_wav(tmp_path / "c.wav", 2.0)
+    assert [r.cached for r in validate_catalog(str(songs_file), workers=1)] == [True, False, False]
+    assert [r.cached for r in validate_catalog(str(songs_file), workers=1)] == [True, True, True]
+    assert not any(r.cached for r in validate_catalog(str(songs_file), workers=1, use_cache=False))
+
+
+def test_duplicate_ids(tmp_path):
+    songs_file = tmp_path / "songs.json"
+    write_wav(tmp_path / "a.wav", 1.0)
+    write_songs(songs_file, [song("a"), song("a", [[0.0, "again"]])])
+    reports = validate_catalog(str(songs_file), workers=1)
+    assert [r.problems for r in reports] == [[], ["duplicate id 'a'"]]
@@ -1,15 +1,182 @@
 #!/usr/bin/env python3
 """
 Record lyric timestamps for new songs. Outputs JSON ready to paste into songs.json.
-No external dependencies. Run: python timestamp_helper.py
+
+Run: python timestamp_helper.py                          (tap ENTER as each line starts; no dependencies)
+     python timestamp_helper.py --assist song.mp3 --lyrics song.txt   (timestamps suggested from the audio)
+     python timestamp_helper.py --batch DIR                            (every DIR/name.txt with its audio file)
+     python timestamp_helper.py --tap --song my_song                   (tap SPACE per line with the song playing)
+     python timestamp_helper.py --tap --lyrics song.txt --audio song.mp3 --id my_song
+
+--assist, --batch and --tap --snap need numpy; formats other than WAV need ffmpeg on PATH.
+--tap plays the audio through pygame when it is installed and saves straight into songs.json.
 """
 
+import argparse
 import json
+import os
 import time
 import sys
 
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".ogg", ".flac", ".m4a")
+
+
+def song_entry(song_id: str, title: str, audio: str, lyrics: list, title_card: bool = True) -> dict:
+    """Return a songs.json entry; title_card puts the title on screen for the first two seconds."""
+    if title_card:
+        lyrics = [[0.0, f"🎵 {title} 🎵"], [2.0, ""]] + lyrics
+    return {
+        "id": song_id,
+        "title": title,
+        "artist": "",
+        "audio": audio,
+        "lyrics": lyrics,
+        "char_delay": 0.16,
+        "line_delay": 0.0,
+    }
+
+
+def read_lyrics_file(path: str) -> list:
+    """Return the lines of a lyrics text file (blank lines mark stanza breaks)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f.read().strip("\n").splitlines()]
+
+
+def assist(audio: str, lyrics_path: str = None, song_id: str = None, title: str = None) -> dict:
+    """Suggest timestamps for pasted (or file) lyrics from the audio's onsets; return the song entry."""
+    from typewriter.onsets import time_lyrics
+
+    if lyrics_path:
+        lines = read_lyrics_file(lyrics_path)
+    else:
+        print("Paste the lyrics, one line per lyric line, then Ctrl+D (Ctrl+Z Enter on Windows):", file=sys.stderr)
+        lines = [line.strip() for line in sys.stdin.read().strip("\n").splitlines()]
+    name = os.path.splitext(os.path.basename(audio))[0]
+    lyrics = time_lyrics(audio, lines)
+    return song_entry(song_id or name, title or name, audio, lyrics, title_card=not lyrics or lyrics[0][0] >= 2.5)
+
+
+def batch(directory: str, workers: int = None) -> list:
+    """Time every DIR/name.txt against DIR/name.<audio> on a process pool; return the song entries."""
+    from typewriter.onsets import time_lyrics_batch
+
+    jobs = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() != ".txt":
+            continue
+        audio = next((stem + e for e in AUDIO_EXTENSIONS if os.path.exists(os.path.join(directory, stem + e))), None)
+        if audio is None:
+            print(f"Skipping {name}: no audio file named {stem}.*", file=sys.stderr)
+            continue
+        jobs.append((stem, os.path.join(directory, audio), read_lyrics_file(os.path.join(directory, name))))
+
+    t0 = time.perf_counter()
+    results = time_lyrics_batch([(path, lines) for _stem, path, lines in jobs], workers)
+    songs = []
+    for (stem, path, _lines), lyrics in zip(jobs, results):
+        if isinstance(lyrics, Exception):
+            print(f"Skipping {stem}: {lyrics}", file=sys.stderr)
+            continue
+        songs.append(song_entry(stem, stem, path, lyrics, title_card=not lyrics or lyrics[0][0] >= 2.5))
+    print(f"Timed {len(songs)} of {len(jobs)} songs in {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+    return songs
+
+
+def tap(args) -> None:
+    """Tap-time a song's lines (from songs.json or a lyrics file), review them, and save to songs.json."""
+    from typewriter import tapping
+    from typewriter.keys import RawKeys
+    from typewriter.player import get_audio_path
+    from typewriter.songs_loader import get_catalog, get_song, save_song
+
+    if not sys.stdin.isatty():
+        raise ValueError("--tap reads single keypresses and needs a terminal")
+    catalog = get_catalog(args.songs)
+    song = get_song(args.song, args.songs) if args.song else None
+    if args.song and song is None:
+        raise ValueError(f"Song '{args.song}' not found in {catalog.path}")
+    if song is not None:
+        entries = [list(entry) for entry in song["lyrics"]]
+        if args.lyrics:
+            entries = [[None, line] for line in read_lyrics_file(args.lyrics)]
+        audio = args.audio or get_audio_path(song, os.path.dirname(catalog.path))
+    elif args.lyrics:
+        entries = [[None, line] for line in read_lyrics_file(args.lyrics)]
+        audio = args.audio
+    else:
+        raise ValueError("--tap needs --song ID or --lyrics FILE")
+    if not entries:
+        raise ValueError("No lyric lines to time")
+
+    player = tapping.Stopwatch()
+    if audio and not args.no_audio:
+        try:
+            player = tapping.AudioPlayer(audio)
+        except Exception as e:
+            print(f"Audio unavailable ({e}); start your player together with the timer.", file=sys.stderr)
+
+    with RawKeys() as keys:
+        if not args.nudge:
+            tapped = tapping.tap_pass(entries, player, keys, args.start)
+            print(f"Tapped {tapped} line(s).")
+            if args.snap and tapped and audio:
+                from typewriter.onsets import find_onsets, snap_timestamps
+
+                onsets = find_onsets(audio)
+                timed = [e for e in entries if e[0] is not None]
+                for entry, ts in zip(timed, snap_timestamps([e[0] for e in timed], onsets, window=0.15)):
+                    entry[0] = ts
+        if not tapping.nudge_pass(entries, player, keys):
+            print("Discarded.")
+            return
+
+    entries.sort(key=lambda e: e[0])
+    if song is not None:
+        song = dict(song, lyrics=entries)
+    else:
+        name = os.path.splitext(os.path.basename(audio or args.lyrics))[0]
+        song = song_entry(
+            args.song_id or name, args.title or name, audio or f"{name}.mp3", entries,
+            title_card=entries[0][0] >= 2.5,
+        )
+    print(f"Saved '{song['id']}' to {save_song(song, args.songs)}")
+
 
 def main() -> None:
+    """Parse arguments and run the interactive, assisted or batch mode."""
+    parser = argparse.ArgumentParser(description="Record or suggest lyric timestamps for songs.json")
+    parser.add_argument("--assist", metavar="AUDIO", help="Suggest timestamps for lyrics from this audio file")
+    parser.add_argument("--lyrics", metavar="FILE", help="With --assist/--tap: lyrics text file (default: paste on stdin)")
+    parser.add_argument("--id", dest="song_id", help="With --assist/--tap: ID of the new song (default: audio file name)")
+    parser.add_argument("--title", help="With --assist/--tap: song title (default: audio file name)")
+    parser.add_argument("--batch", metavar="DIR", help="Suggest timestamps for every DIR/name.txt with its DIR/name.<audio>")
+    parser.add_argument("--jobs", "-j", type=int, metavar="N", help="Worker processes for --batch (default: CPU count)")
+    parser.add_argument("--tap", action="store_true", help="Tap SPACE as each pre-loaded line starts, then review and save")
+    parser.add_argument("--song", metavar="ID", help="With --tap: re-time this songs.json entry")
+    parser.add_argument("--songs", metavar="FILE", help="With --tap: songs file to update (default: songs.json)")
+    parser.add_argument("--audio", metavar="PATH", help="With --tap: audio file to play (default: the song's audio)")
+    parser.add_argument("--no-audio", action="store_true", help="With --tap: don't play audio; time against a stopwatch")
+    parser.add_argument("--start", type=float, default=0.0, metavar="SECONDS", help="With --tap: start playback here")
+    parser.add_argument("--snap", action="store_true", help="With --tap: snap taps to the nearest onset (needs numpy)")
+    parser.add_argument("--nudge", action="store_true", help="With --tap: skip tapping and go straight to review")
+    args = parser.parse_args()
+
+    try:
+        if args.assist:
+            print(json.dumps(assist(args.assist, args.lyrics, args.song_id, args.title), indent=2, ensure_ascii=False))
+        elif args.batch:
+            print(json.dumps({"songs": batch(args.batch, args.jobs)}, indent=2, ensure_ascii=False))
+        elif args.tap:
+            tap(args)
+        else:
+            record()
+    except (ImportError, OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def record() -> None:
     """Run the interactive timestamp recording session."""
     print("=" * 60)
     print("TIMESTAMP HELPER")
@@ -54,24 +221,13 @@ def main() -> None:
         pass
 
     if timestamps:
-        lyrics = [[0.0, f"🎵 {title} 🎵"], [2.0, ""]]
-        for ts, lyric in timestamps:
-            lyrics.append([round(ts, 2), lyric])
-
-        song_entry = {
-            "id": song_id,
-            "title": title,
-            "artist": "",
-            "audio": audio,
-            "lyrics": lyrics,
-            "char_delay": 0.16,
-            "line_delay": 0.0,
-        }
+        lyrics = [[round(ts, 2), lyric] for ts, lyric in timestamps]
+        entry = song_entry(song_id, title, audio, lyrics)
 
         print("\n" + "=" * 60)
         print("SONG ENTRY - Add to songs.json")
         print("=" * 60)
-        print(json.dumps(song_entry, indent=2, ensure_ascii=False))
+        print(json.dumps(entry, indent=2, ensure_ascii=False))
         print()
         print("Copy the above JSON and add it to the 'songs' array in songs.json")
         print()
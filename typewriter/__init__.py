@@ -2,39 +2,63 @@
 LyricStream - Core package.
 
 Exports:
-- display: typewriter effect, themes, clear_screen
-- songs_loader: load_songs, get_song, list_songs
-- player: iter_lyrics, parse_lyric_entry, get_audio_path, get_char_delay, get_line_delay
+- display: typewriter effect, typewriter_play, atypewriter_play, TerminalRenderer, TerminalTyper, render plans, themes, clear_screen
+- models: Song, Lyrics
+- songs_loader: SongCatalog, get_catalog, load_songs, get_song, list_songs
+- clock: MonotonicClock, MixerClock, QueueClock, PausableClock, VirtualClock
+- scheduler: EventScheduler, expand_lyrics
+- player: PlaybackController, LyricTimeline, iter_lyrics, aiter_lyrics, parse_lyric_entry, get_audio_path, get_char_delay, get_line_delay
+
+Exports are imported on first access, so `import typewriter.songs_loader` (as play.py
+--list does) does not load the display and playback modules.
 """
 
+import importlib
+
 __version__ = "1.0.0"
 
-from .display import (
-    typewriter_print_with_theme,
-    clear_screen,
-    THEMES,
-    get_theme_list,
-)
-from .songs_loader import load_songs, get_song, list_songs
-from .player import (
-    iter_lyrics,
-    parse_lyric_entry,
-    get_audio_path,
-    get_char_delay,
-    get_line_delay,
-)
-
-__all__ = [
-    "typewriter_print_with_theme",
-    "clear_screen",
-    "THEMES",
-    "get_theme_list",
-    "load_songs",
-    "get_song",
-    "list_songs",
-    "iter_lyrics",
-    "parse_lyric_entry",
-    "get_audio_path",
-    "get_char_delay",
-    "get_line_delay",
-]
+_EXPORTS = {
+    "display": (
+        "typewriter_print_with_theme",
+        "typewriter_play",
+        "atypewriter_play",
+        "TerminalRenderer",
+        "TerminalTyper",
+        "RenderPlan",
+        "get_render_plan",
+        "clear_screen",
+        "THEMES",
+        "THEME_COLORS_HEX",
+        "get_theme_list",
+    ),
+    "models": ("Song", "Lyrics"),
+    "songs_loader": ("SongCatalog", "get_catalog", "load_songs", "get_song", "list_songs"),
+    "clock": ("MonotonicClock", "MixerClock", "QueueClock", "PausableClock", "VirtualClock"),
+    "scheduler": ("EventScheduler", "expand_lyrics"),
+    "player": (
+        "PlaybackController",
+        "LyricTimeline",
+        "iter_lyrics",
+        "aiter_lyrics",
+        "parse_lyric_entry",
+        "get_audio_path",
+        "get_char_delay",
+        "get_line_delay",
+    ),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name: str):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
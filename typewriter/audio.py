@@ -0,0 +1,59 @@
+"""
+Lazy access to the pygame audio stack.
+
+pygame is imported only when audio is needed, so catalog-only commands start without
+it (and without its banner). start_mixer() initialises the mixer on a background
+thread so it overlaps with catalog loading; get_mixer() waits for it.
+"""
+
+import os
+import threading
+
+from . import metrics
+
+_pygame = None
+_init_thread = None
+_init_error = None
+_lock = threading.Lock()
+
+
+def get_pygame():
+    """Import and return pygame. Raises ImportError if it is not installed."""
+    global _pygame
+    if _pygame is None:
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        with metrics.timed("audio_import_seconds"):
+            import pygame
+        _pygame = pygame
+    return _pygame
+
+
+def _init_mixer() -> None:
+    global _init_error
+    try:
+        pygame = get_pygame()
+        with metrics.timed("audio_init_seconds"):
+            pygame.mixer.init()
+    except Exception as e:
+        _init_error = e
+
+
+def start_mixer() -> None:
+    """Begin importing pygame and initialising the mixer in the background (idempotent)."""
+    global _init_thread
+    with _lock:
+        if _init_thread is None:
+            _init_thread = threading.Thread(target=_init_mixer, name="mixer-init", daemon=True)
+            _init_thread.start()
+
+
+def get_mixer():
+    """Return pygame with its mixer initialised, waiting for start_mixer() if it is running.
+
+    Raises ImportError if pygame is missing, or pygame.error if the mixer cannot start.
+    """
+    start_mixer()
+    _init_thread.join()
+    if _init_error is not None:
+        raise _init_error
+    return _pygame
@@ -0,0 +1,195 @@
+"""
+Headless lyric broadcast: one shared timeline fanned out to many TCP clients.
+
+Protocol: newline-delimited JSON over plain TCP. Each client first gets a "hello"
+snapshot (song, position, lines already shown, partially typed line) and then
+"line" / "char" / "end" events as they happen, batched per frame, and "done".
+Every client has a bounded queue; one that falls behind has its backlog replaced by
+a "resync" snapshot instead of slowing the timeline or the other clients. Each client's
+socket send buffer and transport write buffer are capped at WRITE_BUFFER_SIZE, so a
+client that stops reading blocks its own writer (and fills its queue) within a few
+frames rather than having the whole song buffered for it.
+"""
+
+import asyncio
+import json
+import socket
+from typing import Optional
+
+from . import metrics
+from .clock import MonotonicClock
+from .scheduler import CHAR, END, LINE, schedule_lyrics
+
+DEFAULT_QUEUE_SIZE = 256
+WRITE_BUFFER_SIZE = 16 * 1024
+
+
+class _Client:
+    __slots__ = ("writer", "queue", "resyncs")
+
+    def __init__(self, writer, queue_size: int):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.resyncs = 0
+
+
+class LyricBroadcaster:
+    """Runs one lyric timeline and broadcasts its events to every connected client.
+
+    queue_size is per client and at least 2: a resync snapshot and the end marker must fit.
+    """
+
+    def __init__(
+        self,
+        song: dict,
+        timeline,
+        char_delay: float,
+        start_at: float = 0.0,
+        clock=None,
+        frame_interval: float = 0.016,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        if queue_size < 2:
+            raise ValueError(f"queue_size must be at least 2, not {queue_size}")
+        self.song = song
+        self.timeline = timeline
+        self.char_delay = char_delay
+        self.start_at = start_at
+        self.clock = clock or MonotonicClock(start_at)
+        self.frame_interval = frame_interval
+        self.queue_size = queue_size
+        self.clients = set()
+        self.finished = False
+        self._first_line = timeline.index_at(start_at)
+        self._lines_done = self._first_line
+        self._partial = []
+        self._frame = []
+
+    def snapshot(self, kind: str = "hello") -> dict:
+        """Return the catch-up state for a (re)connecting client."""
+        return {
+            "type": kind,
+            "song": self.song.get("id"),
+            "title": self.song.get("title", ""),
+            "position": self.clock.position(),
+            "lines": [e[1] for e in self.timeline.entries[self._first_line:self._lines_done]],
+            "typing": "".join(self._partial),
+            "finished": self.finished,
+        }
+
+    async def handle_client(self, reader, writer) -> None:
+        """Serve one client until it disconnects or the broadcast ends."""
+        client = _Client(writer, self.queue_size)
+        _limit_write_buffer(writer)
+        client.queue.put_nowait(_encode(self.snapshot()))
+        if self.finished:
+            client.queue.put_nowait(None)
+        else:
+            self.clients.add(client)
+        try:
+            while True:
+                data = await client.queue.get()
+                if data is None:
+                    break
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    def _on_event(self, event, late) -> None:
+        if event.kind == CHAR:
+            self._partial.append(event.text)
+            self._frame.append(
+                {"type": "char", "line": event.line, "col": event.col, "t": event.deadline, "text": event.text}
+            )
+        elif event.kind == LINE:
+            self._partial = []
+            self._frame.append({"type": "line", "line": event.line, "ts": event.deadline, "text": event.text})
+        elif event.kind == END:
+            self._partial = []
+            self._lines_done = event.line + 1
+            self._frame.append({"type": "end", "line": event.line})
+
+    def _flush_frame(self) -> None:
+        if not self._frame:
+            return
+        data = b"".join(_encode(m) for m in self._frame)
+        self._frame = []
+        self.broadcast(data)
+
+    def broadcast(self, data: Optional[bytes]) -> None:
+        """Queue data for every client; a client whose queue is full gets a resync instead."""
+        for client in self.clients:
+            try:
+                client.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                _drain(client.queue)
+                client.resyncs += 1
+                metrics.inc("broadcast_resyncs")
+                client.queue.put_nowait(_encode(self.snapshot("resync")))
+                if data is None:
+                    client.queue.put_nowait(None)
+
+    async def run(self) -> None:
+        """Play the timeline to the end, then tell every client it is done."""
+        scheduler = schedule_lyrics(self.timeline, self.char_delay, self.clock, self.start_at)
+        try:
+            await scheduler.arun(self._on_event, self.frame_interval, self._flush_frame)
+        finally:
+            self.finished = True
+            self.broadcast(_encode({"type": "done"}))
+            self.broadcast(None)
+
+
+async def serve(
+    broadcaster: LyricBroadcaster,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    ready=None,
+    linger: float = 5.0,
+) -> None:
+    """Accept clients on host:port while broadcaster runs. ready(sockname) is called once listening.
+
+    After the timeline ends, waits up to linger seconds for clients to receive the rest.
+    """
+    server = await asyncio.start_server(broadcaster.handle_client, host, port, backlog=1024)
+    if ready:
+        ready(server.sockets[0].getsockname())
+    async with server:
+        await broadcaster.run()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + linger
+        while broadcaster.clients and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+
+
+def parse_address(address: str, default_host: str = "127.0.0.1") -> tuple:
+    """Parse "[host:]port" into (host, port)."""
+    host, _, port = address.rpartition(":")
+    return host or default_host, int(port)
+
+
+def _limit_write_buffer(writer, size: int = WRITE_BUFFER_SIZE) -> None:
+    """Cap how much is buffered for one client, so drain() waits as soon as it stops reading."""
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, size)
+        except OSError:
+            pass
+    writer.transport.set_write_buffer_limits(high=size)
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _drain(q: asyncio.Queue) -> None:
+    try:
+        while True:
+            q.get_nowait()
+    except asyncio.QueueEmpty:
+        pass
@@ -0,0 +1,580 @@
+"""
+LyricStream - CLI (run through play.py).
+
+Plays audio with synced typewriter lyrics. Typing speed from songs.json.
+Kept in the package rather than in play.py so its bytecode is cached: a script is
+recompiled on every run, which was a large share of --list's startup.
+Usage: python play.py [song_id ...] [--start 0] [--theme plain] | python play.py --list
+       python play.py --search "words from a line"
+       python play.py --import lyrics_dir/ | python play.py --export out_dir/ --format srt
+       python play.py --shard library/ | python play.py --songs library/ --list
+"""
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+from . import audio, metrics
+from .songs_loader import get_catalog
+from .themes import get_theme_list
+from .titles import format_listing, parse_list_args
+
+# Playback modules (display, player, clock) are imported where they are used, so
+# catalog-only commands such as --list start without them.
+
+
+SEEK_STEP = 5.0
+SEEK_JUMP = 30.0
+
+
+def _project_root() -> str:
+    """Return the project root directory (where play.py lives)."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_timeline(song: dict):
+    """Return the song's lyric timeline (mmap-backed for songs from the compiled file)."""
+    from .playlist import load_timeline
+
+    return load_timeline(song)
+
+
+def _list_titles(catalog) -> list:
+    """Return [(id, title), ...], from the compiled timeline.
+
+    The timeline is rebuilt first if songs.json changed, so after an edit only the first
+    --list parses the JSON; later ones read the titles block from the mmap'd file.
+    Libraries and unreadable timelines are listed from the catalog.
+    """
+    from .compiled import open_compiled
+
+    try:
+        return open_compiled(catalog.path).titles()
+    except (OSError, ValueError):
+        return catalog.titles()
+
+
+def _print_titles(catalog) -> None:
+    """Print the catalog's songs for --list, or exit with an error if there are none."""
+    songs = _list_titles(catalog)
+    if not songs:
+        print("No songs found. Add songs to songs.json")
+        sys.exit(1)
+    sys.stdout.write(format_listing(songs))
+
+
+def _fast_list(argv: list) -> bool:
+    """Run `--list [--songs FILE]` without argparse and return True; return False for anything else.
+
+    Importing argparse and building the parser is a large share of --list's startup, and
+    listing needs neither. Any other argument (or spelling) goes through the full parser.
+    """
+    listing, songs_file = parse_list_args(argv)
+    if listing:
+        _print_titles(get_catalog(songs_file))
+    return listing
+
+
+def _song_finder(catalog):
+    """Return (find(song_id), first song id or None) for the songs to play.
+
+    Songs come from the compiled timeline (rebuilt first if songs.json changed), so
+    playing one song reads its row and lyrics from the mmap'd file instead of parsing
+    songs.json; libraries and unreadable timelines fall back to the catalog.
+    """
+    from .compiled import open_compiled
+
+    try:
+        compiled = open_compiled(catalog.path)
+    except (OSError, ValueError):
+        titles = catalog.titles()
+        return catalog.get, titles[0][0] if titles else None
+    return compiled.song, compiled.id_at(0) if compiled.n_songs else None
+
+
+def _songs_root(songs_file: str = None) -> str:
+    """Return the directory audio paths are relative to (a library's own directory for libraries)."""
+    return os.path.dirname(get_catalog(songs_file).path) if songs_file else _project_root()
+
+
+def _get_mixer():
+    """Return pygame with the mixer initialised, or exit with an error message."""
+    try:
+        return audio.get_mixer()
+    except ImportError:
+        print("Error: pygame is not installed.")
+        print("Run: source .venv/bin/activate && pip install pygame")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error playing audio: {e}")
+        sys.exit(1)
+
+
+@contextmanager
+def _seek_keys(controller):
+    """While active, seek with the arrow keys (LEFT/RIGHT 5 s, DOWN/UP 30 s); q stops.
+
+    Keys are read on a background thread in cbreak mode; does nothing unless stdin is a terminal.
+    """
+    if not sys.stdin.isatty():
+        yield
+        return
+    from .keys import DOWN, ESC, LEFT, RIGHT, UP, RawKeys
+
+    steps = {LEFT: -SEEK_STEP, RIGHT: SEEK_STEP, DOWN: -SEEK_JUMP, UP: SEEK_JUMP}
+    done = threading.Event()
+
+    def watch(keys):
+        while not done.is_set() and not controller.stopped:
+            key = keys.read(0.1)
+            if key in steps:
+                position = controller.position()
+                if position is not None:
+                    controller.seek(max(0.0, position + steps[key]))
+            elif key in ("q", ESC):
+                controller.stop()
+
+    with RawKeys() as keys:
+        thread = threading.Thread(target=watch, args=(keys,), name="seek-keys", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+
+def _print_banner(title: str) -> None:
+    print("=" * 50)
+    print("Playing:", title)
+    if sys.stdin.isatty():
+        print("(←/→ seek 5 s, ↓/↑ 30 s, q stop)")
+    print("=" * 50)
+    print()
+
+
+def play_song(song: dict, start_at: float = 0.0, theme: str = "plain", songs_file: str = None) -> None:
+    """Play a song with synced typewriter lyrics. Typing speed from song's char_delay."""
+    from .clock import MixerClock
+    from .display import clear_screen, get_render_plan, typewriter_play
+    from .player import PlaybackController, get_audio_path, get_char_delay
+
+    audio_path = get_audio_path(song, _songs_root(songs_file))
+
+    if not os.path.exists(audio_path):
+        print(f"Error: Audio file '{song['audio']}' not found.")
+        sys.exit(1)
+
+    delay = get_char_delay(song, None)
+    timeline = _load_timeline(song)
+
+    clear_screen()
+    pygame = _get_mixer()
+
+    try:
+        with metrics.timed("audio_load_seconds"):
+            pygame.mixer.music.load(audio_path)
+        with metrics.timed("audio_play_seconds"):
+            pygame.mixer.music.play(start=start_at)
+        clock = MixerClock(start_at, pygame.mixer.music)
+        controller = PlaybackController(clock, on_seek=lambda position: pygame.mixer.music.play(start=position))
+        controller.play()
+
+        _print_banner(song.get("title", song["audio"]))
+
+        plan = get_render_plan(song, timeline, delay, theme)
+        with _seek_keys(controller):
+            typewriter_play(
+                timeline, delay, theme, clock, start_at, controller=controller, plan=plan,
+                linger=pygame.mixer.music.get_busy,
+            )
+
+        if controller.stopped:
+            pygame.mixer.music.stop()
+            print("\nStopped by user")
+            return
+        print("\n🎉 Song finished! 🎉")
+
+    except pygame.error as e:
+        print(f"Error playing audio: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n\nStopped by user")
+        pygame.mixer.music.stop()
+        sys.exit(0)
+
+
+def play_playlist(songs: list, start_at: float = 0.0, theme: str = "plain", songs_file: str = None) -> None:
+    """Play songs back to back without gaps, typing each song's lyrics as its track plays.
+
+    The first song starts at start_at; songs whose audio is missing are skipped.
+    """
+    from .display import clear_screen, get_render_plan, typewriter_play
+    from .player import PlaybackController
+    from .playlist import PlaylistPlayer
+
+    clear_screen()
+    pygame = _get_mixer()
+    controller = PlaybackController()
+    controller.play()
+    player = PlaylistPlayer(songs, _songs_root(songs_file), pygame.mixer.music, controller)
+
+    def on_song(index, prepared):
+        print()
+        _print_banner(f"{index + 1}/{len(songs)}: {prepared.song.get('title', prepared.song['audio'])}")
+
+    def on_error(song, error):
+        print(f"\nSkipping '{song['id']}': cannot read audio file '{song.get('audio')}' ({error.strerror}).")
+
+    def play_lyrics(prepared, clock, start_at, stop_check):
+        plan = get_render_plan(prepared.song, prepared.timeline, prepared.char_delay, theme)
+        typewriter_play(
+            prepared.timeline, prepared.char_delay, theme, clock, start_at, stop_check,
+            controller=controller, plan=plan, linger=lambda: controller.paused or pygame.mixer.music.get_busy(),
+        )
+
+    try:
+        with _seek_keys(controller):
+            player.run(play_lyrics, start_at, on_song, on_error)
+        if controller.stopped:
+            print("\nStopped by user")
+            return
+        print("\n🎉 Playlist finished! 🎉")
+    except pygame.error as e:
+        print(f"Error playing audio: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        controller.stop()
+        pygame.mixer.music.stop()
+        print("\n\nStopped by user")
+        sys.exit(0)
+
+
+def serve_song(song: dict, address: str, start_at: float = 0.0) -> None:
+    """Broadcast a song's lyric timeline to TCP clients, without audio."""
+    import asyncio
+    from .broadcast import LyricBroadcaster, parse_address, serve
+    from .player import get_char_delay
+
+    host, port = parse_address(address)
+    broadcaster = LyricBroadcaster(song, _load_timeline(song), get_char_delay(song, None), start_at)
+
+    def ready(sockname):
+        print(f"Broadcasting '{song.get('title', song['id'])}' on {sockname[0]}:{sockname[1]} (Ctrl+C to stop)")
+
+    try:
+        asyncio.run(serve(broadcaster, host, port, ready))
+    except KeyboardInterrupt:
+        print("\nStopped by user")
+
+
+def simulate_songs(songs: list, out_path: str, theme: str = "plain", start_at: float = 0.0) -> bool:
+    """Simulate songs on a virtual clock, writing their event streams to out_path ("-" = stdout).
+
+    Prints a summary per song and returns False if any song has lines whose typing
+    overruns the next line.
+    """
+    out = sys.stdout if out_path == "-" else open(out_path, "w", encoding="utf-8")
+    log = sys.stderr if out_path == "-" else sys.stdout
+    from .simulate import simulate_song
+
+    clean = True
+    try:
+        for song in songs:
+            timeline = _load_timeline(song)
+            report = simulate_song(song, out, theme, start_at, timeline)
+            print(
+                f"{report.song_id}: {report.lines} lines, {report.events} events, "
+                f"{report.duration:.2f} s of song in {report.wall_time * 1e3:.1f} ms",
+                file=log,
+            )
+            for index, ts, needed, available in report.overruns:
+                clean = False
+                print(
+                    f"  overrun: line {index} at {ts:.2f}s needs {needed:.2f}s to type, "
+                    f"next line in {available:.2f}s: {timeline[index][1]!r}",
+                    file=log,
+                )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return clean
+
+
+def validate_songs(songs_file: str = None, jobs: int = None) -> bool:
+    """Validate the catalog, printing each song's problems. Returns False if there are any."""
+    from .validate import validate_catalog
+
+    reports = validate_catalog(songs_file, jobs)
+    bad = [r for r in reports if r.problems]
+    for report in bad:
+        print(f"{report.song_id}:")
+        for problem in report.problems:
+            print(f"  {problem}")
+    cached = sum(r.cached for r in reports)
+    print(f"{len(reports)} songs checked ({cached} unchanged since the last run), {len(bad)} with problems")
+    return not bad
+
+
+def import_songs(paths: list, songs_file: str = None, jobs: int = None) -> bool:
+    """Import LRC/SRT files into the catalog, printing a summary. Returns False if any file failed."""
+    from .lyricfiles import import_lyrics
+
+    result = import_lyrics(paths, songs_file, jobs)
+    _print_skipped(result.failed)
+    print(
+        f"Imported {result.added + result.replaced} songs ({result.added} new, {result.replaced} replaced) "
+        f"in {result.seconds:.1f} s, {len(result.failed)} skipped"
+    )
+    return not result.failed
+
+
+def export_songs(songs: list, directory: str, fmt: str) -> bool:
+    """Write songs to directory as LRC or SRT files. Returns False if any could not be written."""
+    from .lyricfiles import export_lyrics
+
+    written, failed = export_lyrics(songs, directory, fmt)
+    _print_skipped(failed)
+    print(f"Exported {len(written)} songs to {directory}, {len(failed)} skipped")
+    return not failed
+
+
+def _print_skipped(failed: list, limit: int = 20) -> None:
+    for message in failed[:limit]:
+        print(f"  skipped {message}")
+    if len(failed) > limit:
+        print(f"  ... and {len(failed) - limit} more")
+
+
+def search_songs(query: str, songs_file: str = None, limit: int = 20) -> list:
+    """Print the lyric lines matching query, numbered, and return them."""
+    from .search import search_lyrics
+
+    hits = search_lyrics(query, songs_file, limit)
+    for n, hit in enumerate(hits, 1):
+        minutes, seconds = divmod(hit.timestamp, 60)
+        print(f"{n:3}. {hit.song_id} [{int(minutes):02d}:{seconds:05.2f}] {hit.line}")
+    return hits
+
+
+def main() -> None:
+    """Parse CLI arguments and run the player."""
+    if _fast_list(sys.argv[1:]):
+        return
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="LyricStream - Synced lyrics with audio"
+    )
+    parser.add_argument(
+        "song",
+        nargs="*",
+        help="Song ID(s) from songs.json; several play back to back without gaps. Omitted = play first song.",
+    )
+    parser.add_argument(
+        "--start", "-s",
+        type=float,
+        default=0.0,
+        help="Start position in seconds (default: 0)",
+    )
+    parser.add_argument(
+        "--theme", "-t",
+        choices=get_theme_list(),
+        default="plain",
+        help="Display theme (default: plain)",
+    )
+    parser.add_argument(
+        "--list", "-l",
+        action="store_true",
+        help="List available songs and exit",
+    )
+    parser.add_argument(
+        "--search",
+        metavar="QUERY",
+        help="List lyric lines containing every word of QUERY; in a terminal, pick one to play from it",
+    )
+    parser.add_argument(
+        "--songs",
+        metavar="FILE",
+        help="Songs file or sharded library directory to use (default: songs.json in the project root)",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Compile songs.json into the binary lyric timeline and exit",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="DIR",
+        help="Write the songs as a sharded library in DIR (lyrics loaded per song; use with --songs DIR) and exit",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check every song (entries, timing, audio files) and exit; status 1 if any has problems",
+    )
+    parser.add_argument(
+        "--import",
+        dest="import_paths",
+        nargs="+",
+        metavar="PATH",
+        help="Import .lrc/.srt files (or directories of them) into the songs file and exit",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="DIR",
+        help="Write the given songs (default: all) to DIR as lyric files and exit",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["lrc", "srt"],
+        default="lrc",
+        help="Lyric file format for --export (default: lrc)",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        metavar="N",
+        help="Worker processes for --validate and --import (default: CPU count)",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="[HOST:]PORT",
+        help="Headless: broadcast lyrics to TCP clients as JSON lines instead of playing",
+    )
+    parser.add_argument(
+        "--simulate",
+        metavar="OUT",
+        help="Run playback on a virtual clock without audio and write the event stream to OUT (- for stdout)",
+    )
+    parser.add_argument(
+        "--all", "-a",
+        action="store_true",
+        help="Play (or with --simulate, simulate) every song in the catalog, back to back",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="TARGET",
+        help="Record playback metrics and write them on exit to a file or tcp://host:port / udp://host:port",
+    )
+    parser.add_argument(
+        "--metrics-format",
+        choices=["prometheus", "jsonl"],
+        default="prometheus",
+        help="Metrics export format (default: prometheus)",
+    )
+    args = parser.parse_args()
+
+    if not (
+        args.list or args.compile or args.validate or args.serve or args.simulate or args.search
+        or args.import_paths or args.export or args.shard
+    ):
+        audio.start_mixer()
+
+    if args.metrics:
+        metrics.enable()
+        try:
+            _run(args)
+        finally:
+            metrics.export(args.metrics, args.metrics_format)
+    else:
+        _run(args)
+
+
+def _run(args) -> None:
+    """Run the command selected by the parsed arguments."""
+    catalog = get_catalog(args.songs)
+
+    if args.compile:
+        from .compiled import compile_catalog
+
+        try:
+            print("Compiled:", compile_catalog(catalog.path))
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    if args.shard:
+        from .library import write_library
+
+        print("Library:", write_library(catalog.songs(), args.shard))
+        return
+
+    if args.validate:
+        if not validate_songs(args.songs, args.jobs):
+            sys.exit(1)
+        return
+
+    if args.import_paths:
+        if not import_songs(args.import_paths, args.songs, args.jobs):
+            sys.exit(1)
+        return
+
+    if args.export:
+        songs = [catalog.get(song_id) for song_id in args.song] if args.song else catalog.songs()
+        missing = [song_id for song_id, song in zip(args.song, songs) if song is None]
+        if missing:
+            print(f"Error: Song '{missing[0]}' not found.")
+            sys.exit(1)
+        if not export_songs(songs, args.export, args.format):
+            sys.exit(1)
+        return
+
+    if args.list:
+        _print_titles(catalog)
+        return
+
+    if args.search:
+        hits = search_songs(args.search, args.songs)
+        if not hits:
+            print("No matching lyrics.")
+            sys.exit(1)
+        if not sys.stdin.isatty():
+            return
+        choice = input(f"Play which (1-{len(hits)}, ENTER to quit)? ").strip()
+        if not choice.isdigit() or not 1 <= int(choice) <= len(hits):
+            return
+        hit = hits[int(choice) - 1]
+        play_song(catalog.get(hit.song_id), start_at=hit.timestamp, theme=args.theme, songs_file=args.songs)
+        return
+
+    if args.all:
+        songs = catalog.songs()
+        first = songs[0]["id"] if songs else None
+    else:
+        find, first = _song_finder(catalog)
+    if first is None:
+        print("Error: No songs in songs.json")
+        sys.exit(1)
+
+    if not args.all:
+        selected = []
+        for song_id in args.song or [first]:
+            song = find(song_id)
+            if song is None:
+                print(f"Error: Song '{song_id}' not found.")
+                print("Use --list to see available songs.")
+                sys.exit(1)
+            selected.append(song)
+        songs = selected
+
+    if args.simulate:
+        if not simulate_songs(songs, args.simulate, args.theme, args.start):
+            sys.exit(1)
+        return
+
+    if args.serve:
+        if len(songs) > 1:
+            print("Error: --serve broadcasts a single song.")
+            sys.exit(1)
+        serve_song(songs[0], args.serve, start_at=args.start)
+        return
+
+    if len(songs) > 1:
+        play_playlist(songs, start_at=args.start, theme=args.theme, songs_file=args.songs)
+        return
+
+    play_song(songs[0], start_at=args.start, theme=args.theme, songs_file=args.songs)
+
@@ -0,0 +1,214 @@
+"""
+Song clocks: where playback is in the song, in seconds.
+
+Every clock has position() -> float. Lyric deadlines are absolute song positions, so
+whatever drift the clock sees (audio buffering, stalls, pauses) is corrected on the next read.
+"""
+
+import time
+from typing import Callable, Optional
+
+
+class MonotonicClock:
+    """Song position from time.monotonic(), immune to wall-clock (NTP) adjustments."""
+
+    def __init__(self, start_at: float = 0.0):
+        self._origin = time.monotonic() - start_at
+
+    def position(self) -> float:
+        return time.monotonic() - self._origin
+
+    def seek(self, position: float) -> None:
+        self._origin = time.monotonic() - position
+
+
+class MixerClock:
+    """Song position from pygame.mixer.music.get_pos() plus the start offset.
+
+    get_pos() only advances once per audio buffer, so between updates the position is
+    interpolated with time.monotonic() for at most max_interpolation seconds; past that
+    the audio is assumed stalled or paused and the clock holds.
+
+    pause() holds the position where it is; resume() re-anchors to get_pos(), which froze
+    with the music, so no pause offset (and no interpolation error) carries over.
+    """
+
+    def __init__(self, start_at: float = 0.0, music=None, max_interpolation: float = 0.05):
+        if music is None:
+            import pygame
+            music = pygame.mixer.music
+        self._music = music
+        self.start_at = start_at
+        self.max_interpolation = max_interpolation
+        self._last_ms = None
+        self._anchor = 0.0
+        self._last_position = start_at
+        self._paused_at = None
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def position(self) -> float:
+        if self._paused_at is not None:
+            return self._paused_at
+        ms = self._music.get_pos()
+        now = time.monotonic()
+        if ms < 0:
+            return self._last_position
+        if ms != self._last_ms:
+            self._last_ms = ms
+            self._anchor = now
+        position = self.start_at + ms / 1000.0 + min(now - self._anchor, self.max_interpolation)
+        if position > self._last_position:
+            self._last_position = position
+        return self._last_position
+
+    def seek(self, position: float) -> None:
+        """Re-anchor after the music was repositioned (play(start=...) or set_pos)."""
+        ms = self._music.get_pos()
+        self.start_at = position - max(ms, 0) / 1000.0
+        self._last_ms = None
+        self._last_position = position
+        if self._paused_at is not None:
+            self._paused_at = position
+
+    def pause(self) -> None:
+        if self._paused_at is None:
+            self._paused_at = self.position()
+
+    def resume(self) -> None:
+        if self._paused_at is not None:
+            self._last_ms = None
+            self._paused_at = None
+
+
+class QueueClock(MixerClock):
+    """MixerClock that follows pygame.mixer.music across queued tracks.
+
+    pygame restarts get_pos() from 0 when a queued track takes over, so a drop of more
+    than switch_threshold seconds is taken as the switch: track is incremented and the
+    position restarts from 0 in the new track.
+    """
+
+    def __init__(
+        self,
+        start_at: float = 0.0,
+        music=None,
+        max_interpolation: float = 0.05,
+        switch_threshold: float = 0.5,
+    ):
+        super().__init__(start_at, music, max_interpolation)
+        self.switch_threshold = switch_threshold
+        self.track = 0
+
+    def position(self) -> float:
+        last_ms = self._last_ms
+        if last_ms is not None and self._paused_at is None and 0 <= self._music.get_pos() < last_ms - self.switch_threshold * 1000:
+            self.next_track()
+        return super().position()
+
+    def next_track(self, start_at: float = 0.0) -> None:
+        """Count a new track, positioned at start_at (called by position() on a queue switch)."""
+        self.track += 1
+        self.start_at = start_at
+        self._last_ms = None
+        self._last_position = start_at
+
+
+class VirtualClock:
+    """Simulated song time: sleeping through it advances it instantly.
+
+    oversleep is added to every sleep to model a late-waking scheduler.
+    """
+
+    def __init__(self, start_at: float = 0.0, oversleep: float = 0.0):
+        self._position = start_at
+        self.oversleep = oversleep
+
+    def position(self) -> float:
+        return self._position
+
+    def seek(self, position: float) -> None:
+        self._position = position
+
+    def sleep(self, seconds: float) -> None:
+        self._position += seconds + self.oversleep
+
+    def advance(self, seconds: float) -> None:
+        """Move time forward by seconds (e.g. to charge simulated work)."""
+        self._position += seconds
+
+
+class PausableClock:
+    """Wraps another clock and freezes its position while paused.
+
+    For clocks that keep running through a pause (MonotonicClock); mixer clocks stop with
+    the music and pause themselves, so they are not wrapped.
+    """
+
+    def __init__(self, clock):
+        self._clock = clock
+        self._offset = 0.0
+        self._paused_at = None
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def position(self) -> float:
+        if self._paused_at is not None:
+            return self._paused_at
+        return self._clock.position() - self._offset
+
+    def pause(self) -> None:
+        if self._paused_at is None:
+            self._paused_at = self.position()
+
+    def resume(self) -> None:
+        if self._paused_at is not None:
+            self._offset = self._clock.position() - self._paused_at
+            self._paused_at = None
+
+    def seek(self, position: float) -> None:
+        if self._paused_at is not None:
+            self._paused_at = position
+        self._clock.seek(position)
+        self._offset = 0.0
+
+
+def wait_until(
+    clock,
+    deadline: float,
+    stop_check: Optional[Callable[[], bool]] = None,
+    poll_interval: float = 0.05,
+) -> bool:
+    """Sleep until clock reaches deadline, re-reading the clock after every sleep.
+
+    Sleeps the whole remaining time in one call; only when stop_check is given or the
+    clock is paused are sleeps capped at poll_interval. Clocks with their own sleep()
+    (VirtualClock) are slept on directly. Returns False if stopped first.
+    """
+    sleep = getattr(clock, "sleep", time.sleep)
+    while True:
+        if stop_check and stop_check():
+            return False
+        remaining = deadline - clock.position()
+        if remaining <= 0:
+            return True
+        if stop_check or getattr(clock, "paused", False):
+            remaining = min(remaining, poll_interval)
+        sleep(remaining)
+
+
+async def async_wait_until(clock, deadline: float, poll_interval: float = 0.05) -> None:
+    """asyncio counterpart of wait_until; cancel the awaiting task to stop."""
+    import asyncio
+
+    while True:
+        remaining = deadline - clock.position()
+        if remaining <= 0:
+            return
+        if getattr(clock, "paused", False):
+            remaining = min(remaining, poll_interval)
+        await asyncio.sleep(remaining)
@@ -0,0 +1,367 @@
+"""
+Compiled lyric timelines: songs.json packed into one binary file that is mmap'd at play time.
+
+Layout (native byte order, all sections 8-byte aligned):
+    header     magic, version, source mtime/size, song/entry/string counts, titles size
+    songs      n_songs x (id, title, artist, audio string indexes u32, first entry u32,
+               entry count u32, char_delay f64, line_delay f64); NO_STRING / NaN = not set
+    order      n_songs x u32: song rows sorted by id (UTF-8 bytes), for binary search
+    titles     UTF-8 "id\0title\0id\0title...", for listing in one decode (empty if an
+               id or title contains NUL; titles() then reads the strings one by one)
+    timestamps n_entries x float64, sorted within each song
+    delays     n_entries x float64 (NaN = use the song's line_delay)
+    offsets    (n_strings + 1) x uint64 into the blob
+    blob       UTF-8 ids, titles, artists and audio paths, then every lyric line in entry order
+
+Opening the file reads only the header: a song is found by binary search over order and
+built from its row (song()), with lyrics that are views into the mapping; a lyric line is
+decoded only when it is read. The file is a cache next to songs.json and is rebuilt only
+when the JSON's mtime or size changes. Sharded libraries (library.py) are not compiled:
+they already read lyrics per song.
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+from array import array
+from typing import Dict, Optional
+
+from .models import Lyrics, Song
+from .songs_loader import SongCatalog, get_catalog, _file_stamp
+from .titles import BYTE_ORDER as _BYTE_ORDER
+from .titles import HEADER as _HEADER
+from .titles import SONG as _SONG
+from .titles import COMPILED_SUFFIX, MAGIC, VERSION, compiled_path, pack_titles, unpack_titles
+from .titles import padded as _padded
+
+NO_STRING = 0xFFFFFFFF
+
+
+def compile_catalog(songs_file: str = None, out_path: str = None) -> str:
+    """Compile songs_file into the binary timeline format. Returns the output path."""
+    catalog = get_catalog(songs_file)
+    if not isinstance(catalog, SongCatalog):
+        raise ValueError(f"{catalog.path} is a sharded library; its lyrics are read per song, not compiled")
+    stamp = _file_stamp(catalog.path)
+    if stamp is None:
+        raise FileNotFoundError(catalog.path)
+    out_path = out_path or compiled_path(catalog.path)
+    data = _pack(catalog, stamp)
+
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def _pack(catalog: SongCatalog, stamp: tuple) -> bytes:
+    """Serialize every song's metadata and lyrics into the compiled layout."""
+    songs = [s for s in catalog.songs() if "id" in s]
+    n = len(songs)
+    timestamps = array("d")
+    delays = array("d")
+    strings = [s["id"].encode("utf-8") for s in songs]
+    strings += [s.get("title", s["id"]).encode("utf-8") for s in songs]
+    artists = [s.get("artist") for s in songs]
+    audios = [s.get("audio") for s in songs]
+    strings += [(value if isinstance(value, str) else "").encode("utf-8") for value in artists + audios]
+    table = bytearray()
+
+    for i, song in enumerate(songs):
+        lyrics = song.get("lyrics", [])
+        table += _SONG.pack(
+            i, n + i,
+            2 * n + i if isinstance(artists[i], str) else NO_STRING,
+            3 * n + i if isinstance(audios[i], str) else NO_STRING,
+            len(timestamps), len(lyrics),
+            _number(song.get("char_delay")), _number(song.get("line_delay")),
+        )
+        if isinstance(lyrics, Lyrics):
+            entries = zip(
+                lyrics.timestamps, lyrics.lines,
+                lyrics.delays if lyrics.delays is not None else array("d", [math.nan]) * len(lyrics),
+            )
+        else:
+            entries = (
+                (float(e[0]), e[1], float(e[2]) if len(e) == 3 else math.nan) for e in lyrics
+            )
+        # Stable, like LyricTimeline's sort: timelines can use the stored order as is.
+        for ts, line, delay in sorted(entries, key=lambda e: e[0]):
+            timestamps.append(ts)
+            delays.append(delay)
+            strings.append(line.encode("utf-8"))
+
+    # A repeated id resolves to its last song, as in SongCatalog.
+    order = array("I", sorted(range(n), key=lambda i: (strings[i], -i)))
+    titles = pack_titles([s["id"] for s in songs], [s.get("title", s["id"]) for s in songs])
+    offsets = array("Q", [0])
+    for b in strings:
+        offsets.append(offsets[-1] + len(b))
+
+    header = _HEADER.pack(
+        MAGIC, VERSION, _BYTE_ORDER, stamp[0], stamp[1], n, len(timestamps), len(strings), len(titles)
+    )
+    parts = [
+        header, _pad(table), _pad(order.tobytes()), _pad(titles),
+        timestamps.tobytes(), delays.tobytes(), offsets.tobytes(),
+    ]
+    parts.extend(strings)
+    return b"".join(parts)
+
+
+def _number(value) -> float:
+    """Return value as a float, or NaN if it is not a number."""
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+
+def _pad(b) -> bytes:
+    """Pad b with zeros to a multiple of 8 bytes."""
+    return bytes(b) + b"\0" * (-len(b) % 8)
+
+
+class CompiledCatalog:
+    """Read-only, mmap-backed view of a compiled timeline file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+
+        magic, version, order, mtime_ns, size, n_songs, n_entries, n_strings, titles_size = _HEADER.unpack_from(
+            self._buf
+        )
+        if magic != MAGIC or version != VERSION or order != _BYTE_ORDER:
+            self.close()
+            raise ValueError(f"{path}: not a compatible compiled timeline")
+        self.source_stamp = (mtime_ns, size)
+        self.n_songs = n_songs
+
+        pos = _HEADER.size
+        self._table = self._buf[pos:pos + n_songs * _SONG.size]
+        pos += _padded(len(self._table))
+        self._order = self._buf[pos:pos + 4 * n_songs].cast("I")
+        pos += _padded(4 * n_songs)
+        self._titles = self._buf[pos:pos + titles_size]
+        pos += _padded(titles_size)
+        self.timestamps = self._buf[pos:pos + 8 * n_entries].cast("d")
+        pos += 8 * n_entries
+        self.delays = self._buf[pos:pos + 8 * n_entries].cast("d")
+        pos += 8 * n_entries
+        self._offsets = self._buf[pos:pos + 8 * (n_strings + 1)].cast("Q")
+        pos += 8 * (n_strings + 1)
+        self._blob = self._buf[pos:]
+
+    def string_bytes(self, index: int) -> memoryview:
+        """Return the UTF-8 bytes of string index as a zero-copy view into the file."""
+        return self._blob[self._offsets[index]:self._offsets[index + 1]]
+
+    def string(self, index: int) -> str:
+        """Return string index decoded."""
+        return str(self.string_bytes(index), "utf-8")
+
+    def find(self, song_id: str) -> Optional[int]:
+        """Return song_id's row, by binary search over the id order, or None if not in the file."""
+        target = song_id.encode("utf-8")
+        order = self._order
+        # By hand rather than bisect_left(key=...), which needs Python 3.10.
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.string_bytes(order[mid]).tobytes() < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and self.string_bytes(order[lo]) == target:
+            return order[lo]
+        return None
+
+    def id_at(self, row: int) -> str:
+        """Return the id of the song in row (file order)."""
+        return self.string(row)
+
+    def ids(self) -> list:
+        """Return the song IDs in the file."""
+        return [self.string(i) for i in range(self.n_songs)]
+
+    def titles(self) -> list:
+        """Return [(id, title), ...] for all songs, like SongCatalog.titles(), decoding the titles block once."""
+        n = self.n_songs
+        if not len(self._titles):
+            return [(self.string(i), self.string(n + i)) for i in range(n)]
+        return unpack_titles(self._titles)
+
+    def lyrics(self, song_id: str) -> Optional["CompiledLyrics"]:
+        """Return the compiled lyrics of song_id, or None if not in the file."""
+        row = self.find(song_id)
+        if row is None:
+            return None
+        first, count = _SONG.unpack_from(self._table, row * _SONG.size)[4:6]
+        return CompiledLyrics(self, first, count)
+
+    def song(self, song_id: str) -> Optional[Song]:
+        """Return song_id as a Song whose lyrics are CompiledLyrics, or None if not in the file.
+
+        Only the songs.json fields playback uses are stored (no unknown keys).
+        """
+        row = self.find(song_id)
+        if row is None:
+            return None
+        _id, title, artist, audio, first, count, char_delay, line_delay = _SONG.unpack_from(
+            self._table, row * _SONG.size
+        )
+        return Song(
+            song_id, self.string(title),
+            self.string(artist) if artist != NO_STRING else None,
+            self.string(audio) if audio != NO_STRING else None,
+            CompiledLyrics(self, first, count),
+            None if math.isnan(char_delay) else char_delay,
+            None if math.isnan(line_delay) else line_delay,
+        )
+
+    def close(self) -> None:
+        """Release the mapping. Views handed out earlier must not be used afterwards."""
+        for view in ("timestamps", "delays", "_offsets", "_titles", "_order", "_table", "_blob", "_buf"):
+            mv = getattr(self, view, None)
+            if mv is not None:
+                mv.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CompiledLyrics:
+    """One song's lyrics from a CompiledCatalog, indexable like the JSON lyrics list.
+
+    Entries are in timestamp order; lines stay UTF-8 in the mapping until read.
+    """
+
+    __slots__ = ("_catalog", "_first", "_count", "_string_base")
+
+    def __init__(self, catalog: CompiledCatalog, first: int, count: int):
+        self._catalog = catalog
+        self._first = first
+        self._count = count
+        self._string_base = 4 * catalog.n_songs + first
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> tuple:
+        """Return (timestamp, line) or (timestamp, line, delay), like a songs.json entry."""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        ts = self._catalog.timestamps[self._first + i]
+        line = self.line(i)
+        delay = self._catalog.delays[self._first + i]
+        return (ts, line) if math.isnan(delay) else (ts, line, delay)
+
+    def entry(self, i: int, default_line_delay: float = 0.0) -> tuple:
+        """Return (timestamp, line, delay) for entry i, with default_line_delay filled in."""
+        delay = self._catalog.delays[self._first + i]
+        return (
+            self._catalog.timestamps[self._first + i],
+            self.line(i),
+            default_line_delay if math.isnan(delay) else delay,
+        )
+
+    def entries(self, default_line_delay: float = 0.0) -> "CompiledEntries":
+        """Return the entries as a sequence of (timestamp, line, delay) that decodes lines on access."""
+        return CompiledEntries(self, default_line_delay)
+
+    @property
+    def timestamps(self) -> memoryview:
+        """Timestamps of this song's entries (float64 view into the file)."""
+        return self._catalog.timestamps[self._first:self._first + self._count]
+
+    def line(self, i: int) -> str:
+        """Return lyric line i."""
+        return self._catalog.string(self._string_base + i)
+
+    def line_bytes(self, i: int) -> memoryview:
+        """Return lyric line i as zero-copy UTF-8 bytes."""
+        return self._catalog.string_bytes(self._string_base + i)
+
+    def to_list(self) -> list:
+        """Return the entries as songs.json lists."""
+        return [list(self[i]) for i in range(self._count)]
+
+
+class CompiledEntries:
+    """A CompiledLyrics' (timestamp, line, delay) entries as a read-only sequence."""
+
+    __slots__ = ("_lyrics", "_default")
+
+    def __init__(self, lyrics: CompiledLyrics, default_line_delay: float):
+        self._lyrics = lyrics
+        self._default = default_line_delay
+
+    def __len__(self) -> int:
+        return len(self._lyrics)
+
+    def __getitem__(self, i):
+        n = len(self._lyrics)
+        if isinstance(i, slice):
+            return [self._lyrics.entry(j, self._default) for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("lyrics index out of range")
+        return self._lyrics.entry(i, self._default)
+
+    def __iter__(self):
+        return (self._lyrics.entry(i, self._default) for i in range(len(self._lyrics)))
+
+
+_opened: Dict[str, CompiledCatalog] = {}
+_opened_lock = threading.Lock()
+
+
+def open_compiled(songs_file: str = None, rebuild: bool = True) -> CompiledCatalog:
+    """Return the compiled timeline for songs_file, recompiling it first if the JSON changed.
+
+    With rebuild=False nothing is written: a missing or out-of-date file raises ValueError.
+    """
+    catalog = get_catalog(songs_file)
+    stamp = _file_stamp(catalog.path)
+    out_path = compiled_path(catalog.path)
+    with _opened_lock:
+        current = _opened.get(out_path)
+        if current is not None and current.source_stamp == stamp:
+            return current
+        compiled = None
+        if os.path.exists(out_path):
+            try:
+                compiled = CompiledCatalog(out_path)
+            except (OSError, ValueError, struct.error):
+                compiled = None
+            if compiled is not None and compiled.source_stamp != stamp:
+                compiled.close()
+                compiled = None
+        if compiled is None:
+            if not rebuild:
+                raise ValueError(f"{out_path} is missing or out of date")
+            compile_catalog(catalog.path, out_path)
+            compiled = CompiledCatalog(out_path)
+        _opened[out_path] = compiled
+        return compiled
+
+
+def get_compiled_lyrics(song_id: str, songs_file: str = None) -> Optional[CompiledLyrics]:
+    """Return mmap-backed lyrics for song_id, or None if the timeline cannot be compiled/read."""
+    try:
+        return open_compiled(songs_file).lyrics(song_id)
+    except (OSError, ValueError):
+        return None
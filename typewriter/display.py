@@ -1,34 +1,58 @@
 """
 Typewriter lyric effect: character-by-character output with optional color themes.
+
+Playback types from a RenderPlan: the song's characters and line breaks with their
+deadlines and theme styles worked out once, cached per song content, theme and speed.
 """
 
+import math
 import os
+import shutil
 import sys
+import threading
 import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from . import metrics
+from .player import LyricTimeline, get_line_delay
+from .scheduler import CHAR, END, LINE, EventScheduler, LyricEvent, expand_lyrics
+from .songs_loader import song_hash
+from .themes import _ANSI, THEME_COLORS_HEX, THEMES, get_theme_list
+
+PLAN_CACHE_SIZE = 64
+VIEW_LINES = 400
+TRIM_BATCH = 100
 
-_ANSI = {
-    "reset": "\033[0m",
-    "bold": "\033[1m",
-    "red": "\033[91m",
-    "green": "\033[92m",
-    "yellow": "\033[93m",
-    "blue": "\033[94m",
-    "magenta": "\033[95m",
-    "cyan": "\033[96m",
-    "white": "\033[97m",
-}
-
-THEMES = {
-    "plain": [],
-    "colorful": ["cyan", "green", "yellow", "magenta", "blue"],
-    "warm": ["yellow", "red", "magenta"],
-    "cool": ["cyan", "blue"],
-}
+
+_vt_enabled = False
 
 
 def clear_screen() -> None:
-    """Clear the terminal (cls on Windows, clear on Unix)."""
-    os.system("cls" if os.name == "nt" else "clear")
+    """Clear the terminal with ANSI escape sequences (no subprocess)."""
+    if os.name == "nt":
+        _enable_vt_mode()
+    sys.stdout.write("\033[2J\033[3J\033[H")
+    sys.stdout.flush()
+
+
+def _enable_vt_mode() -> None:
+    """Turn on ANSI escape processing in the Windows console (once)."""
+    global _vt_enabled
+    if _vt_enabled:
+        return
+    _vt_enabled = True
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004)
+    except (AttributeError, OSError):
+        pass
 
 
 def typewriter_print_with_theme(
@@ -38,23 +62,378 @@ def typewriter_print_with_theme(
     if theme == "plain" or theme not in THEMES or not THEMES[theme]:
         for char in text:
             sys.stdout.write(char)
-            sys.stdout.flush()
+            _flush_stdout()
             time.sleep(delay)
         sys.stdout.write(end)
-        sys.stdout.flush()
+        _flush_stdout()
         return 0
 
     colors = THEMES[theme]
     color = _ANSI.get(colors[color_index % len(colors)], "")
+    sys.stdout.write(color)
     for char in text:
-        sys.stdout.write(f"{color}{char}{_ANSI['reset']}")
-        sys.stdout.flush()
+        sys.stdout.write(char)
+        _flush_stdout()
         time.sleep(delay)
-    sys.stdout.write(end)
-    sys.stdout.flush()
+    sys.stdout.write(_ANSI["reset"] + end)
+    _flush_stdout()
     return color_index + 1
 
 
-def get_theme_list() -> list:
-    """Return available theme names."""
-    return list(THEMES.keys())
+def _flush_stdout() -> None:
+    """Flush stdout, timing it when metrics are enabled."""
+    if not metrics.enabled:
+        sys.stdout.flush()
+        return
+    t0 = time.perf_counter()
+    sys.stdout.flush()
+    metrics.registry.observe("terminal_flush_seconds", time.perf_counter() - t0)
+
+
+class TerminalRenderer:
+    """Buffers typed text and writes it to the terminal once per frame.
+
+    Color escapes are emitted only when the color changes. Write/flush cost is tracked
+    in frames, chars_written and write_time.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.frames = 0
+        self.chars_written = 0
+        self.write_time = 0.0
+        self._buf = []
+        self._color = ""
+
+    def write(self, text: str, color: Optional[str] = None) -> None:
+        """Queue text; color is an ANSI escape ("" for none, None to keep the current one)."""
+        if color is not None and color != self._color:
+            self._buf.append(color or _ANSI["reset"])
+            self._color = color
+        self._buf.append(text)
+
+    def flush(self) -> None:
+        """Write everything queued since the last flush in one call."""
+        if not self._buf:
+            return
+        data = "".join(self._buf)
+        self._buf.clear()
+        t0 = time.perf_counter()
+        self.stream.write(data)
+        self.stream.flush()
+        elapsed = time.perf_counter() - t0
+        self.write_time += elapsed
+        self.frames += 1
+        self.chars_written += len(data)
+        if metrics.enabled:
+            metrics.registry.observe("terminal_flush_seconds", elapsed)
+            metrics.registry.inc("terminal_chars_written", len(data))
+
+    def close(self) -> None:
+        """Reset any active color and flush."""
+        if self._color:
+            self.write("", "")
+        self.flush()
+
+
+class TerminalTyper:
+    """Scheduler event handler that types lyric events into a TerminalRenderer."""
+
+    def __init__(self, renderer: TerminalRenderer, theme: str):
+        self.renderer = renderer
+        self.colors = [_ANSI.get(c, "") for c in THEMES.get(theme) or []]
+        self.color_index = 0
+        self.line_has_text = False
+        self.in_line = False
+
+    def __call__(self, event, late) -> None:
+        if event.kind == CHAR:
+            colors = self.colors
+            self.renderer.write(event.text, colors[self.color_index % len(colors)] if colors else "")
+        elif event.kind == LINE:
+            self.line_has_text = bool(event.text.strip())
+            self.in_line = True
+        elif event.kind == END:
+            self.renderer.write("\n")
+            self.in_line = False
+            if self.line_has_text and self.colors:
+                self.color_index += 1
+
+    def break_line(self) -> None:
+        """End a partially typed line (after a seek)."""
+        if self.in_line:
+            self.renderer.write("\n")
+            self.in_line = False
+
+
+class RenderPlan:
+    """A song's lyrics laid out for typing: CHAR and END events with style ids, in deadline order.
+
+    END events carry the "\n" that finishes their line, so a backend only writes
+    event.text in the style styles[event.style] (None is the default color; escapes
+    holds the matching ANSI sequences). LINE events are left out.
+    """
+
+    __slots__ = ("events", "styles", "escapes", "line_times", "line_starts")
+
+    def __init__(self, events: list, styles: tuple, line_times: list, line_starts: list):
+        self.events = events
+        self.styles = styles
+        self.escapes = tuple(_ANSI.get(name, "") if name else "" for name in styles)
+        self.line_times = line_times
+        self.line_starts = line_starts
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def events_from(self, position: float) -> list:
+        """Return the events of the lines due from position on (like expand_lyrics from start_at)."""
+        return self.events[self._start_of(bisect_left(self.line_times, position)):]
+
+    def events_before(self, position: float, max_lines: Optional[int] = None) -> list:
+        """Return the events of the lines due before position: what the screen shows after a seek there.
+
+        With max_lines, only the last max_lines of them.
+        """
+        i = bisect_left(self.line_times, position)
+        first = 0 if max_lines is None else max(0, i - max_lines)
+        return self.events[self._start_of(first):self._start_of(i)]
+
+    def _start_of(self, line: int) -> int:
+        return self.line_starts[line] if line < len(self.line_starts) else len(self.events)
+
+
+def build_render_plan(timeline: LyricTimeline, char_delay: float, theme: str, per_char: bool = False) -> RenderPlan:
+    """Lay out timeline for typing at char_delay in theme.
+
+    Each line with text takes the theme's next color; per_char shifts the color on
+    every character as well (a rainbow), instead of one color per line.
+    """
+    colors = THEMES.get(theme) or []
+    events = []
+    line_times = []
+    line_starts = []
+    color_index = 0
+    style = 0
+    has_text = False
+    for event in expand_lyrics(timeline, char_delay):
+        if event.kind == LINE:
+            line_times.append(event.deadline)
+            line_starts.append(len(events))
+            has_text = bool(event.text.strip())
+        elif event.kind == CHAR:
+            if colors:
+                style = 1 + (color_index + (event.col if per_char else 0)) % len(colors)
+            events.append(LyricEvent(event.deadline, len(events), CHAR, event.text, event.line, event.col, style))
+        else:
+            events.append(LyricEvent(event.deadline, len(events), END, "\n", event.line, event.col, style))
+            if has_text and colors:
+                color_index += 1
+    return RenderPlan(events, (None,) + tuple(colors), line_times, line_starts)
+
+
+_plan_cache = OrderedDict()
+_plan_lock = threading.Lock()
+
+
+def get_render_plan(
+    song: dict, timeline: Optional[LyricTimeline], char_delay: float, theme: str, per_char: bool = False
+) -> RenderPlan:
+    """Return song's render plan, from an LRU cache keyed by the song's content hash.
+
+    timeline is the song's parsed lyrics (built from song if None). The last
+    PLAN_CACHE_SIZE plans are kept, so replaying a song costs one hash.
+    """
+    key = (song_hash(song), theme, char_delay, per_char)
+    with _plan_lock:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+    if metrics.enabled:
+        metrics.registry.inc("render_plan_cache_hits" if plan is not None else "render_plan_cache_misses")
+    if plan is not None:
+        return plan
+    with metrics.timed("render_plan_seconds"):
+        if timeline is None:
+            timeline = LyricTimeline(song.get("lyrics", []), get_line_delay(song))
+        plan = build_render_plan(timeline, char_delay, theme, per_char)
+    with _plan_lock:
+        _plan_cache[key] = plan
+        while len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
+
+
+class PlanTyper:
+    """Scheduler event handler that writes render plan events into a TerminalRenderer."""
+
+    def __init__(self, renderer: TerminalRenderer, plan: RenderPlan):
+        self.renderer = renderer
+        self.escapes = plan.escapes
+        self.in_line = False
+
+    def __call__(self, event, late) -> None:
+        self.renderer.write(event.text, self.escapes[event.style])
+        self.in_line = event.kind != END
+
+    def break_line(self) -> None:
+        """End a partially typed line (after a seek)."""
+        if self.in_line:
+            self.renderer.write("\n")
+            self.in_line = False
+
+    def redraw(self, events: list, clear: bool = True) -> None:
+        """Show events (whole lines) in one write, on a cleared screen if clear."""
+        renderer = self.renderer
+        if clear:
+            if os.name == "nt":
+                _enable_vt_mode()
+            renderer.write("\033[2J\033[3J\033[H", "")
+        else:
+            self.break_line()
+        for text, style in coalesce_runs((e.text, e.style) for e in events):
+            renderer.write(text, self.escapes[style])
+        renderer.flush()
+        self.in_line = False
+
+
+def run_plan(
+    plan: RenderPlan,
+    clock,
+    handler: Callable,
+    redraw: Callable[[list, bool], None],
+    start_at: float = 0.0,
+    stop_check: Optional[Callable[[], bool]] = None,
+    frame_interval: float = 0.016,
+    on_frame: Optional[Callable[[], None]] = None,
+    controller=None,
+    linger: Optional[Callable[[], bool]] = None,
+    max_lines: Optional[int] = None,
+) -> EventScheduler:
+    """Dispatch plan's events from start_at to handler on clock, following seeks.
+
+    Lines due before start_at are shown first with redraw(events, False); after a
+    seek (through the PlaybackController) redraw(events, True) replaces the display
+    with the lines due before the new position (the last max_lines of them), found by
+    binary search, and typing continues from there. linger() keeps seeks working after
+    the last line for as long as it returns True (e.g. while the audio plays).
+    Returns the last EventScheduler; its lateness list covers every dispatched event.
+    """
+    lateness = []
+    position = start_at
+    seeked = False
+    while position is not None:
+        if seeked or position > 0:
+            with metrics.timed("seek_redraw_seconds"):
+                redraw(plan.events_before(position, max_lines), seeked)
+        scheduler = EventScheduler(clock, plan.events_from(position))
+        scheduler.lateness = lateness
+        finished = scheduler.run(handler, stop_check, frame_interval, on_frame, controller)
+        if controller is None:
+            break
+        if finished and linger is not None:
+            controller.wait_until(clock, math.inf, lambda: not linger() or bool(stop_check and stop_check()))
+        position = controller.take_seek()
+        seeked = True
+    return scheduler
+
+
+def typewriter_play(
+    timeline,
+    delay: float,
+    theme: str,
+    clock,
+    start_at: float = 0.0,
+    stop_check: Optional[Callable[[], bool]] = None,
+    renderer: Optional[TerminalRenderer] = None,
+    frame_interval: float = 0.016,
+    controller=None,
+    plan: Optional[RenderPlan] = None,
+    linger: Optional[Callable[[], bool]] = None,
+) -> EventScheduler:
+    """Type a LyricTimeline from start_at with every character on its own deadline.
+
+    Output goes through renderer (a TerminalRenderer on stdout if None), flushed at
+    most once per frame_interval. Lines due before start_at are printed at once. With
+    a PlaybackController, stop/pause take effect immediately and a seek redraws the
+    screen up to the new position and continues typing from there; linger keeps
+    seeks working after the last line (see run_plan). plan is the timeline's render
+    plan (see get_render_plan); it is built if None. Returns the last EventScheduler,
+    whose lateness list has one entry per dispatched event.
+    """
+    renderer = renderer or TerminalRenderer()
+    if plan is None:
+        plan = build_render_plan(timeline, delay, theme)
+    typer = PlanTyper(renderer, plan)
+    rows = max(1, shutil.get_terminal_size().lines - 1)
+    try:
+        return run_plan(
+            plan, clock, typer, typer.redraw, start_at, stop_check, frame_interval, renderer.flush,
+            controller, linger, rows,
+        )
+    finally:
+        renderer.close()
+
+
+async def atypewriter_play(
+    timeline,
+    delay: float,
+    theme: str,
+    clock,
+    start_at: float = 0.0,
+    renderer: Optional[TerminalRenderer] = None,
+    frame_interval: float = 0.016,
+    plan: Optional[RenderPlan] = None,
+) -> EventScheduler:
+    """asyncio counterpart of typewriter_play; cancel the task running it to stop."""
+    renderer = renderer or TerminalRenderer()
+    if plan is None:
+        plan = build_render_plan(timeline, delay, theme)
+    scheduler = EventScheduler(clock, plan.events_from(start_at))
+    try:
+        await scheduler.arun(PlanTyper(renderer, plan), frame_interval, renderer.flush)
+    finally:
+        renderer.close()
+    return scheduler
+
+
+def coalesce_runs(chunks) -> list:
+    """Merge consecutive (text, style) chunks that share a style into [(text, style), ...]."""
+    runs = []
+    parts = []
+    style = None
+    for text, chunk_style in chunks:
+        if parts and chunk_style != style:
+            runs.append(("".join(parts), style))
+            parts = []
+        parts.append(text)
+        style = chunk_style
+    if parts:
+        runs.append(("".join(parts), style))
+    return runs
+
+
+class LineWindow:
+    """Line bookkeeping for a scrolling view that keeps only its last max_lines lines.
+
+    The view itself holds the text; this only counts line breaks as they are added and
+    says when to drop lines from the top. Trimming waits until batch extra lines have
+    built up, so the view is trimmed once per batch lines rather than on every line.
+    """
+
+    def __init__(self, max_lines: int = VIEW_LINES, batch: int = TRIM_BATCH):
+        self.max_lines = max_lines
+        self.batch = batch
+        self.lines = 0
+
+    def add(self, text: str) -> int:
+        """Count text's line breaks; returns how many lines to delete from the top (usually 0)."""
+        self.lines += text.count("\n")
+        if self.lines < self.max_lines + self.batch:
+            return 0
+        trim = self.lines - self.max_lines
+        self.lines = self.max_lines
+        return trim
+
+    def clear(self) -> None:
+        self.lines = 0
@@ -0,0 +1,94 @@
+"""
+Single-keypress input from the terminal, without waiting for ENTER.
+
+RawKeys puts the terminal in cbreak mode (no line buffering, no echo; Ctrl+C still
+interrupts) and read() returns one key at a time: a character, or one of the names
+below for special keys. Uses termios on POSIX and msvcrt on Windows.
+"""
+
+import os
+import sys
+import time
+from typing import Optional
+
+UP = "up"
+DOWN = "down"
+LEFT = "left"
+RIGHT = "right"
+ENTER = "enter"
+SPACE = "space"
+BACKSPACE = "backspace"
+ESC = "esc"
+
+_ESCAPES = {"A": UP, "B": DOWN, "C": RIGHT, "D": LEFT}
+_WINDOWS_SCANCODES = {"H": UP, "P": DOWN, "M": RIGHT, "K": LEFT}
+_NAMED = {"\r": ENTER, "\n": ENTER, " ": SPACE, "\x7f": BACKSPACE, "\x08": BACKSPACE, "\x1b": ESC}
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import select
+    import termios
+    import tty
+
+
+class RawKeys:
+    """Context manager reading single keypresses from stdin."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self._saved = None
+        self._pending = []
+
+    def __enter__(self):
+        if os.name != "nt":
+            fd = self.stream.fileno()
+            self._saved = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+        return self
+
+    def __exit__(self, *exc):
+        if self._saved is not None:
+            termios.tcsetattr(self.stream.fileno(), termios.TCSADRAIN, self._saved)
+            self._saved = None
+
+    def read(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Return the next key, or None if none arrives within timeout seconds (None = wait)."""
+        if self._pending:
+            return self._pending.pop(0)
+        if os.name == "nt":
+            return self._read_windows(timeout)
+        fd = self.stream.fileno()
+        ready, _, _ = select.select([fd], [], [], timeout)
+        if not ready:
+            return None
+        data = os.read(fd, 64).decode("utf-8", errors="ignore")
+        self._pending.extend(_parse(data))
+        return self._pending.pop(0) if self._pending else None
+
+    def _read_windows(self, timeout: Optional[float]) -> Optional[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not msvcrt.kbhit():
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(0.005)
+        ch = msvcrt.getwch()
+        if ch in ("\x00", "\xe0"):
+            return _WINDOWS_SCANCODES.get(msvcrt.getwch())
+        return _NAMED.get(ch, ch)
+
+
+def _parse(data: str) -> list:
+    """Split raw terminal input into keys, decoding arrow-key escape sequences."""
+    keys = []
+    i = 0
+    while i < len(data):
+        if data[i] == "\x1b" and data[i + 1:i + 2] in ("[", "O") and i + 2 < len(data):
+            key = _ESCAPES.get(data[i + 2])
+            if key is not None:
+                keys.append(key)
+            i += 3
+            continue
+        keys.append(_NAMED.get(data[i], data[i]))
+        i += 1
+    return keys
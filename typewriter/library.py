@@ -0,0 +1,322 @@
+"""
+Sharded song libraries: a small manifest plus lyric shards, for catalogs too big to load whole.
+
+Layout of a library directory:
+    manifest.json   {"version", "shards": [file names], "songs": {column: [value per song]}}
+                    columns: id, title, artist, audio, char_delay, line_delay, extra (unknown
+                    keys or null), shard (index into "shards"), offset and length (bytes)
+    shards/*.jsonl  one song's lyrics per line, as compact JSON
+
+Opening a library only parses the manifest, so listing 100k songs needs no lyrics at all.
+A song's lyrics are read (one seek and read in its shard) the first time they are used,
+and the last LYRICS_CACHE_SIZE loaded are kept in an LRU; memory follows what is played.
+ShardedCatalog answers the same calls as SongCatalog, and get_catalog() returns one for a
+library directory or its manifest.json.
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import metrics
+from .models import SONG_FIELDS, Lyrics, Song
+from .songs_loader import LIBRARY_MANIFEST, _file_stamp
+from .titles import write_library_titles
+
+MANIFEST_FILE = LIBRARY_MANIFEST
+SHARD_DIR = "shards"
+SHARD_SIZE = 256
+LYRICS_CACHE_SIZE = 64
+VERSION = 1
+
+_COLUMNS = ("id", "title", "artist", "audio", "char_delay", "line_delay", "extra", "shard", "offset", "length")
+_DEFAULTS = {"artist": "", "char_delay": 0.03, "line_delay": 0.0}
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_LYRICS_SLOT = Song.lyrics
+
+
+def manifest_path(path: str) -> str:
+    """Return the manifest of the library at path (a library directory or its manifest)."""
+    return os.path.join(path, MANIFEST_FILE) if os.path.isdir(path) else path
+
+
+class LibrarySong(Song):
+    """A Song from a sharded library: its lyrics are read through the library's LRU on access.
+
+    Assigning lyrics pins them on the song. Pickling gives a plain Song with the lyrics
+    loaded, so songs can be sent to worker processes.
+    """
+
+    __slots__ = ("_library",)
+
+    def __init__(self, library: "ShardedCatalog", *fields, extra: Optional[dict] = None):
+        self._library = library
+        super().__init__(*fields, extra=extra)
+
+    @property
+    def lyrics(self):
+        value = _LYRICS_SLOT.__get__(self, Song)
+        return value if value is not None else self._library.lyrics(self.id)
+
+    @lyrics.setter
+    def lyrics(self, value) -> None:
+        _LYRICS_SLOT.__set__(self, value)
+
+    def __reduce__(self):
+        return Song.from_dict, (self.to_dict(),)
+
+
+class ShardedCatalog:
+    """A library's manifest with an id index. Reloads only when manifest.json's mtime or size changes."""
+
+    def __init__(self, path: str):
+        self.path = manifest_path(path)
+        self.root = os.path.dirname(self.path)
+        self._stamp = None
+        self._shards: List[str] = []
+        self._columns: Dict[str, list] = {}
+        self._index: Optional[Dict[str, int]] = None
+        self._songs: Optional[List[LibrarySong]] = None
+        self._titles: Optional[List[Tuple[str, str]]] = None
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, object]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Separate from _lock: writing a LibrarySong loads its lyrics, which may refresh.
+        self._write_lock = threading.Lock()
+
+    def songs(self) -> list:
+        """Return all songs, in manifest order (lyrics still unloaded)."""
+        self._refresh()
+        songs = self._songs
+        if songs is None:
+            with self._lock:
+                songs = self._songs = [self._song(i) for i in range(len(self._columns.get("id", ())))]
+        return songs
+
+    def get(self, song_id: str) -> Optional[LibrarySong]:
+        """Return song by ID, or None if not found."""
+        i = self._find(song_id)
+        if i is None:
+            return None
+        return self._songs[i] if self._songs is not None else self._song(i)
+
+    def titles(self) -> list:
+        """Return [(id, title), ...] for all songs."""
+        self._refresh()
+        titles = self._titles
+        if titles is None:
+            ids = self._columns.get("id", [])
+            titles = self._titles = [(i, t or i) for i, t in zip(ids, self._columns.get("title", []))]
+        return titles
+
+    def lyrics(self, song_id: str):
+        """Return song_id's lyrics (Lyrics, or the raw list if malformed), reading its shard on a miss."""
+        i = self._find(song_id)
+        if i is None:
+            return None
+        columns = self._columns
+        # Keyed by location, not id: entries stay valid across manifest reloads.
+        key = (self._shards[columns["shard"][i]], columns["offset"][i])
+        with self._cache_lock:
+            hit = key in self._cache
+            if hit:
+                self._cache.move_to_end(key)
+                lyrics = self._cache[key]
+        if metrics.enabled:
+            metrics.registry.inc("library_lyrics_hits" if hit else "library_lyrics_misses")
+        if hit:
+            return lyrics
+        with metrics.timed("library_lyrics_load_seconds"):
+            with open(os.path.join(self.root, SHARD_DIR, key[0]), "rb") as f:
+                f.seek(key[1])
+                lyrics = json.loads(f.read(columns["length"][i]))
+        if isinstance(lyrics, list):
+            parsed = Lyrics.from_entries(lyrics)
+            if parsed is not None:
+                lyrics = parsed
+        with self._cache_lock:
+            self._cache[key] = lyrics
+            while len(self._cache) > LYRICS_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return lyrics
+
+    def update(self, songs: Iterable) -> int:
+        """Add songs (dicts or Songs) to the library, replacing those with the same id.
+
+        Lyrics are appended to the last shard (then to new ones) and the manifest is
+        rewritten once, atomically, at the end. Replaced lyrics stay in their shards
+        until the library is rewritten with write_library(). Returns how many songs
+        were written.
+        """
+        with self._write_lock:
+            try:
+                shards, columns = _read_manifest(self.path)
+            except FileNotFoundError:
+                shards, columns = [], {name: [] for name in _COLUMNS}
+            index = {song_id: i for i, song_id in enumerate(columns["id"])}
+            last = len(shards) - 1
+            writer = _ShardWriter(self.root, shards, columns["shard"].count(last) if shards else SHARD_SIZE)
+            written = 0
+            try:
+                for song in songs:
+                    row = _row(song, writer)
+                    if row is None:
+                        continue
+                    i = index.get(row[0])
+                    if i is None:
+                        index[row[0]] = len(columns["id"])
+                        for name, value in zip(_COLUMNS, row):
+                            columns[name].append(value)
+                    else:
+                        for name, value in zip(_COLUMNS, row):
+                            columns[name][i] = value
+                    written += 1
+            finally:
+                writer.close()
+            _write_manifest(self.path, shards, columns)
+        return written
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._columns.get("id", ()))
+
+    def __contains__(self, song_id: str) -> bool:
+        return self._find(song_id) is not None
+
+    def _find(self, song_id: str) -> Optional[int]:
+        """Return song_id's row, building the id index on first use (listing never needs it)."""
+        self._refresh()
+        index = self._index
+        if index is None:
+            with self._lock:
+                index = self._index = {sid: i for i, sid in enumerate(self._columns.get("id", ()))}
+        return index.get(song_id)
+
+    def _song(self, i: int) -> LibrarySong:
+        c = self._columns
+        return LibrarySong(
+            self, c["id"][i], c["title"][i], c["artist"][i], c["audio"][i], None,
+            c["char_delay"][i], c["line_delay"][i], extra=c["extra"][i],
+        )
+
+    def _refresh(self) -> None:
+        """Re-read the manifest if it changed since the last load."""
+        stamp = _file_stamp(self.path)
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            shards, columns = _read_manifest(self.path) if stamp else ([], {name: [] for name in _COLUMNS})
+            # Locations as machine ints rather than a Python int object each.
+            for name in ("shard", "offset", "length"):
+                columns[name] = array("q", columns[name])
+            self._shards = shards
+            self._columns = columns
+            self._index = None
+            self._songs = None
+            self._titles = None
+            self._stamp = stamp
+
+
+class _ShardWriter:
+    """Appends lyric lines to shards/, moving to a new shard file every SHARD_SIZE songs."""
+
+    def __init__(self, root: str, shards: List[str], last_count: int = SHARD_SIZE, shard_size: int = SHARD_SIZE):
+        self.directory = os.path.join(root, SHARD_DIR)
+        self.shards = shards
+        self.shard_size = shard_size
+        self._count = last_count
+        self._file = None
+        # New shard names never collide with those a current manifest may point at.
+        self._prefix = format(time.time_ns(), "x")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def write(self, lyrics) -> Tuple[int, int, int]:
+        """Append lyrics and return their (shard, offset, length)."""
+        if self._count >= self.shard_size:
+            self.close()
+            self.shards.append(f"{self._prefix}-{len(self.shards):05d}.jsonl")
+            self._count = 0
+        if self._file is None:
+            self._file = open(os.path.join(self.directory, self.shards[-1]), "ab")
+        data = _encode(lyrics).encode("utf-8")
+        offset = self._file.tell()
+        self._file.write(data + b"\n")
+        self._count += 1
+        return len(self.shards) - 1, offset, len(data)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def write_library(songs: Iterable, directory: str, shard_size: int = SHARD_SIZE) -> str:
+    """Write songs (dicts or Songs) as a library in directory and return its manifest path.
+
+    Songs are streamed into new shards and the manifest is replaced atomically; shards the
+    new manifest no longer uses are then removed. Songs without an id are left out.
+    """
+    path = os.path.join(directory, MANIFEST_FILE)
+    shards: List[str] = []
+    columns = {name: [] for name in _COLUMNS}
+    writer = _ShardWriter(directory, shards, shard_size=shard_size)
+    try:
+        for song in songs:
+            row = _row(song, writer)
+            if row is not None:
+                for name, value in zip(_COLUMNS, row):
+                    columns[name].append(value)
+    finally:
+        writer.close()
+    _write_manifest(path, shards, columns)
+    used = set(shards)
+    for name in os.listdir(writer.directory):
+        if name.endswith(".jsonl") and name not in used:
+            os.remove(os.path.join(writer.directory, name))
+    return path
+
+
+def _row(song, writer: _ShardWriter) -> Optional[tuple]:
+    """Write song's lyrics and return its manifest row (in _COLUMNS order), or None without an id."""
+    data = song.to_dict() if isinstance(song, Song) else song
+    if not isinstance(data, dict) or not isinstance(data.get("id"), str):
+        return None
+    lyrics = data.get("lyrics")
+    shard, offset, length = writer.write(lyrics.to_list() if isinstance(lyrics, Lyrics) else lyrics)
+    extra = {k: v for k, v in data.items() if k not in SONG_FIELDS} or None
+    fields = [data.get(name, _DEFAULTS.get(name)) for name in ("id", "title", "artist", "audio", "char_delay", "line_delay")]
+    return (*fields, extra, shard, offset, length)
+
+
+def _read_manifest(path: str) -> Tuple[List[str], Dict[str, list]]:
+    """Return (shard names, columns) from the manifest at path."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != VERSION:
+        raise ValueError(f"{path}: unsupported library version {data.get('version')!r}")
+    columns = data.get("songs", {})
+    n = len(columns.get("id", []))
+    return data.get("shards", []), {name: columns.get(name) or [None] * n for name in _COLUMNS}
+
+
+def _write_manifest(path: str, shards: List[str], columns: Dict[str, list]) -> None:
+    """Atomically write the manifest: one line per column."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    body = ",\n".join(f"    {json.dumps(name)}: {_encode(list(columns[name]))}" for name in _COLUMNS)
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(f'{{\n  "version": {VERSION},\n  "shards": {_encode(shards)},\n  "songs": {{\n{body}\n  }}\n}}\n')
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    # For `play.py --list`, which reads titles.bin instead of parsing the manifest.
+    titles = [t or i for i, t in zip(columns["id"], columns["title"])]
+    write_library_titles(path, columns["id"], titles)
@@ -0,0 +1,283 @@
+"""
+Bulk import and export of timed lyric files: LRC and SRT.
+
+Files are parsed line by line (never read whole) on a process pool, each worker
+returning its song already serialized as a songs.json chunk. Chunks are spooled to a
+temporary file as they arrive and then streamed, together with the existing songs,
+into one atomic rewrite of songs.json; an imported song replaces the entry with the
+same id in place, new ones are appended. Song ids are the files' base names. A sharded
+library (library.py) takes the imported songs through one ShardedCatalog.update().
+
+LRC: [mm:ss.xx] stamps (several per line for repeated lines), [ti:]/[ar:] metadata and
+[offset:±ms]; word-level <mm:ss.xx> stamps are dropped. SRT: each cue becomes a line at
+its start time (multi-line cues are joined), and a gap of STANZA_GAP or more after a
+cue becomes a blank line, as songs.json marks stanza breaks.
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from .player import DEFAULT_CHAR_DELAY, DEFAULT_LINE_DELAY, LyricTimeline, get_char_delay
+from .songs_loader import SongCatalog, format_song, get_catalog, write_songs
+
+LYRIC_EXTENSIONS = (".lrc", ".srt")
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".ogg", ".flac", ".m4a")
+STANZA_GAP = 2.0
+POOL_THRESHOLD = 32
+
+_LRC_LINE = re.compile(r"\s*((?:\[\d+:\d+(?::\d+)?(?:[.:]\d+)?\]\s*)+)(.*)")
+_LRC_STAMP = re.compile(r"\[(\d+):(\d+)(?::(\d+))?(?:[.:](\d+))?\]")
+_LRC_META = re.compile(r"\s*\[([A-Za-z#]+)\s*:([^\]]*)\]\s*$")
+_LRC_WORD_TIME = re.compile(r"<\d+:\d+(?:[.:]\d+)?>")
+_SRT_TIME = re.compile(r"(\d+):(\d+):(\d+)[,.](\d+)\s*-->\s*(\d+):(\d+):(\d+)[,.](\d+)")
+_MARKUP = re.compile(r"</?[a-zA-Z][^>]*>|\{\\[^}]*\}")
+
+
+class ImportResult(NamedTuple):
+    """Outcome of import_lyrics()."""
+
+    added: int
+    replaced: int
+    failed: list
+    seconds: float
+
+
+def parse_lrc(lines: Iterable[str]) -> Tuple[dict, list]:
+    """Parse LRC text lines into (metadata, [[timestamp, line], ...] sorted by time)."""
+    meta = {}
+    stamps = []
+    offset = 0.0
+    for raw in lines:
+        m = _LRC_LINE.match(raw)
+        if m is None:
+            m = _LRC_META.match(raw)
+            if m is not None:
+                meta[m.group(1).lower()] = m.group(2).strip()
+            continue
+        text = m.group(2).strip()
+        if "<" in text:
+            text = _LRC_WORD_TIME.sub("", text).strip()
+        for first, second, third, fraction in _LRC_STAMP.findall(m.group(1)):
+            if third and fraction:
+                # [hh:mm:ss.xx]
+                seconds = int(first) * 3600 + int(second) * 60 + int(third)
+            else:
+                # [mm:ss.xx], or the older [mm:ss:xx]
+                seconds = int(first) * 60 + int(second)
+                fraction = fraction or third
+            stamps.append((seconds + (int(fraction) / 10 ** len(fraction) if fraction else 0.0), text))
+    try:
+        # A positive offset (ms) shows lyrics sooner.
+        offset = float(meta.get("offset", 0)) / 1000.0
+    except ValueError:
+        pass
+    stamps.sort(key=lambda e: e[0])
+    return meta, [[round(max(t - offset, 0.0), 3), text] for t, text in stamps]
+
+
+def parse_srt(lines: Iterable[str]) -> list:
+    """Parse SRT text lines into [[timestamp, line], ...] sorted by time."""
+    cues = []
+    start = end = None
+    text = []
+    for raw in _with_end(lines):
+        raw = raw.strip()
+        if start is None:
+            m = _SRT_TIME.search(raw)
+            if m:
+                v = [int(x) for x in m.groups()]
+                start = v[0] * 3600 + v[1] * 60 + v[2] + v[3] / 1000.0
+                end = v[4] * 3600 + v[5] * 60 + v[6] + v[7] / 1000.0
+            continue
+        if raw:
+            text.append(_MARKUP.sub("", raw).strip())
+            continue
+        cues.append((start, end, " ".join(t for t in text if t)))
+        start, text = None, []
+    cues.sort(key=lambda c: c[0])
+    entries = []
+    for i, (start, end, line) in enumerate(cues):
+        entries.append([round(start, 3), line])
+        following = cues[i + 1][0] if i + 1 < len(cues) else None
+        if following is not None and following - end >= STANZA_GAP:
+            entries.append([round(end, 3), ""])
+    return entries
+
+
+def _with_end(lines: Iterable[str]):
+    """Yield lines, then a blank line so the last cue is closed."""
+    yield from lines
+    yield ""
+
+
+def read_lyric_file(path: str, song_id: str = None, audio: str = None) -> dict:
+    """Parse an .lrc or .srt file into a songs.json entry (id and title default to the file name)."""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    with open(path, "r", encoding="utf-8-sig") as f:
+        if ext.lower() == ".srt":
+            meta, lyrics = {}, parse_srt(f)
+        else:
+            meta, lyrics = parse_lrc(f)
+    if not lyrics:
+        raise ValueError("no timed lines")
+    return {
+        "id": song_id or stem,
+        "title": meta.get("ti") or stem,
+        "artist": meta.get("ar", ""),
+        "audio": audio or f"{stem}.mp3",
+        "lyrics": lyrics,
+        "char_delay": DEFAULT_CHAR_DELAY,
+        "line_delay": DEFAULT_LINE_DELAY,
+    }
+
+
+def find_lyric_files(paths: Iterable[str], root: str) -> List[tuple]:
+    """Return [(path, song_id, audio), ...] for the lyric files in paths (directories are walked).
+
+    audio is the matching audio file next to the lyric file (relative to root), or the
+    .mp3 it is expected to be. Later files with an already seen id are skipped.
+    """
+    jobs = []
+    seen = set()
+    for top in paths:
+        if os.path.isdir(top):
+            walk = ((d, sorted(files)) for d, _dirs, files in os.walk(top))
+        else:
+            walk = [(os.path.dirname(top), [os.path.basename(top)])]
+        for directory, names in walk:
+            present = set(names) if os.path.isdir(top) else None
+            for name in names:
+                stem, ext = os.path.splitext(name)
+                if ext.lower() not in LYRIC_EXTENSIONS or stem in seen:
+                    continue
+                seen.add(stem)
+                if present is None:
+                    present = set(os.listdir(directory or "."))
+                audio = next((stem + e for e in AUDIO_EXTENSIONS if stem + e in present), stem + ".mp3")
+                jobs.append((os.path.join(directory, name), stem, os.path.relpath(os.path.join(directory, audio), root)))
+    return jobs
+
+
+def _import_job(job: tuple) -> tuple:
+    """Worker: return (song_id, songs.json chunk, None) or (song_id, None, error)."""
+    path, song_id, audio = job
+    try:
+        return song_id, format_song(read_lyric_file(path, song_id, audio)), None
+    except (OSError, ValueError) as e:
+        return song_id, None, f"{path}: {e}"
+
+
+def _run_jobs(jobs: list, workers: Optional[int]):
+    """Yield _import_job results in order, on a process pool unless there are only a few jobs."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < POOL_THRESHOLD:
+        yield from map(_import_job, jobs)
+        return
+    chunksize = max(1, min(256, len(jobs) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_import_job, jobs, chunksize=chunksize)
+
+
+def import_lyrics(paths: Iterable[str], songs_file: str = None, workers: Optional[int] = None) -> ImportResult:
+    """Import every LRC/SRT file under paths into songs_file with one atomic write."""
+    t0 = time.perf_counter()
+    catalog = get_catalog(songs_file)
+    path = catalog.path
+    jobs = find_lyric_files(paths, os.path.dirname(path))
+    data, existing = None, []
+    if isinstance(catalog, SongCatalog):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {"songs": []}
+        existing = data.get("songs", [])
+
+    failed = []
+    spans = {}
+    with tempfile.TemporaryFile(dir=os.path.dirname(path)) as spool:
+        for song_id, chunk, error in _run_jobs(jobs, workers):
+            if error is not None:
+                failed.append(error)
+                continue
+            encoded = chunk.encode("utf-8")
+            spans[song_id] = (spool.tell(), len(encoded))
+            spool.write(encoded)
+
+        existing_ids = {s.get("id") for s in existing if isinstance(s, dict)} if data is not None else catalog
+        new_ids = [song_id for song_id in spans if song_id not in existing_ids]
+
+        def read(song_id):
+            offset, size = spans[song_id]
+            spool.seek(offset)
+            return spool.read(size).decode("utf-8")
+
+        def chunks():
+            for song in existing:
+                song_id = song.get("id") if isinstance(song, dict) else None
+                yield read(song_id) if song_id in spans else format_song(song)
+            for song_id in new_ids:
+                yield read(song_id)
+
+        if spans and data is None:
+            catalog.update(json.loads(read(song_id)) for song_id in spans)
+        elif spans:
+            write_songs(path, data, chunks())
+    replaced = len(spans) - len(new_ids)
+    return ImportResult(len(new_ids), replaced, failed, time.perf_counter() - t0)
+
+
+def format_timestamp(seconds: float, srt: bool = False) -> str:
+    """Return seconds as an LRC [mm:ss.xx] stamp (without brackets) or an SRT hh:mm:ss,mmm time."""
+    if srt:
+        ms = int(round(seconds * 1000))
+        return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+    cs = int(round(seconds * 100))
+    return f"{cs // 6000:02d}:{cs // 100 % 60:02d}.{cs % 100:02d}"
+
+
+def write_lrc(song, out) -> None:
+    """Write song as LRC to the text stream out."""
+    if song.get("title"):
+        out.write(f"[ti:{song['title']}]\n")
+    if song.get("artist"):
+        out.write(f"[ar:{song['artist']}]\n")
+    for ts, line, _delay in LyricTimeline(song.get("lyrics", [])).entries:
+        out.write(f"[{format_timestamp(ts)}]{line}\n")
+
+
+def write_srt(song, out) -> None:
+    """Write song as SRT to out: one cue per non-blank line, lasting until the next line."""
+    entries = LyricTimeline(song.get("lyrics", [])).entries
+    char_delay = get_char_delay(song)
+    n = 0
+    for i, (ts, line, _delay) in enumerate(entries):
+        if not line.strip():
+            continue
+        end = entries[i + 1][0] if i + 1 < len(entries) else ts + len(line) * char_delay + STANZA_GAP
+        n += 1
+        out.write(f"{n}\n{format_timestamp(ts, True)} --> {format_timestamp(max(end, ts), True)}\n{line}\n\n")
+
+
+def export_lyrics(songs: Iterable, directory: str, fmt: str = "lrc") -> Tuple[list, list]:
+    """Write each song to directory/<id>.<fmt>; returns (written paths, failures)."""
+    write = write_srt if fmt == "srt" else write_lrc
+    os.makedirs(directory, exist_ok=True)
+    written, failed = [], []
+    for song in songs:
+        song_id = str(song.get("id", "")).replace(os.sep, "_")
+        path = os.path.join(directory, f"{song_id}.{fmt}")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                write(song, f)
+        except (OSError, ValueError, TypeError, IndexError) as e:
+            failed.append(f"{song_id}: {e}")
+            continue
+        written.append(path)
+    return written, failed
+
@@ -0,0 +1,186 @@
+"""
+Optional playback instrumentation: counters, gauges and histograms.
+
+Disabled by default. Hot paths guard every hook with `if metrics.enabled:`, so the
+cost when off is one attribute load. Call enable() to start recording and export()
+to write a snapshot as JSON lines or Prometheus text to a file or a tcp:// / udp:// socket.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+enabled = False
+
+
+class Histogram:
+    """Cumulative-bucket histogram, Prometheus style."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """Return [(upper bound, cumulative count), ...] ending with +Inf."""
+        out = []
+        total = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            out.append((bound, total))
+        return out
+
+
+class Registry:
+    """Named counters, gauges and histograms, safe to update from several threads."""
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(value)
+
+
+registry = Registry()
+
+
+def enable(new_registry: Optional[Registry] = None) -> Registry:
+    """Start recording (into new_registry if given). Returns the active registry."""
+    global enabled, registry
+    if new_registry is not None:
+        registry = new_registry
+    enabled = True
+    return registry
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+
+def inc(name: str, n: float = 1) -> None:
+    if enabled:
+        registry.inc(name, n)
+
+
+def gauge(name: str, value: float) -> None:
+    if enabled:
+        registry.set_gauge(name, value)
+
+
+def observe(name: str, value: float) -> None:
+    if enabled:
+        registry.observe(name, value)
+
+
+class timed:
+    """Context manager observing the block's duration into histogram name (when enabled)."""
+
+    __slots__ = ("name", "_t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter() if enabled else None
+        return self
+
+    def __exit__(self, *exc):
+        if self._t0 is not None:
+            registry.observe(self.name, time.perf_counter() - self._t0)
+
+
+def to_json_lines(reg: Optional[Registry] = None) -> str:
+    """Return one JSON object per metric, each on its own line."""
+    reg = reg or registry
+    ts = time.time()
+    lines = []
+    for name, value in sorted(reg.counters.items()):
+        lines.append({"ts": ts, "name": name, "type": "counter", "value": value})
+    for name, value in sorted(reg.gauges.items()):
+        lines.append({"ts": ts, "name": name, "type": "gauge", "value": value})
+    for name, hist in sorted(reg.histograms.items()):
+        lines.append({
+            "ts": ts,
+            "name": name,
+            "type": "histogram",
+            "count": hist.count,
+            "sum": hist.sum,
+            "buckets": {_le(b): n for b, n in hist.cumulative()},
+        })
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+
+def to_prometheus(reg: Optional[Registry] = None, prefix: str = "lyricstream_") -> str:
+    """Return the metrics in the Prometheus text exposition format."""
+    reg = reg or registry
+    out = []
+    for name, value in sorted(reg.counters.items()):
+        out += [f"# TYPE {prefix}{name} counter", f"{prefix}{name} {value}"]
+    for name, value in sorted(reg.gauges.items()):
+        out += [f"# TYPE {prefix}{name} gauge", f"{prefix}{name} {value}"]
+    for name, hist in sorted(reg.histograms.items()):
+        out.append(f"# TYPE {prefix}{name} histogram")
+        for bound, n in hist.cumulative():
+            out.append(f'{prefix}{name}_bucket{{le="{_le(bound)}"}} {n}')
+        out += [f"{prefix}{name}_sum {hist.sum}", f"{prefix}{name}_count {hist.count}"]
+    return "\n".join(out) + "\n"
+
+
+def export(target: str, fmt: str = "prometheus", reg: Optional[Registry] = None) -> None:
+    """Write a snapshot to target: a file path, tcp://host:port or udp://host:port.
+
+    Prometheus snapshots replace the file (textfile-collector style); JSON lines append.
+    """
+    data = (to_prometheus(reg) if fmt == "prometheus" else to_json_lines(reg)).encode("utf-8")
+    scheme, _, address = target.partition("://")
+    if address and scheme in ("tcp", "udp"):
+        import socket
+
+        host, _, port = address.rpartition(":")
+        if scheme == "tcp":
+            with socket.create_connection((host, int(port)), timeout=2.0) as sock:
+                sock.sendall(data)
+        else:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.sendto(data, (host, int(port)))
+        return
+    if fmt == "prometheus":
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+    else:
+        with open(target, "ab") as f:
+            f.write(data)
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
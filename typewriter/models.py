@@ -0,0 +1,200 @@
+"""
+Compact in-memory songs: Song and Lyrics, built once per songs.json load.
+
+Lyrics keep their entries in columns (timestamps and delays in array('d'), lines in one
+tuple of interned strings) instead of a list per entry. Song holds the known songs.json
+fields in slots and still answers song["key"] / song.get("key") like the dict it came
+from, so code written against plain dicts keeps working.
+"""
+
+import math
+import sys
+from array import array
+from typing import Iterable, Optional
+
+SONG_FIELDS = ("id", "title", "artist", "audio", "lyrics", "char_delay", "line_delay")
+_FIELD_SET = frozenset(SONG_FIELDS)
+_MISSING = object()
+
+
+class Lyrics:
+    """A song's lyric entries, stored column-wise.
+
+    Indexing and iteration give (timestamp, line) or (timestamp, line, delay) tuples,
+    matching the songs.json entries. delays is None when no entry has its own delay;
+    otherwise entries without one are NaN.
+    """
+
+    __slots__ = ("timestamps", "lines", "delays")
+
+    def __init__(self, timestamps: array, lines: tuple, delays: Optional[array] = None):
+        self.timestamps = timestamps
+        self.lines = lines
+        self.delays = delays
+
+    @classmethod
+    def from_entries(cls, entries: Iterable) -> Optional["Lyrics"]:
+        """Build Lyrics from [timestamp, line] / [timestamp, line, delay] entries.
+
+        Returns None if any entry is malformed, so callers can keep the raw list for
+        validate to report on.
+        """
+        # Column-at-a-time comprehensions: several times faster than appending per entry.
+        entries = entries if isinstance(entries, list) else list(entries)
+        try:
+            sizes = set(map(len, entries))
+            if not sizes <= {2, 3}:
+                return None
+            raw_timestamps = [e[0] for e in entries]
+            lines = tuple([sys.intern(e[1]) for e in entries])
+            raw_delays = [e[2] if len(e) == 3 else math.nan for e in entries] if 3 in sizes else None
+            if bool in set(map(type, raw_timestamps)) or (raw_delays and bool in set(map(type, raw_delays))):
+                return None
+            timestamps = array("d", raw_timestamps)
+            delays = array("d", raw_delays) if raw_delays is not None else None
+        except (TypeError, KeyError, IndexError):
+            return None
+        return cls(timestamps, lines, delays)
+
+    def entry(self, i: int) -> tuple:
+        delay = self.delays[i] if self.delays is not None else math.nan
+        if math.isnan(delay):
+            return self.timestamps[i], self.lines[i]
+        return self.timestamps[i], self.lines[i], delay
+
+    def entries(self, default_line_delay: float = 0.0) -> list:
+        """Return [(timestamp, line, delay), ...] with default_line_delay filled in."""
+        if self.delays is None:
+            return [(ts, line, default_line_delay) for ts, line in zip(self.timestamps, self.lines)]
+        return [
+            (ts, line, default_line_delay if math.isnan(delay) else delay)
+            for ts, line, delay in zip(self.timestamps, self.lines, self.delays)
+        ]
+
+    def to_list(self) -> list:
+        """Return the entries as songs.json lists."""
+        return [list(self.entry(i)) for i in range(len(self.lines))]
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.entry(j) for j in range(*i.indices(len(self.lines)))]
+        if i < 0:
+            i += len(self.lines)
+        if not 0 <= i < len(self.lines):
+            raise IndexError("lyrics index out of range")
+        return self.entry(i)
+
+    def __iter__(self):
+        if self.delays is None:
+            return zip(self.timestamps, self.lines)
+        return (self.entry(i) for i in range(len(self.lines)))
+
+    def __repr__(self) -> str:
+        return f"Lyrics({len(self)} entries)"
+
+
+class Song:
+    """One songs.json entry. Known fields are slots; anything else is kept in extra.
+
+    Supports the read side of the dict interface (song["id"], song.get("title", ...),
+    "audio" in song, dict(song)); to_dict() gives back a JSON-ready dict. Lyrics are a
+    Lyrics object unless the entries are malformed, in which case the raw list is kept.
+    """
+
+    __slots__ = SONG_FIELDS + ("extra",)
+
+    def __init__(
+        self,
+        id: Optional[str] = None,
+        title: Optional[str] = None,
+        artist: Optional[str] = None,
+        audio: Optional[str] = None,
+        lyrics=None,
+        char_delay: Optional[float] = None,
+        line_delay: Optional[float] = None,
+        extra: Optional[dict] = None,
+    ):
+        self.id = id
+        self.title = title
+        self.artist = artist
+        self.audio = audio
+        self.lyrics = lyrics
+        self.char_delay = char_delay
+        self.line_delay = line_delay
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Song":
+        """Build a Song from a songs.json entry (explicit nulls and unknown keys go to extra)."""
+        extra = {k: v for k, v in data.items() if k not in _FIELD_SET or v is None} or None
+        lyrics = data.get("lyrics")
+        if isinstance(lyrics, list):
+            parsed = Lyrics.from_entries(lyrics)
+            if parsed is not None:
+                lyrics = parsed
+        return cls(
+            data.get("id"), data.get("title"), data.get("artist"), data.get("audio"), lyrics,
+            data.get("char_delay"), data.get("line_delay"), extra,
+        )
+
+    def to_dict(self) -> dict:
+        """Return the song as a songs.json entry."""
+        data = {}
+        for key in SONG_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                # Lyrics, or lyrics read from a compiled timeline
+                data[key] = value.to_list() if hasattr(value, "to_list") else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, key: str, default=None):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value) -> None:
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        if key in _FIELD_SET and value is not None:
+            if self.extra is not None:
+                self.extra.pop(key, None)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self) -> list:
+        keys = [key for key in SONG_FIELDS if getattr(self, key) is not None]
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def items(self) -> list:
+        return [(key, self[key]) for key in self.keys()]
+
+    def __repr__(self) -> str:
+        return f"Song({self.id!r})"
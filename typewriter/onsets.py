@@ -0,0 +1,274 @@
+"""
+Onset detection for assisted lyric timing.
+
+Audio is decoded to mono float samples (PCM WAV with the wave module, anything else
+through ffmpeg), cut into overlapping frames and reduced with NumPy, one block of frames
+at a time, to an onset envelope: half-wave rectified spectral flux of the log-magnitude
+spectrum. Peaks of the envelope are candidate line starts, scored by how much louder
+the audio gets across them (sung lines start after a breath); suggest_timestamps()
+picks one per lyric line and snap_timestamps() pulls rough manual timings onto them.
+
+Requires numpy (optional dependency; everything else in the package works without it).
+"""
+
+import math
+import shutil
+import subprocess
+import wave
+from bisect import bisect_left, insort
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    np = None
+    HAVE_NUMPY = False
+
+FRAME_SECONDS = 0.046
+HOP_SECONDS = 0.01
+BLOCK_FRAMES = 2048
+COMPRESSION = 10.0
+DECODE_RATE = 22050
+
+
+class Onsets(NamedTuple):
+    """Detected onsets of one audio file."""
+
+    times: "np.ndarray"
+    strengths: "np.ndarray"
+    lift: "np.ndarray"
+    duration: float
+
+
+def _require_numpy() -> None:
+    if not HAVE_NUMPY:
+        raise ImportError("onset detection needs numpy: pip install numpy")
+
+
+def decode_audio(path: str, rate: int = DECODE_RATE) -> tuple:
+    """Return (mono float32 samples, sample rate) for path.
+
+    PCM WAV is read directly at its own rate; other formats (and WAV encodings the
+    wave module rejects) are decoded by ffmpeg at rate. Raises ValueError if the file
+    cannot be decoded.
+    """
+    _require_numpy()
+    if path.lower().endswith(".wav"):
+        try:
+            return _read_wav(path)
+        except wave.Error:
+            pass
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise ValueError(f"{path}: only PCM WAV can be decoded without ffmpeg on PATH")
+    proc = subprocess.run(
+        [ffmpeg, "-v", "error", "-nostdin", "-i", path, "-f", "f32le", "-ac", "1", "-ar", str(rate), "-"],
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise ValueError(f"{path}: ffmpeg could not decode it: {proc.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(proc.stdout, dtype="<f4"), rate
+
+
+def _read_wav(path: str) -> tuple:
+    """Read a PCM WAV file as mono float32 samples in [-1, 1]."""
+    with wave.open(path, "rb") as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        data = w.readframes(w.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(data, np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(data, "<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(data, np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = (((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8) >> 8).astype(np.float32) / 8388608.0
+    elif width == 4:
+        samples = np.frombuffer(data, "<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise wave.Error(f"unsupported sample width {width}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return samples, rate
+
+
+def onset_envelope(
+    samples: "np.ndarray", rate: int, frame_seconds: float = FRAME_SECONDS, hop_seconds: float = HOP_SECONDS
+) -> tuple:
+    """Return (envelope, seconds per envelope value): spectral flux per hop.
+
+    Value i belongs to the frame starting at sample i * hop. Frames are strided views
+    of samples, so only BLOCK_FRAMES frames are windowed and transformed at a time,
+    keeping memory flat for long songs.
+    """
+    _require_numpy()
+    size = 1 << max(6, round(math.log2(rate * frame_seconds)))
+    hop = max(1, round(rate * hop_seconds))
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < size:
+        samples = np.pad(samples, (0, size - len(samples)))
+    frames = np.lib.stride_tricks.sliding_window_view(samples, size)[::hop]
+    window = np.hanning(size).astype(np.float32)
+    envelope = np.empty(len(frames), dtype=np.float32)
+    previous = None
+    for start in range(0, len(frames), BLOCK_FRAMES):
+        block = frames[start:start + BLOCK_FRAMES] * window
+        spectrum = np.log1p(COMPRESSION * np.abs(np.fft.rfft(block, axis=1)))
+        if previous is None:
+            previous = spectrum[:1]
+        flux = np.diff(np.concatenate((previous, spectrum)), axis=0)
+        envelope[start:start + len(spectrum)] = np.maximum(flux, 0.0).sum(axis=1)
+        previous = spectrum[-1:]
+    return envelope, hop / rate
+
+
+def pick_peaks(
+    envelope: "np.ndarray", hop: float, min_gap: float = 0.1, delta: float = 0.05, mean_seconds: float = 0.5
+) -> "np.ndarray":
+    """Return indices of envelope peaks: local maxima above the moving mean plus delta.
+
+    The envelope is normalised to [0, 1] first; peaks closer than min_gap seconds to a
+    stronger one are dropped.
+    """
+    _require_numpy()
+    peak = float(envelope.max()) if len(envelope) else 0.0
+    if peak <= 0:
+        return np.empty(0, dtype=np.intp)
+    env = envelope / peak
+    half = max(1, round(0.05 / hop))
+    local_max = np.lib.stride_tricks.sliding_window_view(np.pad(env, half), 2 * half + 1).max(axis=1)
+    width = 2 * max(1, round(mean_seconds / hop)) + 1
+    mean = np.convolve(env, np.full(width, 1.0 / width, dtype=np.float32), mode="same")
+    candidates = np.flatnonzero((env == local_max) & (env >= mean + delta))
+    return np.asarray(_suppress(candidates, env[candidates], round(min_gap / hop)), dtype=np.intp)
+
+
+def _suppress(positions, scores: "np.ndarray", min_gap: float, limit: Optional[int] = None) -> list:
+    """Return up to limit of the highest-scoring positions, no two closer than min_gap, sorted."""
+    kept = []
+    for i in np.argsort(-scores, kind="stable"):
+        if limit is not None and len(kept) >= limit:
+            break
+        position = positions[i]
+        k = bisect_left(kept, position)
+        if k > 0 and position - kept[k - 1] < min_gap:
+            continue
+        if k < len(kept) and kept[k] - position < min_gap:
+            continue
+        insort(kept, position)
+    return kept
+
+
+def energy_lift(
+    samples: "np.ndarray",
+    rate: int,
+    times: "np.ndarray",
+    before: float = 0.5,
+    after: float = 0.3,
+    hop_seconds: float = HOP_SECONDS,
+) -> "np.ndarray":
+    """Return, for each time, the mean level (dB) over the next after seconds minus the previous before seconds."""
+    _require_numpy()
+    hop = max(1, round(rate * hop_seconds))
+    n = len(samples) // hop
+    power = np.square(np.asarray(samples[:n * hop], dtype=np.float32).reshape(n, hop)).mean(axis=1)
+    level = np.concatenate(([0.0], np.cumsum(10.0 * np.log10(power + 1e-10), dtype=np.float64)))
+    frames = np.round(np.asarray(times) * rate / hop).astype(np.intp)
+
+    def mean_level(lo, hi):
+        lo, hi = np.clip(lo, 0, n), np.clip(hi, 0, n)
+        return (level[hi] - level[lo]) / np.maximum(hi - lo, 1)
+
+    reach_before, reach_after = round(before * rate / hop), round(after * rate / hop)
+    return mean_level(frames, frames + reach_after) - mean_level(frames - reach_before, frames)
+
+
+def find_onsets(path: str, min_gap: float = 0.1) -> Onsets:
+    """Decode path and return its onsets (times at the centre of the detecting frame)."""
+    samples, rate = decode_audio(path)
+    envelope, hop = onset_envelope(samples, rate)
+    peaks = pick_peaks(envelope, hop, min_gap)
+    times = peaks * hop + (1 << max(6, round(math.log2(rate * FRAME_SECONDS)))) / (2.0 * rate)
+    return Onsets(times, envelope[peaks], energy_lift(samples, rate, times), len(samples) / rate)
+
+
+def suggest_timestamps(onsets: Onsets, n_lines: int, min_line_gap: float = 1.0) -> List[float]:
+    """Return n_lines increasing timestamps, one per lyric line.
+
+    Onsets are scored by strength times energy lift, so onsets after a pause win; the
+    best ones at least min_line_gap apart are used. If there are too few, the widest
+    gaps are split until there are enough.
+    """
+    _require_numpy()
+    if n_lines <= 0:
+        return []
+    times = onsets.times
+    chosen = []
+    if len(times):
+        scores = onsets.strengths * np.maximum(onsets.lift, 0.0)
+        chosen = [float(t) for t in _suppress(times, scores, min_line_gap, n_lines)]
+    while len(chosen) < n_lines:
+        bounds = [0.0] + chosen + [max(onsets.duration, chosen[-1] if chosen else 0.0)]
+        gap, i = max((bounds[i + 1] - bounds[i], i) for i in range(len(bounds) - 1))
+        chosen.insert(i, bounds[i] + gap / 2)
+    return [round(t, 2) for t in chosen]
+
+
+def snap_timestamps(timestamps: Sequence[float], onsets: Onsets, window: float = 0.35) -> List[float]:
+    """Move each timestamp to the nearest onset within window seconds (others are kept)."""
+    _require_numpy()
+    ts = np.asarray(timestamps, dtype=np.float64)
+    times = onsets.times
+    if not len(times) or not len(ts):
+        return [float(t) for t in ts]
+    right = np.clip(np.searchsorted(times, ts), 0, len(times) - 1)
+    left = np.clip(right - 1, 0, len(times) - 1)
+    nearest = np.where(np.abs(times[left] - ts) <= np.abs(times[right] - ts), times[left], times[right])
+    snapped = np.where(np.abs(nearest - ts) <= window, nearest, ts)
+    return [round(float(t), 2) for t in snapped]
+
+
+def time_lyrics(audio_path: str, lines: Sequence[str], min_line_gap: float = 1.0) -> list:
+    """Return songs.json lyric entries [[timestamp, line], ...] for lines, timed from the audio.
+
+    Blank lines (stanza breaks) are kept and share the timestamp of the line after them.
+    """
+    onsets = find_onsets(audio_path)
+    sung = [i for i, line in enumerate(lines) if line.strip()]
+    stamps = dict(zip(sung, suggest_timestamps(onsets, len(sung), min_line_gap)))
+    entries = []
+    pending = []
+    for i, line in enumerate(lines):
+        if i not in stamps:
+            pending.append(line)
+            continue
+        entries.extend([stamps[i], ""] for _ in pending)
+        pending = []
+        entries.append([stamps[i], line])
+    last = entries[-1][0] if entries else 0.0
+    entries.extend([last, ""] for _ in pending)
+    return entries
+
+
+def _time_job(job: tuple) -> list:
+    audio_path, lines, min_line_gap = job
+    return time_lyrics(audio_path, lines, min_line_gap)
+
+
+def time_lyrics_batch(jobs: Sequence[tuple], workers: Optional[int] = None, min_line_gap: float = 1.0) -> list:
+    """Time many songs on a process pool. jobs is [(audio_path, lines), ...]; returns their entries in order.
+
+    A song that fails to decode yields its exception instead of entries.
+    """
+    _require_numpy()
+    tasks = [(path, list(lines), min_line_gap) for path, lines in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_time_job, task) for task in tasks]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except (OSError, ValueError) as e:
+                results.append(e)
+        return results
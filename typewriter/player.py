@@ -3,12 +3,23 @@ Playback engine: lyric timing, iter_lyrics, audio path, char/line delay.
 """
 
 import os
+import threading
 import time
-from typing import Callable, Optional
+from bisect import bisect_left, bisect_right
+from typing import Callable, Optional, Union
+
+from . import metrics
+from .clock import MonotonicClock, async_wait_until, wait_until
+from .compiled import CompiledLyrics
+from .models import Lyrics, Song
 
 DEFAULT_CHAR_DELAY = 0.03
 DEFAULT_LINE_DELAY = 0.0
 
+STOPPED = "stopped"
+PLAYING = "playing"
+PAUSED = "paused"
+
 
 def parse_lyric_entry(entry: list, default_line_delay: float = 0.0) -> tuple:
     """Parse [timestamp, line] or [timestamp, line, delay] from songs.json."""
@@ -17,52 +28,247 @@ def parse_lyric_entry(entry: list, default_line_delay: float = 0.0) -> tuple:
     return float(entry[0]), entry[1], default_line_delay
 
 
+class LyricTimeline:
+    """Parsed lyric entries sorted by timestamp, with O(log n) seeking.
+
+    CompiledLyrics are already sorted: their timestamps are used as the mmap'd view and
+    entries decode each line only when it is read.
+    """
+
+    __slots__ = ("entries", "timestamps")
+
+    def __init__(self, lyrics, default_line_delay: float = 0.0):
+        if isinstance(lyrics, CompiledLyrics):
+            self.entries = lyrics.entries(default_line_delay)
+            self.timestamps = lyrics.timestamps
+            return
+        if isinstance(lyrics, Lyrics):
+            entries = lyrics.entries(default_line_delay)
+        else:
+            entries = [parse_lyric_entry(e, default_line_delay) for e in lyrics]
+        entries.sort(key=lambda e: e[0])
+        self.entries = entries
+        self.timestamps = [e[0] for e in entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, i):
+        return self.entries[i]
+
+    def index_at(self, position: float) -> int:
+        """Return the index of the first entry due at or after position."""
+        return bisect_left(self.timestamps, position)
+
+    def visible_at(self, position: float) -> list:
+        """Return the entries already shown at position (timestamp <= position)."""
+        return self.entries[:bisect_right(self.timestamps, position)]
+
+    def entries_from(self, position: float) -> list:
+        """Return the entries still to come from position on."""
+        return self.entries[self.index_at(position):]
+
+
+class PlaybackController:
+    """Thread-safe play/pause/resume/stop/seek state for a playback loop.
+
+    Built on a threading.Condition: wait_until() sleeps to a deadline but wakes the
+    moment any command arrives. Pause/resume/seek are forwarded to clock when it has
+    those methods (e.g. PausableClock). A seek is carried out by the playback loop in
+    take_seek(): on_seek(position), if set, repositions the audio, then the clock is
+    re-anchored; other threads read the position with position(), which never sees
+    the two half done. The delay from each command to the loop acting on it is
+    appended to latencies, in seconds.
+    """
+
+    def __init__(self, clock=None, on_seek: Optional[Callable[[float], None]] = None):
+        self.clock = clock
+        self.on_seek = on_seek
+        self.state = STOPPED
+        self.latencies = []
+        self._cond = threading.Condition()
+        self._version = 0
+        self._seek_to = None
+        self._command_at = None
+
+    @property
+    def stopped(self) -> bool:
+        return self.state == STOPPED
+
+    @property
+    def paused(self) -> bool:
+        return self.state == PAUSED
+
+    def play(self) -> None:
+        self._command(PLAYING)
+
+    def pause(self) -> None:
+        with self._cond:
+            if self.state != PLAYING:
+                return
+            if self.clock is not None and hasattr(self.clock, "pause"):
+                self.clock.pause()
+            self._notify(PAUSED)
+
+    def resume(self) -> None:
+        with self._cond:
+            if self.state != PAUSED:
+                return
+            if self.clock is not None and hasattr(self.clock, "resume"):
+                self.clock.resume()
+            self._notify(PLAYING)
+
+    def stop(self) -> None:
+        self._command(STOPPED)
+
+    def seek(self, position: float) -> None:
+        """Request a jump to position; the loop picks it up with take_seek()."""
+        with self._cond:
+            self._seek_to = position
+            self._notify(self.state)
+
+    def take_seek(self) -> Optional[float]:
+        """Return and clear a pending seek position, applying it to the audio and the clock."""
+        with self._cond:
+            position, self._seek_to = self._seek_to, None
+            if position is None:
+                return None
+            if self.on_seek is not None:
+                self.on_seek(position)
+            if self.clock is not None and hasattr(self.clock, "seek"):
+                self.clock.seek(position)
+            return position
+
+    def position(self) -> Optional[float]:
+        """Return the song position, or a pending seek's target (None without a clock).
+
+        Safe to call from any thread.
+        """
+        with self._cond:
+            if self._seek_to is not None:
+                return self._seek_to
+            return self.clock.position() if self.clock is not None else None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the next command or timeout. Returns True if a command arrived."""
+        with self._cond:
+            version = self._version
+            return self._cond.wait_for(lambda: self._version != version, timeout)
+
+    def wait_until(
+        self,
+        clock,
+        deadline: float,
+        stop_check: Optional[Callable[[], bool]] = None,
+        poll_interval: float = 0.05,
+    ) -> bool:
+        """Sleep until clock reaches deadline, holding while paused.
+
+        Returns False as soon as playback is stopped or a seek is pending, or once
+        stop_check() is true (it is polled every poll_interval while waiting).
+        """
+        with self._cond:
+            while True:
+                self._acknowledge()
+                if self.state == STOPPED or self._seek_to is not None:
+                    return False
+                if self.state == PAUSED:
+                    self._cond.wait()
+                    continue
+                if stop_check is not None and stop_check():
+                    return False
+                remaining = deadline - clock.position()
+                if remaining <= 0:
+                    return True
+                self._cond.wait(remaining if stop_check is None else min(remaining, poll_interval))
+
+    def _command(self, state: str) -> None:
+        with self._cond:
+            self._notify(state)
+
+    def _notify(self, state: str) -> None:
+        self.state = state
+        self._version += 1
+        self._command_at = time.perf_counter()
+        self._cond.notify_all()
+
+    def _acknowledge(self) -> None:
+        if self._command_at is not None:
+            latency = time.perf_counter() - self._command_at
+            self.latencies.append(latency)
+            self._command_at = None
+            if metrics.enabled:
+                metrics.registry.observe("command_latency_seconds", latency)
+
+
 def iter_lyrics(
-    lyrics: list,
+    lyrics: Union[list, Lyrics, LyricTimeline],
     start_at: float,
     line_delay: float,
     stop_check: Optional[Callable[[], bool]] = None,
+    clock=None,
+    controller: Optional[PlaybackController] = None,
 ):
-    """Yield (timestamp, line, entry_delay) when each line is due based on song position."""
-    start_time = time.time()
+    """Yield (timestamp, line, entry_delay) when each line is due based on song position.
 
-    for entry in lyrics:
-        if stop_check and stop_check():
-            return
+    lyrics may be a songs.json lyrics list, a Song's Lyrics, or a prebuilt LyricTimeline
+    (whose own default line delay then applies). Song position comes from clock (a MonotonicClock
+    started at start_at if None); pass a MixerClock to follow the audio device.
+    With a controller, waits also wake immediately on stop/pause and end on stop or seek.
+    """
+    if clock is None:
+        clock = MonotonicClock(start_at)
+    timeline = lyrics if isinstance(lyrics, LyricTimeline) else LyricTimeline(lyrics, line_delay)
 
-        ts, line, entry_delay = parse_lyric_entry(entry, line_delay)
-
-        if ts < start_at:
-            continue
+    for ts, line, entry_delay in timeline.entries_from(start_at):
+        if controller is not None:
+            if not controller.wait_until(clock, ts, stop_check):
+                return
+        elif not wait_until(clock, ts, stop_check):
+            return
+        if metrics.enabled:
+            metrics.registry.observe("line_lateness_seconds", clock.position() - ts)
+        yield ts, line, entry_delay
 
-        elapsed = time.time() - start_time
-        song_position = start_at + elapsed
-        wait = ts - song_position
 
-        if wait > 0:
-            sleep_interval = 0.05
-            while wait > 0 and (not stop_check or not stop_check()):
-                time.sleep(min(sleep_interval, wait))
-                elapsed = time.time() - start_time
-                song_position = start_at + elapsed
-                wait = ts - song_position
+async def aiter_lyrics(
+    lyrics: Union[list, Lyrics, LyricTimeline],
+    start_at: float,
+    line_delay: float,
+    clock=None,
+):
+    """Async iter_lyrics: yield (timestamp, line, entry_delay) as each line comes due.
 
-        if stop_check and stop_check():
-            return
+    Waits with asyncio.sleep to absolute deadlines, so many sessions can share one
+    event loop; cancel the consuming task to stop.
+    """
+    if clock is None:
+        clock = MonotonicClock(start_at)
+    timeline = lyrics if isinstance(lyrics, LyricTimeline) else LyricTimeline(lyrics, line_delay)
 
+    for ts, line, entry_delay in timeline.entries_from(start_at):
+        await async_wait_until(clock, ts)
+        if metrics.enabled:
+            metrics.registry.observe("line_lateness_seconds", clock.position() - ts)
         yield ts, line, entry_delay
 
 
-def get_audio_path(song: dict, project_root: str) -> str:
+def get_audio_path(song: Union[dict, Song], project_root: str) -> str:
     """Return full path to the song's audio file."""
     return os.path.join(project_root, song["audio"])
 
 
-def get_char_delay(song: dict, override: Optional[float] = None) -> float:
+def get_char_delay(song: Union[dict, Song], override: Optional[float] = None) -> float:
     """Return char delay, using override or song's default."""
-    return override if override is not None else song.get("char_delay", DEFAULT_CHAR_DELAY)
+    if override is not None:
+        return override
+    if isinstance(song, Song):
+        return song.char_delay if song.char_delay is not None else DEFAULT_CHAR_DELAY
+    return song.get("char_delay", DEFAULT_CHAR_DELAY)
 
 
-def get_line_delay(song: dict) -> float:
+def get_line_delay(song: Union[dict, Song]) -> float:
     """Return line delay from song config."""
+    if isinstance(song, Song):
+        return song.line_delay if song.line_delay is not None else DEFAULT_LINE_DELAY
     return song.get("line_delay", DEFAULT_LINE_DELAY)
@@ -0,0 +1,253 @@
+"""
+Playlist playback: songs back to back on pygame.mixer.music with no gap between tracks.
+
+While one song plays, a background thread prepares the next: resolves and reads its
+audio file (so the OS has it cached), builds its lyric timeline, optionally measures
+the audio's length, and hands the file to
+pygame.mixer.music.queue() so the mixer starts it the moment the current track ends.
+A QueueClock notices the switch and the next song's lyrics start from 0 on it.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional
+
+from . import metrics
+from .clock import QueueClock
+from .player import LyricTimeline, PlaybackController, get_audio_path, get_char_delay, get_line_delay
+from .validate import probe_duration
+
+
+class PreparedSong(NamedTuple):
+    """Everything needed to start a song without touching the disk or songs.json."""
+
+    song: dict
+    audio_path: str
+    timeline: LyricTimeline
+    char_delay: float
+    duration: Optional[float] = None  # audio length in seconds, if measured
+
+
+def load_timeline(song: dict) -> LyricTimeline:
+    """Return the song's lyric timeline, built from its lyrics and line delay."""
+    return LyricTimeline(song.get("lyrics", []), get_line_delay(song))
+
+
+def prepare_song(song: dict, root: str, with_duration: bool = False) -> PreparedSong:
+    """Resolve and pre-read song's audio and build its timeline. Raises OSError if the audio is missing.
+
+    With with_duration, the audio's length is measured too (this may run ffprobe).
+    """
+    with metrics.timed("prefetch_seconds"):
+        audio_path = get_audio_path(song, root)
+        _preload(audio_path)
+        duration = probe_duration(audio_path) if with_duration else None
+        return PreparedSong(song, audio_path, load_timeline(song), get_char_delay(song, None), duration)
+
+
+def _preload(path: str, chunk_size: int = 1 << 20) -> None:
+    """Read path once so it is in the OS page cache when the mixer opens it."""
+    buf = bytearray(chunk_size)
+    with open(path, "rb", buffering=0) as f:
+        while f.readinto(buf):
+            pass
+
+
+class Prefetcher:
+    """Prepares playlist songs on one background thread, ahead of playback."""
+
+    def __init__(self, songs: list, root: str, with_duration: bool = False):
+        self.songs = songs
+        self.root = root
+        self.with_duration = with_duration
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, index: int) -> Optional[Future]:
+        """Start preparing songs[index] (once); returns its future, or None past the end."""
+        if not 0 <= index < len(self.songs):
+            return None
+        with self._lock:
+            future = self._futures.get(index)
+            if future is None:
+                future = self._futures[index] = self._executor.submit(
+                    prepare_song, self.songs[index], self.root, self.with_duration
+                )
+            return future
+
+    def get(self, index: int) -> PreparedSong:
+        """Return songs[index] prepared, waiting for it if needed. Raises what prepare_song raised."""
+        future = self.prefetch(index)
+        self.discard(index)
+        return future.result()
+
+    def discard(self, index: int) -> None:
+        """Forget songs[index] once it has been handed over."""
+        self._futures.pop(index, None)
+
+    def close(self) -> None:
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+        self._executor.shutdown(wait=False)
+
+
+class PlaylistPlayer:
+    """Plays songs in order on pygame.mixer.music, typing each song's lyrics as it plays.
+
+    run() calls play_lyrics(prepared, clock, start_at, stop_check) for each song; it must
+    type the lyrics on clock and return when done or as soon as stop_check() is true
+    (the song's track has ended), and may keep handling seeks until then. wrap_clock, if given, wraps each song's clock
+    (e.g. PausableClock) before it is handed out and set on the controller. With
+    with_duration, each PreparedSong carries its audio length, measured ahead of playback.
+    """
+
+    def __init__(
+        self,
+        songs: list,
+        root: str,
+        music,
+        controller: PlaybackController,
+        wrap_clock: Optional[Callable] = None,
+        with_duration: bool = False,
+    ):
+        self.songs = list(songs)
+        self.music = music
+        self.controller = controller
+        self.wrap_clock = wrap_clock
+        self.queue_clock = None
+        self._prefetcher = Prefetcher(self.songs, root, with_duration)
+        self._queued = None
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        play_lyrics: Callable,
+        start_at: float = 0.0,
+        on_song: Optional[Callable[[int, PreparedSong], None]] = None,
+        on_error: Optional[Callable[[dict, Exception], None]] = None,
+    ) -> None:
+        """Play every song from the first, starting it at start_at.
+
+        Songs whose audio cannot be read are reported to on_error(song, error) and
+        skipped. on_song(index, prepared) is called as each song starts. Seeks on the
+        controller restart the current track at the new position.
+        """
+        controller = self.controller
+        controller.on_seek = self.reposition
+        try:
+            index, current = self._next_playable(0, on_error)
+            if current is None:
+                return
+            self._play_now(current, start_at)
+            self.queue_clock = QueueClock(start_at, self.music)
+            while not controller.stopped:
+                track = self.queue_clock.track
+                clock = self.wrap_clock(self.queue_clock) if self.wrap_clock else self.queue_clock
+                controller.clock = clock
+                self._queue_when_ready(index + 1)
+                if on_song is not None:
+                    on_song(index, current)
+                play_lyrics(current, clock, start_at, lambda: self.queue_clock.track != track)
+                self._wait_for_track_end(track)
+                start_at = 0.0
+                if controller.stopped:
+                    break
+                with self._lock:
+                    queued, self._queued = self._queued, None
+                if queued is not None:
+                    self._report_skipped(index + 1, queued[0], on_error)
+                if self.queue_clock.track != track and queued is not None:
+                    index, current = queued
+                    if metrics.enabled:
+                        metrics.registry.inc("playlist_gapless_switches")
+                    continue
+                # The track ended before the next one was queued: start it directly.
+                if queued is not None:
+                    index, current = queued
+                else:
+                    index, current = self._next_playable(index + 1, on_error)
+                if current is None:
+                    break
+                self._play_now(current, 0.0)
+                self.queue_clock.next_track()
+        finally:
+            self._prefetcher.close()
+            if controller.stopped:
+                self.music.stop()
+
+    def reposition(self, position: float) -> None:
+        """Restart the current track at position (for PlaybackController.on_seek).
+
+        music.play() drops the queue, so the next song is queued again.
+        """
+        with self._lock:
+            self.music.play(start=position)
+            if self.controller.paused:
+                self.music.pause()
+            if self._queued is not None:
+                self.music.queue(self._queued[1].audio_path)
+
+    def _next_playable(self, index: int, on_error) -> tuple:
+        """Return (index, prepared) of the first song from index that can be played, or (index, None)."""
+        while index < len(self.songs):
+            try:
+                return index, self._prefetcher.get(index)
+            except OSError as e:
+                if on_error is not None:
+                    on_error(self.songs[index], e)
+                index += 1
+        return index, None
+
+    def _report_skipped(self, start: int, stop: int, on_error) -> None:
+        """Report the songs in [start, stop) that the prefetcher passed over as unplayable."""
+        for index in range(start, stop):
+            try:
+                self._prefetcher.get(index)
+            except OSError as e:
+                if on_error is not None:
+                    on_error(self.songs[index], e)
+
+    def _play_now(self, prepared: PreparedSong, start_at: float) -> None:
+        with self._lock:
+            self._queued = None
+            with metrics.timed("audio_load_seconds"):
+                self.music.load(prepared.audio_path)
+            with metrics.timed("audio_play_seconds"):
+                self.music.play(start=start_at)
+
+    def _queue_when_ready(self, index: int) -> None:
+        """Hand songs[index] to music.queue() as soon as the prefetcher has it ready.
+
+        If it cannot be prepared, the song after it is tried instead.
+        """
+        future = self._prefetcher.prefetch(index)
+        if future is not None:
+            future.add_done_callback(lambda f: self._queue(index, f))
+
+    def _queue(self, index: int, future: Future) -> None:
+        if future.cancelled() or self.controller.stopped:
+            return
+        if future.exception() is not None:
+            self._queue_when_ready(index + 1)
+            return
+        prepared = future.result()
+        with self._lock:
+            try:
+                with metrics.timed("audio_queue_seconds"):
+                    self.music.queue(prepared.audio_path)
+            except Exception:
+                return
+            self._queued = (index, prepared)
+        self._prefetcher.discard(index)
+
+    def _wait_for_track_end(self, track: int, poll_interval: float = 0.01) -> None:
+        """Block until the queue clock moves past track, the music stops, or playback is stopped."""
+        controller = self.controller
+        while not controller.stopped and self.queue_clock.track == track:
+            if not controller.paused and not self.music.get_busy():
+                return
+            controller.wait(poll_interval)
+            self.queue_clock.position()
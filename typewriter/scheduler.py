@@ -0,0 +1,187 @@
+"""
+Deadline-based event scheduler: lyrics expanded into timed character and line events.
+
+Each event has an absolute song-position deadline. One loop waits for the earliest
+deadline, dispatches it and records how late it fired, so a slow line never pushes
+later lines back.
+"""
+
+import heapq
+import itertools
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+from . import metrics
+from .clock import async_wait_until, wait_until
+from .player import LyricTimeline
+
+LINE = "line"
+CHAR = "char"
+END = "end"
+
+
+class LyricEvent(NamedTuple):
+    """One timed render step. kind is LINE (line starts), CHAR (type text) or END (line done).
+
+    style is a render plan's style id (0 outside render plans).
+    """
+
+    deadline: float
+    seq: int
+    kind: str
+    text: str = ""
+    line: int = 0
+    col: int = 0
+    style: int = 0
+
+
+def typing_budget(timeline: LyricTimeline, i: int) -> float:
+    """Return the seconds line i may spend typing before the next line is due.
+
+    That is the gap to the next timestamp less the entry's own delay (ignored when the
+    delay is longer than the gap); infinite for the last line.
+    """
+    if i + 1 >= len(timeline):
+        return float("inf")
+    ts, _line, entry_delay = timeline[i]
+    gap = timeline.timestamps[i + 1] - ts
+    return gap - entry_delay if gap - entry_delay > 0 else gap
+
+
+def find_overruns(timeline: LyricTimeline, char_delay: float) -> List[tuple]:
+    """Return (index, timestamp, typing seconds needed, seconds available) for every line
+    whose typing at char_delay would overrun the next line (and is therefore compressed)."""
+    overruns = []
+    for i, (ts, line, _delay) in enumerate(timeline):
+        if line.strip():
+            needed = char_delay * len(line)
+            budget = typing_budget(timeline, i)
+            if needed > budget:
+                overruns.append((i, ts, needed, max(budget, 0.0)))
+    return overruns
+
+
+def expand_lyrics(
+    timeline: LyricTimeline, char_delay: float, start_at: float = 0.0
+) -> List[LyricEvent]:
+    """Expand timeline entries due from start_at into LINE/CHAR/END events.
+
+    A line's characters are spaced char_delay apart and the END event lands after the
+    last one, as with the blocking typewriter. If that would overrun the next line's
+    timestamp (see typing_budget), the line is typed faster so it still finishes on time.
+    """
+    seq = itertools.count()
+    events = []
+
+    for i in range(timeline.index_at(start_at), len(timeline)):
+        ts, line, entry_delay = timeline[i]
+        events.append(LyricEvent(ts, next(seq), LINE, line, i))
+        if not line.strip():
+            events.append(LyricEvent(ts, next(seq), END, "", i))
+            continue
+
+        step = char_delay
+        budget = typing_budget(timeline, i)
+        if step * len(line) > budget:
+            step = max(budget, 0.0) / len(line)
+
+        for col, char in enumerate(line):
+            events.append(LyricEvent(ts + col * step, next(seq), CHAR, char, i, col))
+        events.append(LyricEvent(ts + len(line) * step, next(seq), END, "", i))
+    return events
+
+
+class EventScheduler:
+    """Min-heap of LyricEvents dispatched in deadline order against a song clock."""
+
+    def __init__(self, clock, events: Optional[Iterable[LyricEvent]] = None):
+        self.clock = clock
+        self._heap = list(events or [])
+        heapq.heapify(self._heap)
+        self._seq = itertools.count(len(self._heap))
+        self.lateness: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, deadline: float, kind: str, text: str = "", line: int = 0, col: int = 0) -> None:
+        """Schedule one event."""
+        heapq.heappush(self._heap, LyricEvent(deadline, next(self._seq), kind, text, line, col))
+
+    def run(
+        self,
+        handler: Callable[[LyricEvent, float], None],
+        stop_check: Optional[Callable[[], bool]] = None,
+        frame_interval: float = 0.0,
+        on_frame: Optional[Callable[[], None]] = None,
+        controller=None,
+    ) -> bool:
+        """Dispatch events until the heap is empty; handler(event, lateness) per event.
+
+        Overdue events are dispatched back to back without sleeping, so a late loop
+        catches up. If on_frame is given it is called to present dispatched output:
+        before any wait that would hold it back more than frame_interval, and at the end.
+        With a PlaybackController, waits also wake on its commands. Returns False if
+        stopped (or a seek is pending) before the end.
+        """
+        heap = self._heap
+        clock = self.clock
+        pending_since = None
+        try:
+            while heap:
+                event = heap[0]
+                if pending_since is not None and event.deadline > pending_since + frame_interval:
+                    on_frame()
+                    pending_since = None
+                if controller is not None:
+                    if not controller.wait_until(clock, event.deadline, stop_check):
+                        return False
+                elif not wait_until(clock, event.deadline, stop_check):
+                    return False
+                heapq.heappop(heap)
+                late = clock.position() - event.deadline
+                self.lateness.append(late)
+                if metrics.enabled:
+                    metrics.registry.observe("event_lateness_seconds", late)
+                handler(event, late)
+                if on_frame is not None and pending_since is None:
+                    pending_since = event.deadline
+            return True
+        finally:
+            if pending_since is not None:
+                on_frame()
+
+    async def arun(
+        self,
+        handler: Callable[[LyricEvent, float], None],
+        frame_interval: float = 0.0,
+        on_frame: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """asyncio counterpart of run(); cancel the task running it to stop."""
+        heap = self._heap
+        clock = self.clock
+        pending_since = None
+        try:
+            while heap:
+                event = heap[0]
+                if pending_since is not None and event.deadline > pending_since + frame_interval:
+                    on_frame()
+                    pending_since = None
+                await async_wait_until(clock, event.deadline)
+                heapq.heappop(heap)
+                late = clock.position() - event.deadline
+                self.lateness.append(late)
+                if metrics.enabled:
+                    metrics.registry.observe("event_lateness_seconds", late)
+                handler(event, late)
+                if on_frame is not None and pending_since is None:
+                    pending_since = event.deadline
+        finally:
+            if pending_since is not None:
+                on_frame()
+
+
+def schedule_lyrics(
+    timeline: LyricTimeline, char_delay: float, clock, start_at: float = 0.0
+) -> EventScheduler:
+    """Return an EventScheduler loaded with timeline's events from start_at."""
+    return EventScheduler(clock, expand_lyrics(timeline, char_delay, start_at))
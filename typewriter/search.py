@@ -0,0 +1,330 @@
+"""
+Full-text lyric search: an inverted index over every lyric line in the catalog.
+
+Lines are split into lowercase word tokens, and each token maps to a sorted array of
+postings, one per line containing it, packed as slot << ENTRY_BITS | entry index
+(a slot stands for one song). A query intersects its tokens' postings, rarest first,
+and hits resolve to (song id, entry index, timestamp, line) through the catalog.
+
+The index is saved to .lyricstream-cache/search.index next to songs.json: a header
+(magic, version, metadata size), the slots and tokens as JSON, then the postings arrays
+as raw bytes. Nothing in the file is executed on load, and a file with the wrong magic,
+version or shape is ignored and rebuilt. When
+songs.json changes, only songs whose lyric lines changed are re-indexed: their old
+slot is retired and they get a new one in a small delta segment. Once retired and
+delta slots make up a quarter of the index it is rebuilt from scratch.
+"""
+
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Optional
+
+from .models import Lyrics
+from .songs_loader import _file_stamp, get_catalog
+
+CACHE_DIR = ".lyricstream-cache"
+CACHE_FILE = "search.index"
+INDEX_VERSION = 2
+MAGIC = b"LSIX"
+ENTRY_BITS = 20
+COMPACT_RATIO = 0.25
+SET_INTERSECT_RATIO = 32
+_ENTRY_MASK = (1 << ENTRY_BITS) - 1
+_TOKEN = re.compile(r"\w+")
+_HEADER = struct.Struct("=4sB3xQ")  # magic, version, metadata size
+
+
+class SearchHit(NamedTuple):
+    """A lyric line matching a query."""
+
+    song_id: str
+    entry: int
+    timestamp: float
+    line: str
+
+
+def tokenize(text: str) -> list:
+    """Return the lowercase word tokens of text."""
+    return _TOKEN.findall(text.lower())
+
+
+def lyrics_fingerprint(song: dict) -> int:
+    """Return a checksum of the song's lyric lines (timestamps don't affect the index)."""
+    lines = [line for line in _lines(song) if line is not None]
+    return zlib.crc32("\x1e".join(lines).encode("utf-8"))
+
+
+def _lines(song) -> list:
+    """Return the song's lyric lines, with None for malformed entries (only from raw lists)."""
+    lyrics = song.get("lyrics", [])
+    if isinstance(lyrics, Lyrics):
+        return lyrics.lines
+    if not isinstance(lyrics, (list, tuple)):
+        return []
+    return [
+        entry[1] if isinstance(entry, (list, tuple)) and len(entry) > 1 and isinstance(entry[1], str) else None
+        for entry in lyrics
+    ]
+
+
+class SearchIndex:
+    """Inverted index from tokens to the lyric lines containing them.
+
+    Postings live in two segments: base, one flat array with each token's postings
+    in a contiguous run (written as a single block, cheap to save and load), and
+    delta, per-token arrays for songs indexed since base was built. Delta slots all
+    come after base slots, so a line's postings are always in a single segment.
+    """
+
+    def __init__(self):
+        self.source = None
+        self.slots: List[Optional[str]] = []
+        self.fingerprints: List[int] = []
+        self.retired = 0
+        self.base_slots = 0
+        self.base = array("Q")
+        self.base_tokens: Dict[str, int] = {}
+        self.base_starts = array("Q", [0])
+        self.delta: Dict[str, array] = {}
+        self._slot_of: Dict[str, int] = {}
+
+    def add_song(self, song: dict) -> None:
+        """Index song under a new slot (in the delta segment)."""
+        _add_postings(self.delta, song, len(self.slots))
+        self._take_slot(song)
+
+    def remove_song(self, song_id: str) -> None:
+        """Retire song_id's slot; its postings are skipped until the next rebuild."""
+        slot = self._slot_of.pop(song_id, None)
+        if slot is not None:
+            self.slots[slot] = None
+            self.retired += 1
+
+    def rebuild(self, songs) -> None:
+        """Index songs from scratch into the base segment."""
+        self.slots = []
+        self.fingerprints = []
+        self._slot_of = {}
+        self.retired = 0
+        postings = {}
+        for song in songs:
+            _add_postings(postings, song, len(self.slots))
+            self._take_slot(song)
+        base = array("Q")
+        starts = array("Q", [0])
+        tokens = {}
+        for token, keys in postings.items():
+            tokens[token] = len(tokens)
+            base.extend(keys)
+            starts.append(len(base))
+        self.base, self.base_tokens, self.base_starts = base, tokens, starts
+        self.base_slots = len(self.slots)
+        self.delta = {}
+
+    def update(self, songs: list) -> int:
+        """Bring the index in line with songs; returns how many songs were (re)indexed or removed.
+
+        Rebuilds from scratch once retired and delta slots together make up COMPACT_RATIO
+        of the index.
+        """
+        latest = {s["id"]: s for s in songs if isinstance(s.get("id"), str)}
+        changed = 0
+        for song_id in [sid for sid in self._slot_of if sid not in latest]:
+            self.remove_song(song_id)
+            changed += 1
+        for song_id, song in latest.items():
+            slot = self._slot_of.get(song_id)
+            if slot is not None:
+                if self.fingerprints[slot] == lyrics_fingerprint(song):
+                    continue
+                self.remove_song(song_id)
+            self.add_song(song)
+            changed += 1
+        stale = self.retired + len(self.slots) - self.base_slots
+        if stale and stale >= COMPACT_RATIO * len(self.slots):
+            self.rebuild(latest.values())
+        return changed
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Return up to limit (song id, entry index) pairs for lines containing every token of query."""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        hits = []
+        lists = []
+        for token in tokens:
+            t = self.base_tokens.get(token)
+            lists.append(self.base[self.base_starts[t]:self.base_starts[t + 1]] if t is not None else array("Q"))
+        _intersect(lists, self.slots, hits, limit)
+        if len(hits) < limit and self.delta:
+            _intersect([self.delta.get(token, array("Q")) for token in tokens], self.slots, hits, limit)
+        return hits
+
+    def _take_slot(self, song: dict) -> None:
+        self._slot_of[song["id"]] = len(self.slots)
+        self.slots.append(song["id"])
+        self.fingerprints.append(lyrics_fingerprint(song))
+
+
+def _add_postings(postings: dict, song: dict, slot: int) -> None:
+    """Append song's lines to postings (token -> keys) under slot."""
+    base = slot << ENTRY_BITS
+    for i, line in enumerate(_lines(song)[:_ENTRY_MASK + 1]):
+        if line is None:
+            continue
+        for token in set(tokenize(line)):
+            keys = postings.get(token)
+            if keys is None:
+                keys = postings[token] = array("Q")
+            keys.append(base | i)
+
+
+def _intersect(lists: list, slots: list, hits: list, limit: int) -> None:
+    """Append (song id, entry) for keys present in every sorted list to hits, up to limit.
+
+    Lists of similar length are intersected as sets (linear, but in C). When the
+    shortest list is much shorter than the rest it is walked instead, binary-searching
+    the others with windows that only move forward, since keys come in increasing order.
+    """
+    lists.sort(key=len)
+    first, rest = lists[0], lists[1:]
+    if not rest:
+        keys = first
+    elif sum(map(len, rest)) <= SET_INTERSECT_RATIO * len(first):
+        common = set(first)
+        for keys in rest:
+            common = common.intersection(keys)
+        keys = sorted(common)
+    else:
+        keys = _walk(first, rest)
+    for key in keys:
+        song_id = slots[key >> ENTRY_BITS]
+        if song_id is not None:
+            hits.append((song_id, key & _ENTRY_MASK))
+            if len(hits) >= limit:
+                return
+
+
+def _walk(first, rest: list):
+    """Yield the keys of first that are in every list of rest."""
+    positions = [0] * len(rest)
+    for key in first:
+        for n, keys in enumerate(rest):
+            i = positions[n] = bisect_left(keys, key, positions[n])
+            if i == len(keys):
+                return
+            if keys[i] != key:
+                break
+        else:
+            yield key
+
+
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(songs_file: str = None) -> SearchIndex:
+    """Return the search index for songs_file, loading it from disk and updating it if songs.json changed."""
+    catalog = get_catalog(songs_file)
+    stamp = _file_stamp(catalog.path)
+    source = list(stamp) if stamp else None
+    with _indexes_lock:
+        index = _indexes.get(catalog.path)
+        if index is not None and index.source == source:
+            return index
+        cache_path = os.path.join(os.path.dirname(catalog.path), CACHE_DIR, CACHE_FILE)
+        if index is None:
+            index = _load_index(cache_path)
+        if index.source != source:
+            if index.source is None:
+                index.rebuild(catalog.songs())
+            else:
+                index.update(catalog.songs())
+            index.source = source
+            _save_index(cache_path, index)
+        _indexes[catalog.path] = index
+        return index
+
+
+def search_lyrics(query: str, songs_file: str = None, limit: int = 20) -> List[SearchHit]:
+    """Return up to limit lyric lines containing every word of query, in index order."""
+    catalog = get_catalog(songs_file)
+    hits = []
+    for song_id, i in get_index(songs_file).search(query, limit):
+        song = catalog.get(song_id)
+        if song is None or i >= len(song.get("lyrics", [])):
+            continue
+        entry = song["lyrics"][i]
+        hits.append(SearchHit(song_id, i, float(entry[0]), entry[1]))
+    return hits
+
+
+def _load_index(path: str) -> SearchIndex:
+    """Read the index saved at path, or return an empty one if it is missing, stale or damaged."""
+    try:
+        with open(path, "rb") as f:
+            magic, version, meta_size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or version != INDEX_VERSION:
+                return SearchIndex()
+            meta = json.loads(f.read(meta_size))
+            if meta["byteorder"] != sys.byteorder:
+                return SearchIndex()
+            index = SearchIndex()
+            index.source = meta["source"]
+            index.slots = meta["slots"]
+            index.fingerprints = meta["fingerprints"]
+            index.retired = meta["retired"]
+            index.base_slots = meta["base_slots"]
+            index.base_tokens = dict(zip(meta["base_tokens"], range(len(meta["base_tokens"]))))
+            index.base_starts = _read_array(f, len(index.base_tokens) + 1)
+            index.base = _read_array(f, index.base_starts[-1])
+            index.delta = {token: _read_array(f, n) for token, n in zip(meta["delta_tokens"], meta["delta_sizes"])}
+    except (OSError, EOFError, ValueError, KeyError, TypeError, IndexError, struct.error):
+        return SearchIndex()
+    if len(index.fingerprints) != len(index.slots) or not 0 <= index.base_slots <= len(index.slots):
+        return SearchIndex()
+    index._slot_of = {song_id: slot for slot, song_id in enumerate(index.slots) if song_id is not None}
+    return index
+
+
+def _save_index(path: str, index: SearchIndex) -> None:
+    """Write the index atomically; an unwritable cache directory is ignored."""
+    meta = {
+        "byteorder": sys.byteorder,
+        "source": index.source,
+        "slots": index.slots,
+        "fingerprints": index.fingerprints,
+        "retired": index.retired,
+        "base_slots": index.base_slots,
+        "base_tokens": list(index.base_tokens),
+        "delta_tokens": list(index.delta),
+        "delta_sizes": [len(keys) for keys in index.delta.values()],
+    }
+    meta = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, INDEX_VERSION, len(meta)))
+            f.write(meta)
+            index.base_starts.tofile(f)
+            index.base.tofile(f)
+            for keys in index.delta.values():
+                keys.tofile(f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _read_array(f, count: int) -> array:
+    """Read count postings keys from f; raises EOFError if the file is short."""
+    keys = array("Q")
+    keys.fromfile(f, count)
+    return keys
@@ -0,0 +1,77 @@
+"""
+Faster-than-real-time simulation: run the song's render plan through run_plan, as
+playback does, on a VirtualClock with no audio and record every event with its song time.
+
+The event stream is JSON lines, one object per event:
+    {"song": id, "t": song seconds, "kind": "line" | "char" | "end", "line": index, "col": column, "text": ...}
+so timing changes can be diffed and overlapping lines spotted without listening through.
+"""
+
+import json
+import time
+from typing import NamedTuple, Optional, TextIO
+
+from .clock import VirtualClock
+from .display import get_render_plan, run_plan
+from .player import LyricTimeline, get_char_delay, get_line_delay
+from .scheduler import END, LINE, find_overruns
+
+
+class SimulationReport(NamedTuple):
+    """Outcome of simulating one song."""
+
+    song_id: str
+    events: int
+    lines: int
+    duration: float
+    overruns: list
+    wall_time: float
+
+
+def simulate_song(
+    song: dict,
+    out: Optional[TextIO] = None,
+    theme: str = "plain",
+    start_at: float = 0.0,
+    timeline: Optional[LyricTimeline] = None,
+) -> SimulationReport:
+    """Play song on a virtual clock, writing its event stream to out (if given).
+
+    overruns in the report lists lines whose typing would run into the next line:
+    (index, timestamp, seconds needed, seconds available).
+    """
+    t0 = time.perf_counter()
+    if timeline is None:
+        timeline = LyricTimeline(song.get("lyrics", []), get_line_delay(song))
+    char_delay = get_char_delay(song, None)
+    plan = get_render_plan(song, timeline, char_delay, theme)
+    clock = VirtualClock(start_at)
+    song_id = song.get("id", "")
+    count = 0
+    line = -1
+
+    def record(t, kind, index, col, text):
+        nonlocal count
+        count += 1
+        if out is not None:
+            out.write(json.dumps({
+                "song": song_id, "t": round(t, 6), "kind": kind, "line": index, "col": col, "text": text,
+            }, ensure_ascii=False) + "\n")
+
+    def handle(event, late):
+        nonlocal line
+        # Plans leave out LINE events; the stream still marks where each line starts.
+        if event.line != line:
+            line = event.line
+            record(plan.line_times[line], LINE, line, 0, timeline[line][1])
+        record(clock.position(), event.kind, event.line, event.col, "" if event.kind == END else event.text)
+
+    run_plan(plan, clock, handle, lambda events, clear: None, start_at)
+    return SimulationReport(
+        song_id,
+        count,
+        len(timeline) - timeline.index_at(start_at),
+        clock.position() - start_at,
+        find_overruns(timeline, char_delay),
+        time.perf_counter() - t0,
+    )
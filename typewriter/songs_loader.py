@@ -1,48 +1,265 @@
 """
 Load songs from songs.json. Structure: songs[{id, title, artist, audio, lyrics, char_delay, line_delay}].
+
+The file is parsed once into a SongCatalog (of models.Song, with lyrics as models.Lyrics)
+and only re-read when its mtime or size changes. A library directory (see library.py)
+is opened as a ShardedCatalog instead, which reads lyrics only when they are used.
 """
 
+import hashlib
+import io
 import json
 import os
-from typing import Optional
+import re
+import threading
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .models import Song
+from .titles import DEFAULT_SONGS_FILE, LIBRARY_MANIFEST
+from .titles import default_songs_path as _default_songs_path
+
+# A JSON array of scalars as json.dumps(indent=2) lays it out, one element per line.
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+_FLAT_ARRAY = re.compile(r"\[\n\s*([^\[\]{}\n]*(?:,\n\s*[^\[\]{}\n]*)*)\n\s*\]")
+
+
+class SongCatalog:
+    """Parsed songs.json with an id index. Reloads only when the file's mtime or size changes."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._stamp = None
+        self._songs: List[Song] = []
+        self._index: Dict[str, Song] = {}
+        self._titles: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def songs(self) -> list:
+        """Return all songs, in file order."""
+        self._refresh()
+        return self._songs
+
+    def get(self, song_id: str) -> Optional[Song]:
+        """Return song by ID, or None if not found."""
+        self._refresh()
+        return self._index.get(song_id)
+
+    def titles(self) -> list:
+        """Return [(id, title), ...] for all songs."""
+        self._refresh()
+        return self._titles
+
+    def __len__(self) -> int:
+        return len(self.songs())
+
+    def __contains__(self, song_id: str) -> bool:
+        return self.get(song_id) is not None
+
+    def _refresh(self) -> None:
+        """Re-parse the file if it changed since the last load."""
+        stamp = _file_stamp(self.path)
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            songs = _parse_songs(self.path) if stamp else []
+            self._songs = songs
+            self._index = {s["id"]: s for s in songs if "id" in s}
+            self._titles = [(s["id"], s.get("title", s["id"])) for s in songs if "id" in s]
+            self._stamp = stamp
+
 
-DEFAULT_SONGS_FILE = "songs.json"
+_catalogs: Dict[str, SongCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(songs_file: str = None) -> SongCatalog:
+    """Return the shared catalog for songs_file (songs.json in project root if None).
+
+    A library directory or its manifest.json gives a library.ShardedCatalog.
+    """
+    path = songs_file or _find_songs_file() or _default_songs_path()
+    key = os.path.abspath(path)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _open_catalog(key)
+            # A library is also keyed by its manifest path, so both spellings share one catalog.
+            catalog = _catalogs.setdefault(catalog.path, catalog)
+            _catalogs[key] = catalog
+    return catalog
+
+
+def _open_catalog(path: str):
+    """Return a SongCatalog for a songs file, or a ShardedCatalog for a library."""
+    if os.path.isdir(path) or os.path.basename(path) == LIBRARY_MANIFEST:
+        from .library import ShardedCatalog
+
+        return ShardedCatalog(path)
+    return SongCatalog(path)
 
 
 def load_songs(songs_file: str = None) -> list:
     """Load songs from JSON. Uses songs.json in project root if songs_file is None."""
-    path = songs_file or _find_songs_file()
-    if not path or not os.path.exists(path):
-        return []
+    return get_catalog(songs_file).songs()
+
+
+def get_song(song_id: str, songs_file: str = None) -> Optional[Song]:
+    """Get song by ID, or None if not found."""
+    return get_catalog(songs_file).get(song_id)
+
+
+def list_songs(songs_file: str = None) -> list:
+    """Return [(id, title), ...] for all songs."""
+    return get_catalog(songs_file).titles()
 
+
+def save_song(song: Union[dict, Song], songs_file: str = None) -> str:
+    """Insert song into songs_file, replacing the entry with the same id, and return the path.
+
+    The file is rewritten atomically in its usual layout (one line per lyric entry);
+    everything else in it is kept as is. In a library only the song's own lyrics and
+    the manifest are written.
+    """
+    catalog = get_catalog(songs_file)
+    if not isinstance(catalog, SongCatalog):
+        catalog.update([song])
+        return catalog.path
+    path = catalog.path
+    if isinstance(song, Song):
+        song = song.to_dict()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {"songs": []}
+    songs = data.setdefault("songs", [])
+    for i, existing in enumerate(songs):
+        if existing.get("id") == song["id"]:
+            songs[i] = song
+            break
+    else:
+        songs.append(song)
+    write_songs(path, data, map(format_song, songs))
+    return path
+
+
+def format_songs(data: dict) -> str:
+    """Serialize a songs file like songs.json: indented, with each lyric entry on one line."""
+    out = io.StringIO()
+    _write_data(out, data, map(format_song, data.get("songs", [])))
+    return out.getvalue()
+
+
+def format_song(song: Union[dict, Song]) -> str:
+    """Serialize one song as format_songs lays it out inside the "songs" list."""
+    if isinstance(song, Song):
+        song = song.to_dict()
+    fields = []
+    for key, value in song.items():
+        if type(value) in _SCALAR_TYPES:
+            text = _encode(value)
+        else:
+            text = _format_rows(value)
+            if text is None:
+                text = _flatten(json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n      "))
+        fields.append(f"      {_encode(key)}: {text}")
+    return "    {\n" + ",\n".join(fields) + "\n    }" if fields else "    {}"
+
+
+def write_songs(path: str, data: dict, songs: Iterable[str]) -> None:
+    """Atomically write a songs file: data's other keys plus a "songs" list of format_song() chunks.
+
+    Chunks are written as they are produced, so the whole catalog never has to be held
+    in memory; the output is the same as format_songs() would give.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            _write_data(f, data, songs)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _write_data(f, data: dict, songs: Iterable[str]) -> None:
+    """Write data to f with its "songs" list taken from the formatted chunks in songs."""
+    keys = [key for key in data if key != "songs"]
+    keys.insert(list(data).index("songs") if "songs" in data else len(keys), "songs")
+    f.write("{\n")
+    for n, key in enumerate(keys):
+        f.write(f"  {json.dumps(key, ensure_ascii=False)}: ")
+        if key == "songs":
+            separator = "[\n"
+            for chunk in songs:
+                f.write(separator)
+                f.write(chunk)
+                separator = ",\n"
+            f.write("[]" if separator == "[\n" else "\n  ]")
+        else:
+            f.write(_flatten(json.dumps(data[key], indent=2, ensure_ascii=False).replace("\n", "\n  ")))
+        f.write(",\n" if n < len(keys) - 1 else "\n")
+    f.write("}\n")
+
+
+def _format_rows(value) -> Optional[str]:
+    """Lay out a list of scalar lists (lyrics) one row per line, or return None for anything else.
+
+    The list is encoded in one C-accelerated json.dumps call with NUL in the separators
+    (JSON strings can't contain a raw NUL), which are then turned into the row breaks:
+    much faster than the pure-Python indenting encoder plus _flatten.
+    """
+    if not isinstance(value, list) or not value or set(map(type, value)) != {list}:
+        return None
+    if not _SCALAR_TYPES.issuperset(map(type, chain.from_iterable(value))):
+        return None
+    text = json.dumps(value, ensure_ascii=False, separators=(",\0", ": "))
+    return "[\n        " + text[1:-1].replace("],\0[", "],\n        [").replace(",\0", ", ") + "\n      ]"
+
+
+def _flatten(text: str) -> str:
+    """Put every JSON array of scalars in text on one line."""
+    return _FLAT_ARRAY.sub(lambda m: "[" + re.sub(r",\n\s*", ", ", m.group(1)) + "]", text)
+
+
+def song_hash(song: Union[dict, Song]) -> str:
+    """Return a hash of the song's content, stable across key order and file position."""
+    if isinstance(song, Song):
+        song = song.to_dict()
+    data = json.dumps(song, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _parse_songs(path: str) -> list:
+    """Read and parse the songs file into Songs, filling in per-song defaults."""
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
-
-    songs = data.get("songs", [])
-    for s in songs:
+    songs = []
+    for s in data.get("songs", []):
         s.setdefault("char_delay", 0.03)
         s.setdefault("line_delay", 0.0)
         s.setdefault("artist", "")
+        songs.append(Song.from_dict(s))
     return songs
 
 
-def get_song(song_id: str, songs_file: str = None) -> Optional[dict]:
-    """Get song by ID, or None if not found."""
-    songs = load_songs(songs_file)
-    for s in songs:
-        if s.get("id") == song_id:
-            return s
-    return None
-
-
-def list_songs(songs_file: str = None) -> list:
-    """Return [(id, title), ...] for all songs."""
-    songs = load_songs(songs_file)
-    return [(s["id"], s.get("title", s["id"])) for s in songs]
+def _file_stamp(path: Optional[str]) -> Optional[tuple]:
+    """Return (mtime_ns, size) for path, or None if it does not exist."""
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
 
 def _find_songs_file() -> Optional[str]:
     """Find songs.json in project root."""
-    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    path = os.path.join(base, DEFAULT_SONGS_FILE)
+    path = _default_songs_path()
     return path if os.path.exists(path) else None
@@ -0,0 +1,183 @@
+"""
+Tap timing: stamp pre-loaded lyric lines with single keypresses, then nudge them.
+
+Keys are read in cbreak mode (typewriter.keys) and stamped with time.perf_counter()
+the moment they arrive. With an AudioPlayer the song plays through pygame and stamps
+are positions on the audio clock; with a Stopwatch they are seconds since the start.
+Entries are songs.json lyric entries ([timestamp, line] or [timestamp, line, delay]);
+a timestamp of None means the line has not been tapped yet.
+"""
+
+import sys
+import time
+from typing import List, Optional
+
+from . import audio
+from .clock import MixerClock
+from .display import clear_screen
+from .keys import BACKSPACE, DOWN, ENTER, ESC, LEFT, RIGHT, SPACE, UP, RawKeys
+
+NUDGE = 0.05
+FINE_NUDGE = 0.01
+PREROLL = 2.0
+
+
+class Stopwatch:
+    """Tap clock without audio: seconds since play(), for timing against an external player."""
+
+    def __init__(self):
+        self._t0 = None
+
+    def play(self, start_at: float = 0.0) -> None:
+        self._t0 = time.perf_counter() - start_at
+
+    def stop(self) -> None:
+        pass
+
+    def position(self) -> float:
+        return time.perf_counter() - self._t0 if self._t0 is not None else 0.0
+
+
+class AudioPlayer:
+    """Tap clock that plays the song through pygame; positions are on the audio clock."""
+
+    def __init__(self, path: str):
+        pygame = audio.get_mixer()
+        self._music = pygame.mixer.music
+        self._music.load(path)
+        self._clock = None
+
+    def play(self, start_at: float = 0.0) -> None:
+        self._music.play(start=start_at)
+        self._clock = MixerClock(start_at, self._music)
+
+    def stop(self) -> None:
+        self._music.stop()
+
+    def position(self) -> float:
+        return self._clock.position() if self._clock is not None else 0.0
+
+
+def stamp(player, key_time: float) -> float:
+    """Return the player position at key_time (a perf_counter() reading taken earlier)."""
+    return player.position() - (time.perf_counter() - key_time)
+
+
+def _label(line: str) -> str:
+    return line if line.strip() else "(blank)"
+
+
+def tap_pass(entries: List[list], player, keys: RawKeys, start_at: float = 0.0, out=None) -> int:
+    """Tap through entries from the first one due at start_at. Returns how many were tapped.
+
+    SPACE/ENTER stamps the next line, BACKSPACE undoes the last stamp, q/ESC ends the pass.
+    """
+    out = out or sys.stdout
+    index = next((i for i, e in enumerate(entries) if e[0] is None or e[0] >= start_at), len(entries))
+    out.write("SPACE/ENTER: line starts now   BACKSPACE: undo   q: finish\n")
+    out.write("Press SPACE to start playback...\n")
+    out.flush()
+    while True:
+        key = keys.read()
+        if key in (SPACE, ENTER):
+            break
+        if key in ("q", ESC):
+            return 0
+    player.play(start_at)
+
+    undo = []
+    while index < len(entries):
+        out.write(f"\r\033[K  next: {_label(entries[index][1])}")
+        out.flush()
+        key = keys.read()
+        key_time = time.perf_counter()
+        if key in (SPACE, ENTER):
+            ts = round(max(stamp(player, key_time), 0.0), 2)
+            undo.append(entries[index][0])
+            entries[index][0] = ts
+            out.write(f"\r\033[K[{ts:8.2f}] {_label(entries[index][1])}\n")
+            index += 1
+        elif key == BACKSPACE and undo:
+            index -= 1
+            entries[index][0] = undo.pop()
+            out.write("\r\033[K  (undone)\n")
+        elif key in ("q", ESC):
+            break
+    out.write("\r\033[K")
+    out.flush()
+    player.stop()
+    return len(undo)
+
+
+def nudge_pass(entries: List[list], player, keys: RawKeys, rows: int = 18, out=None) -> bool:
+    """Review and fix timestamps in place. Returns True to save, False to discard.
+
+    UP/DOWN select a line, LEFT/RIGHT nudge it by NUDGE seconds ([ and ] by FINE_NUDGE),
+    p plays from PREROLL seconds before it, SPACE re-taps it while playing and moves on,
+    s stops playback, w saves, q quits without saving.
+    """
+    out = out or sys.stdout
+    selected = 0
+    playing = False
+    message = ""
+    while True:
+        _draw(entries, selected, rows, player.position() if playing else None, message, out)
+        message = ""
+        key = keys.read(0.1 if playing else None)
+        key_time = time.perf_counter()
+        if key is None:
+            continue
+        ts = entries[selected][0]
+        if key in (UP, "k"):
+            selected = max(0, selected - 1)
+        elif key in (DOWN, "j"):
+            selected = min(len(entries) - 1, selected + 1)
+        elif key in (LEFT, RIGHT, "[", "]") and ts is not None:
+            step = {LEFT: -NUDGE, RIGHT: NUDGE, "[": -FINE_NUDGE, "]": FINE_NUDGE}[key]
+            entries[selected][0] = round(max(ts + step, 0.0), 2)
+        elif key == "p":
+            start = max((ts if ts is not None else _previous_time(entries, selected)) - PREROLL, 0.0)
+            player.play(start)
+            playing = True
+        elif key == SPACE and playing:
+            entries[selected][0] = round(max(stamp(player, key_time), 0.0), 2)
+            selected = min(len(entries) - 1, selected + 1)
+        elif key == "s" and playing:
+            player.stop()
+            playing = False
+        elif key == "w":
+            missing = sum(1 for e in entries if e[0] is None)
+            if missing:
+                message = f"{missing} line(s) have no timestamp yet"
+                continue
+            player.stop()
+            return True
+        elif key in ("q", ESC):
+            player.stop()
+            return False
+
+
+def _previous_time(entries: List[list], index: int) -> float:
+    """Return the timestamp of the nearest tapped line before index (0 if none)."""
+    for ts, *_rest in reversed(entries[:index]):
+        if ts is not None:
+            return ts
+    return 0.0
+
+
+def _draw(entries: List[list], selected: int, rows: int, position: Optional[float], message: str, out) -> None:
+    clear_screen()
+    out.write("UP/DOWN select  LEFT/RIGHT ±0.05s  [ ] ±0.01s  p play  SPACE re-tap  s stop  w save  q quit\n")
+    out.write(f"position {position:8.2f}s\n" if position is not None else "\n")
+    top = min(max(0, selected - rows // 2), max(0, len(entries) - rows))
+    previous = None
+    for i in range(top, min(len(entries), top + rows)):
+        ts, line = entries[i][0], entries[i][1]
+        order = "!" if ts is not None and previous is not None and ts < previous else " "
+        shown = f"{ts:8.2f}" if ts is not None else "     --"
+        out.write(f"{'>' if i == selected else ' '}{order}{shown}  {_label(line)}\n")
+        if ts is not None:
+            previous = ts
+    if message:
+        out.write(f"\n{message}\n")
+    out.flush()
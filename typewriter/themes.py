@@ -0,0 +1,40 @@
+"""
+Theme colors: terminal escapes and GUI hex values per theme.
+
+Kept apart from display so the CLI can offer theme names without loading playback code.
+"""
+
+_ANSI = {
+    "reset": "\033[0m",
+    "bold": "\033[1m",
+    "red": "\033[91m",
+    "green": "\033[92m",
+    "yellow": "\033[93m",
+    "blue": "\033[94m",
+    "magenta": "\033[95m",
+    "cyan": "\033[96m",
+    "white": "\033[97m",
+}
+
+THEMES = {
+    "plain": [],
+    "colorful": ["cyan", "green", "yellow", "magenta", "blue"],
+    "warm": ["yellow", "red", "magenta"],
+    "cool": ["cyan", "blue"],
+}
+
+# Theme colors for the GUI
+THEME_COLORS_HEX = {
+    "red": "#ff6b6b",
+    "green": "#51cf66",
+    "yellow": "#fcc419",
+    "blue": "#339af0",
+    "magenta": "#cc5de8",
+    "cyan": "#22b8cf",
+    "white": "#f8f9fa",
+}
+
+
+def get_theme_list() -> list:
+    """Return available theme names."""
+    return list(THEMES.keys())
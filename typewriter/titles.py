@@ -0,0 +1,159 @@
+"""
+Song titles for --list without loading the catalog.
+
+Listing is the one command that can be answered from a file written ahead of time: the
+titles block of a compiled timeline (compiled.py), or a library's titles.bin, written
+next to manifest.json whenever it is. This module reads them with only os, struct and
+sys, so play.py tries it before importing the CLI: json, re and typing, which every
+other command needs, are most of the CLI's startup. It gives up (and the full CLI runs)
+for any other arguments or when the file is missing or older than its source.
+
+The compiled timeline's header layout is defined here, for the same reason.
+"""
+
+import os
+import struct
+import sys
+
+DEFAULT_SONGS_FILE = "songs.json"
+LIBRARY_MANIFEST = "manifest.json"
+LIBRARY_TITLES = "titles.bin"
+
+# Compiled timeline layout (see compiled.py).
+MAGIC = b"LSTL"
+VERSION = 4
+COMPILED_SUFFIX = ".lyrics.bin"
+HEADER = struct.Struct("=4sBB2xqqIII4xQ")
+SONG = struct.Struct("=IIIIIIdd")
+BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+# titles.bin: magic, version, byte order, manifest mtime_ns and size, titles size.
+_TITLES_MAGIC = b"LSTT"
+_TITLES_HEADER = struct.Struct("=4sBB2xqqQ")
+
+
+def default_songs_path() -> str:
+    """Return where songs.json is expected in the project root."""
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, DEFAULT_SONGS_FILE)
+
+
+def compiled_path(songs_file: str) -> str:
+    """Return the compiled timeline path for songs_file (songs.json -> songs.lyrics.bin)."""
+    return os.path.splitext(songs_file)[0] + COMPILED_SUFFIX
+
+
+def padded(size: int) -> int:
+    """Return size rounded up to a multiple of 8."""
+    return size + (-size % 8)
+
+
+def pack_titles(ids: list, titles: list) -> bytes:
+    """Return UTF-8 "id\\0title\\0id\\0title...", or b"" if any id or title contains NUL."""
+    if any("\0" in s for s in ids) or any("\0" in s for s in titles):
+        return b""
+    return "\0".join(f"{i}\0{t}" for i, t in zip(ids, titles)).encode("utf-8")
+
+
+def unpack_titles(data) -> list:
+    """Return [(id, title), ...] from a pack_titles() block."""
+    parts = str(data, "utf-8").split("\0")
+    return list(zip(parts[0::2], parts[1::2]))
+
+
+def write_library_titles(manifest: str, ids: list, titles: list) -> None:
+    """Write titles.bin next to manifest, stamped with the manifest as it is now on disk."""
+    block = pack_titles(ids, titles)
+    path = os.path.join(os.path.dirname(manifest), LIBRARY_TITLES)
+    if not block and ids:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    st = os.stat(manifest)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_TITLES_HEADER.pack(_TITLES_MAGIC, 1, BYTE_ORDER, st.st_mtime_ns, st.st_size, len(block)))
+            f.write(block)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_titles(path: str):
+    """Return [(id, title), ...] for the songs file or library at path, or None.
+
+    None means the titles have to come from the catalog: there is no titles file, or
+    it was written for an older songs.json / manifest.json.
+    """
+    is_library = os.path.isdir(path) or os.path.basename(path) == LIBRARY_MANIFEST
+    manifest = os.path.join(path, LIBRARY_MANIFEST) if os.path.isdir(path) else path
+    try:
+        if is_library:
+            source = os.stat(manifest)
+            with open(os.path.join(os.path.dirname(manifest), LIBRARY_TITLES), "rb") as f:
+                magic, version, order, mtime_ns, size, length = _TITLES_HEADER.unpack(f.read(_TITLES_HEADER.size))
+                if (magic, version) != (_TITLES_MAGIC, 1):
+                    return None
+                return _read_block(f, order, (mtime_ns, size), source, length)
+        source = os.stat(path)
+        with open(compiled_path(path), "rb") as f:
+            magic, version, order, mtime_ns, size, n_songs, _n_entries, _n_strings, length = HEADER.unpack(
+                f.read(HEADER.size)
+            )
+            if (magic, version) != (MAGIC, VERSION) or not length:
+                return None
+            f.seek(HEADER.size + padded(n_songs * SONG.size) + padded(4 * n_songs))
+            return _read_block(f, order, (mtime_ns, size), source, length)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def _read_block(f, order: int, stamp: tuple, source: os.stat_result, length: int):
+    if order != BYTE_ORDER or stamp != (source.st_mtime_ns, source.st_size):
+        return None
+    data = f.read(length)
+    return unpack_titles(data) if len(data) == length else None
+
+
+def format_listing(songs: list) -> str:
+    """Return the --list output for [(id, title), ...]."""
+    return "Available songs:\n" + "".join([f"  {sid}: {title}\n" for sid, title in songs])
+
+
+def parse_list_args(argv: list) -> tuple:
+    """Return (True, songs file or None) for `--list [--songs FILE]`, else (False, None).
+
+    Only these spellings are recognised; anything else is left to the full parser.
+    """
+    listing = False
+    songs_file = None
+    args = iter(argv)
+    for arg in args:
+        if arg in ("--list", "-l"):
+            listing = True
+        elif arg == "--songs":
+            songs_file = next(args, None)
+            if songs_file is None or songs_file.startswith("-"):
+                return False, None
+        elif arg.startswith("--songs=") and len(arg) > len("--songs="):
+            songs_file = arg[len("--songs="):]
+        else:
+            return False, None
+    return listing, songs_file if listing else None
+
+
+def fast_list(argv: list) -> bool:
+    """Answer `--list [--songs FILE]` from a current titles file and return True.
+
+    Returns False, having printed nothing, for any other arguments and whenever
+    read_titles() has nothing usable; the full CLI then handles the command.
+    """
+    listing, songs_file = parse_list_args(argv)
+    songs = read_titles(os.path.abspath(songs_file or default_songs_path())) if listing else None
+    if not songs:
+        return False
+    sys.stdout.write(format_listing(songs))
+    return True
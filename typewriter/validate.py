@@ -0,0 +1,223 @@
+"""
+Catalog validation: find broken songs before they show up mid-performance.
+
+Every song is checked for missing fields, malformed lyric entries, timestamps out of
+order, lines whose typing overruns the next line, a missing audio file and lyrics that
+run past the end of the audio. Songs are checked in parallel on a process pool, and the
+results are cached in .lyricstream-cache/ next to songs.json, keyed by the song's
+content hash and its audio file's mtime and size, so only changed songs are re-checked.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from numbers import Real
+from typing import List, NamedTuple, Optional
+
+from .models import Lyrics
+from .player import LyricTimeline, get_audio_path, get_char_delay, get_line_delay
+from .scheduler import find_overruns
+from .songs_loader import _file_stamp, get_catalog, song_hash
+
+CACHE_DIR = ".lyricstream-cache"
+CACHE_FILE = "validate.json"
+CACHE_VERSION = 1
+POOL_THRESHOLD = 32
+
+
+class SongReport(NamedTuple):
+    """Validation outcome for one song."""
+
+    song_id: str
+    problems: list
+    duration: Optional[float]
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """Return the audio file's length in seconds, or None if it cannot be determined.
+
+    WAV files are read with the wave module; other formats need ffprobe on PATH.
+    """
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as w:
+                return w.getnframes() / float(w.getframerate())
+        except (wave.Error, EOFError, OSError):
+            return None
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is None:
+        return None
+    try:
+        out = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+            capture_output=True, text=True, timeout=30, check=True,
+        ).stdout
+        return float(out.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+
+
+def check_song(song: dict, root: str) -> SongReport:
+    """Check one song; audio paths are relative to root."""
+    problems = []
+    song_id = song.get("id")
+    if not isinstance(song_id, str) or not song_id:
+        problems.append("missing 'id'")
+        song_id = str(song_id or "?")
+    delays_ok = True
+    for key in ("char_delay", "line_delay"):
+        value = song.get(key, 0.0)
+        if not isinstance(value, Real) or isinstance(value, bool) or value < 0:
+            problems.append(f"'{key}' must be a non-negative number, got {value!r}")
+            delays_ok = False
+
+    lyrics = song.get("lyrics")
+    entries_ok = _check_entries(lyrics, problems)
+    span = None
+    if entries_ok and delays_ok and lyrics:
+        timeline = LyricTimeline(lyrics, get_line_delay(song))
+        char_delay = get_char_delay(song, None)
+        for index, ts, needed, available in find_overruns(timeline, char_delay):
+            problems.append(
+                f"line {index} at {ts:.2f}s needs {needed:.2f}s to type, next line in {available:.2f}s"
+            )
+        last_ts, last_line, _delay = timeline[-1]
+        span = last_ts + char_delay * len(last_line)
+
+    duration = None
+    audio = song.get("audio")
+    if not isinstance(audio, str) or not audio:
+        problems.append("missing 'audio'")
+    else:
+        path = get_audio_path(song, root)
+        if not os.path.isfile(path):
+            problems.append(f"audio file '{audio}' not found")
+        else:
+            duration = probe_duration(path)
+            if duration is not None and span is not None and span > duration:
+                problems.append(f"lyrics run to {span:.2f}s but the audio is {duration:.2f}s long")
+    return SongReport(song_id, problems, duration)
+
+
+def _check_entries(lyrics, problems: list) -> bool:
+    """Append problems with the lyric entries; return True if they can be parsed."""
+    if not isinstance(lyrics, (list, Lyrics)):
+        problems.append("missing 'lyrics' list")
+        return False
+    ok = True
+    previous = None
+    for i, entry in enumerate(lyrics):
+        if not isinstance(entry, (list, tuple)) or len(entry) not in (2, 3):
+            problems.append(f"line {i}: expected [timestamp, line] or [timestamp, line, delay], got {entry!r}")
+            ok = False
+            continue
+        ts, line = entry[0], entry[1]
+        if not isinstance(ts, Real) or isinstance(ts, bool) or ts < 0:
+            problems.append(f"line {i}: timestamp must be a non-negative number, got {ts!r}")
+            ok = False
+            continue
+        if not isinstance(line, str):
+            problems.append(f"line {i}: lyric must be a string, got {line!r}")
+            ok = False
+        if len(entry) == 3 and (not isinstance(entry[2], Real) or isinstance(entry[2], bool) or entry[2] < 0):
+            problems.append(f"line {i}: delay must be a non-negative number, got {entry[2]!r}")
+            ok = False
+        if previous is not None and ts < previous:
+            problems.append(f"line {i} at {ts:.2f}s comes before line {i - 1} at {previous:.2f}s")
+        previous = ts
+    return ok
+
+
+def validate_catalog(
+    songs_file: str = None, workers: Optional[int] = None, use_cache: bool = True
+) -> List[SongReport]:
+    """Check every song in songs_file, in file order, re-checking only what changed since the last run."""
+    catalog = get_catalog(songs_file)
+    root = os.path.dirname(catalog.path)
+    songs = catalog.songs()
+    source = list(_file_stamp(catalog.path) or ())
+    cache_path = os.path.join(root, CACHE_DIR, CACHE_FILE)
+    cache = _load_cache(cache_path) if use_cache else {}
+    results = cache.get("results", {})
+
+    # Content hashes only need recomputing when songs.json itself changed.
+    hashes = cache.get("hashes")
+    if cache.get("source") != source or not isinstance(hashes, list) or len(hashes) != len(songs):
+        hashes = [song_hash(song) for song in songs]
+    keys = [_cache_key(song, h, root) for song, h in zip(songs, hashes)]
+    reports = [None] * len(songs)
+    todo = []
+    for i, key in enumerate(keys):
+        hit = results.get(key)
+        if hit is not None:
+            reports[i] = SongReport(hit["id"], hit["problems"], hit["duration"], cached=True)
+        else:
+            todo.append(i)
+
+    if todo:
+        for i, report in zip(todo, _run_checks([songs[i] for i in todo], root, workers)):
+            reports[i] = report
+    if use_cache and (todo or cache.get("source") != source):
+        _save_cache(cache_path, {
+            "version": CACHE_VERSION,
+            "source": source,
+            "hashes": hashes,
+            "results": {
+                key: {"id": r.song_id, "problems": r.problems, "duration": r.duration}
+                for key, r in zip(keys, reports)
+            },
+        })
+
+    seen = set()
+    for i, report in enumerate(reports):
+        if report.song_id in seen:
+            reports[i] = report._replace(problems=report.problems + [f"duplicate id '{report.song_id}'"])
+        seen.add(report.song_id)
+    return reports
+
+
+def _run_checks(songs: list, root: str, workers: Optional[int]) -> List[SongReport]:
+    """Check songs on a process pool (inline when there are only a few)."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(songs) < POOL_THRESHOLD:
+        return [check_song(song, root) for song in songs]
+    chunksize = max(1, len(songs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(check_song, songs, repeat(root), chunksize=chunksize))
+
+
+def _cache_key(song: dict, content_hash: str, root: str) -> str:
+    """Key a song's cached result by its content hash and its audio file's mtime and size."""
+    audio = song.get("audio")
+    stamp = _file_stamp(os.path.join(root, audio)) if isinstance(audio, str) and audio else None
+    return f"{content_hash}:{stamp}"
+
+
+def _load_cache(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) and data.get("version") == CACHE_VERSION else {}
+
+
+def _save_cache(path: str, data: dict) -> None:
+    """Write the cache atomically; an unwritable cache directory is ignored."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass